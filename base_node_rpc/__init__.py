@@ -1,6 +1,8 @@
 from __future__ import absolute_import
-import os
 from collections import OrderedDict
+from importlib import import_module
+import os
+import sys
 
 from path_helpers import path
 
@@ -8,16 +10,55 @@ from ._version import get_versions
 __version__ = get_versions()['version']
 del get_versions
 
-# .. versionadded:: 0.38
-from .async import available_devices
-# .. versionadded:: 0.39
-from .async import read_device_id
-try:
-    from .node import Proxy, I2cProxy, SerialProxy
-except (ImportError, TypeError):
-    Proxy = None
-    I2cProxy = None
-    SerialProxy = None
+#: Public attributes imported on first access, mapped to the name of the
+#: submodule providing each attribute.
+#:
+#: Importing these submodules pulls in heavy dependencies (e.g., ``pandas``,
+#: ``numpy``, ``serial_device``), which are not needed by, e.g., command-line
+#: tools only calling :func:`get_firmwares` or :func:`get_includes`.
+#:
+#: .. versionadded:: 0.52
+_LAZY_ATTRIBUTES = OrderedDict([
+    # .. versionadded:: 0.38
+    ('available_devices', 'async'),
+    # .. versionadded:: 0.39
+    ('read_device_id', 'async'),
+    ('Proxy', 'node'),
+    ('I2cProxy', 'node'),
+    ('SerialProxy', 'node')])
+
+
+def __getattr__(name):
+    '''
+    Import lazy attribute (see :data:`_LAZY_ATTRIBUTES`) on first access.
+
+    .. versionadded:: 0.52
+    '''
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module %r has no attribute %r' %
+                             (__name__, name))
+    module_name = _LAZY_ATTRIBUTES[name]
+    try:
+        # Use `import_module` since `async` is a reserved word in Python 3.7+.
+        value = getattr(import_module('.' + module_name, __name__), name)
+    except (ImportError, TypeError):
+        if module_name != 'node':
+            raise
+        # Generated proxy is not available (e.g., before code generation).
+        value = None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info[:2] < (3, 7):
+    # Module `__getattr__` is not supported (see PEP 562), so import eagerly.
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+    del _name
 
 
 def package_path():
@@ -66,7 +107,7 @@ def get_sources():
     return get_sketch_directory().files('*.c*') + arduino_rpc.get_sources()
 
 
-def get_firmwares():
+def get_firmwares(images=False):
     '''
     Return compiled Arduino hex file paths.
 
@@ -74,11 +115,30 @@ def get_firmwares():
     for flashing to [Arduino][1] boards.
 
     [1]: http://arduino.cc
+
+    Parameters
+    ----------
+    images : bool, optional
+        If ``True``, map each hex file path to its parsed memory image, loaded
+        through :data:`base_node_rpc.firmware_cache.DEFAULT_CACHE` (i.e., each
+        firmware is only parsed once).
+
+    .. versionchanged:: 0.52
+        Add :data:`images` argument.
     '''
-    return OrderedDict([(board_dir.name, [f.abspath() for f in
-                                          board_dir.walkfiles('*.hex')])
-                        for board_dir in
-                        package_path().joinpath('firmware').dirs()])
+    firmwares = OrderedDict([(board_dir.name, [f.abspath() for f in
+                                               board_dir.walkfiles('*.hex')])
+                             for board_dir in
+                             package_path().joinpath('firmware').dirs()])
+    if images:
+        from .firmware_cache import DEFAULT_CACHE
+
+        firmwares = OrderedDict([(board_i,
+                                  OrderedDict([(path_j,
+                                                DEFAULT_CACHE.image(path_j))
+                                               for path_j in paths_i]))
+                                 for board_i, paths_i in firmwares.items()])
+    return firmwares
 
 from ._version import get_versions
 __version__ = get_versions()['version']
@@ -1,5 +1,8 @@
 from __future__ import absolute_import
 from nadamq.NadaMq import cPacket, PACKET_TYPES
+import serial
+
+from .records import RecordTable, USE_PANDAS
 
 
 ID_REQUEST = cPacket(type_=PACKET_TYPES.ID_REQUEST).tostring()
@@ -7,3 +10,71 @@ ID_REQUEST = cPacket(type_=PACKET_TYPES.ID_REQUEST).tostring()
 
 class ParseError(Exception):
     pass
+
+
+def comports(only_available=False):
+    '''
+    List serial ports.
+
+    Parameters
+    ----------
+    only_available : bool, optional
+        If ``True``, only list ports that are not busy.
+
+    Returns
+    -------
+    pandas.DataFrame or base_node_rpc.records.RecordTable
+        Serial ports, indexed by port name (see
+        :func:`serial_device.comports`).  If
+        :data:`base_node_rpc.records.USE_PANDAS` is ``False``, a
+        :class:`base_node_rpc.records.RecordTable` listed using
+        :mod:`serial.tools.list_ports`, i.e., without importing
+        :mod:`serial_device` (which requires :mod:`pandas`).
+
+    .. versionadded:: 0.52
+    '''
+    if USE_PANDAS:
+        import serial_device as sd
+
+        return sd.comports(only_available=only_available)
+
+    from serial.tools.list_ports import comports as list_ports
+
+    rows = []
+    for port_info_i in list_ports():
+        port_i, descriptor_i, hardware_id_i = tuple(port_info_i)[:3]
+        if only_available:
+            try:
+                serial.Serial(port=port_i).close()
+            except serial.SerialException:
+                # Port is busy.
+                continue
+        rows.append((port_i, [('descriptor', descriptor_i),
+                              ('hardware_id', hardware_id_i)]))
+    return RecordTable(rows, index_name='port')
+
+
+def join_device_ids(ports, results):
+    '''
+    Parameters
+    ----------
+    ports : pandas.DataFrame or base_node_rpc.records.RecordTable
+        Table of ports, indexed by port name (see :func:`comports`).
+    results : list
+        Device identifier of each port that responded, i.e., ``dict``
+        including a ``port`` item (see ``_read_device_id``).
+
+    Returns
+    -------
+    pandas.DataFrame or base_node_rpc.records.RecordTable
+        :data:`ports` table updated with items of :data:`results`.
+
+    .. versionadded:: 0.52
+    '''
+    if not results:
+        return ports
+    elif isinstance(ports, RecordTable):
+        return ports.join_records(results, 'port')
+    import pandas as pd
+
+    return ports.join(pd.DataFrame(results).set_index('port'))
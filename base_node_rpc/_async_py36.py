@@ -17,11 +17,10 @@ import asyncserial
 import blinker
 import json_tricks
 import numpy as np
-import pandas as pd
 import serial
-import serial_device as sd
 
-from ._async_common import ParseError, ID_REQUEST
+from ._async_common import (ParseError, ID_REQUEST, comports,
+                            join_device_ids)
 
 
 __all__ = ['read_packet', '_read_device_id', '_available_devices',
@@ -130,9 +129,9 @@ async def _available_devices(ports=None, baudrate=9600, timeout=None,
 
     Parameters
     ----------
-    ports : pd.DataFrame, optional
+    ports : pandas.DataFrame or base_node_rpc.records.RecordTable, optional
         Table of ports to query (in format returned by
-        :func:`serial_device.comports`).
+        :func:`base_node_rpc.async.comports`).
 
         **Default: all available ports**
     baudrate : int, optional
@@ -147,7 +146,7 @@ async def _available_devices(ports=None, baudrate=9600, timeout=None,
 
     Returns
     -------
-    pd.DataFrame
+    pandas.DataFrame or base_node_rpc.records.RecordTable
         Specified :data:`ports` table updated with ``baudrate``,
         ``device_name``, and ``device_version`` columns.
 
@@ -156,11 +155,14 @@ async def _available_devices(ports=None, baudrate=9600, timeout=None,
         Make ports argument optional.
     .. versionchanged:: 0.51.2
         Add ``settling_time_s`` keyword argument.
+    .. versionchanged:: 0.52
+        Support :class:`base_node_rpc.records.RecordTable` ports table (see
+        :data:`base_node_rpc.records.USE_PANDAS`).
     '''
     if ports is None:
-        ports = sd.comports(only_available=True)
+        ports = comports(only_available=True)
 
-    if not ports.shape[0]:
+    if not len(ports):
         # No ports
         return ports
     futures = [_read_device_id(port=name_i, baudrate=baudrate,
@@ -169,12 +171,7 @@ async def _available_devices(ports=None, baudrate=9600, timeout=None,
     done, pending = await asyncio.wait(futures, timeout=timeout)
     results = [task_i.result() for task_i in done
                if task_i.result() is not None]
-    if results:
-        df_results = pd.DataFrame(results).set_index('port')
-        df_results = ports.join(df_results)
-    else:
-        df_results = ports
-    return df_results
+    return join_device_ids(ports, results)
 
 
 async def _async_serial_keepalive(parent, *args, **kwargs):
@@ -13,6 +13,9 @@ else:
                               _async_serial_keepalive, _available_devices,
                               _read_device_id, asyncio, read_packet)
 
+# .. versionadded:: 0.52
+from ._async_common import comports
+
 
 def new_file_event_loop():
     return (asyncio.ProactorEventLoop() if platform.system() == 'Windows'
@@ -106,9 +109,8 @@ def available_devices(baudrate=9600, ports=None, timeout=None, **kwargs):
         Baud rate to use for device identifier request.
 
         **Default: 9600**
-    ports : pd.DataFrame
-        Table of ports to query (in format returned by
-        :func:`serial_device.comports`).
+    ports : pandas.DataFrame or base_node_rpc.records.RecordTable
+        Table of ports to query (in format returned by :func:`comports`).
 
         **Default: all available ports**
     timeout : float, optional
@@ -119,15 +121,21 @@ def available_devices(baudrate=9600, ports=None, timeout=None, **kwargs):
 
     Returns
     -------
-    pd.DataFrame
+    pandas.DataFrame or base_node_rpc.records.RecordTable
         Specified :data:`ports` table updated with ``baudrate``,
         ``device_name``, and ``device_version`` columns.
 
+        A :class:`base_node_rpc.records.RecordTable` if
+        :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
+
 
     .. versionchanged:: 0.47
         Make ports argument optional.
     .. versionchanged:: 0.51.2
         Pass extra keyword arguments to `_available_devices()` function.
+    .. versionchanged:: 0.52
+        Return :class:`base_node_rpc.records.RecordTable` if
+        :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
     '''
     return _available_devices(ports=ports, baudrate=baudrate, timeout=timeout,
                               **kwargs)
@@ -3,17 +3,17 @@
 '''
 from __future__ import absolute_import
 from __future__ import print_function
-import itertools as it
 import struct
+import threading
 import time
 
 from builtins import bytes
 from six.moves import range
 import numpy as np
-import path_helpers as ph
 import six
 
-from .intel_hex import parse_intel_hex
+from .firmware_cache import DEFAULT_CACHE, FirmwarePages
+from .queue import monotonic
 
 
 def _data_as_list(data):
@@ -25,16 +25,42 @@ def _data_as_list(data):
 
     Returns
     -------
-    list
-        List of integer byte values.
+    list or numpy.array
+        List of integer byte values, or ``uint8`` array if :data:`data` is an
+        array.
+
+    .. versionchanged:: 0.52
+        Return arrays as ``uint8`` arrays rather than converting to a list.
     '''
     if isinstance(data, np.ndarray):
-        data = data.tobytes()
+        return data.astype('uint8', copy=False)
     if isinstance(data, six.string_types):
         data = list(bytes(data))
     return data
 
 
+def _command_bytes(header, data):
+    '''
+    Parameters
+    ----------
+    header : list
+        Command header byte values.
+    data : list or numpy.array or str
+        Data bytes (see :func:`_data_as_list`).
+
+    Returns
+    -------
+    list or numpy.array
+        Header followed by data.
+
+    .. versionadded:: 0.52
+    '''
+    data = _data_as_list(data)
+    if isinstance(data, np.ndarray):
+        return np.concatenate([np.array(header, dtype='uint8'), data])
+    return header + data
+
+
 class TwiBootloader(object):
     def __init__(self, proxy, bootloader_address=0x29):
         '''
@@ -46,6 +72,10 @@ class TwiBootloader(object):
         '''
         self.proxy = proxy
         self.bootloader_address = bootloader_address
+        #: Per-page timing of most recent :meth:`write_firmware` call.
+        #:
+        #: .. versionadded:: 0.52
+        self.page_stats = []
 
     def abort_boot_timeout(self):
         '''
@@ -77,7 +107,7 @@ class TwiBootloader(object):
         data = self.proxy.i2c_read(self.bootloader_address, 8)
         return {
             'signature': data[:3].tolist(),
-            'page_size': data[3],
+            'page_size': int(data[3]),
             'flash_size': struct.unpack('>H', data[4:6])[0],
             'eeprom_size': struct.unpack('>H', data[6:8])[0]
         }
@@ -135,9 +165,8 @@ class TwiBootloader(object):
         """
         addrh = address >> 8 & 0xFF
         addrl = address & 0xFF
-        page = _data_as_list(page)
-        self.proxy.i2c_write(self.bootloader_address, [0x02, 0x01, addrh,
-                                                       addrl] + page)
+        self.proxy.i2c_write(self.bootloader_address,
+                             _command_bytes([0x02, 0x01, addrh, addrl], page))
 
     def write_eeprom(self, address, data):
         """
@@ -156,11 +185,84 @@ class TwiBootloader(object):
         """
         addrh = address >> 8 & 0xFF
         addrl = address & 0xFF
-        data = _data_as_list(data)
-        self.proxy.i2c_write(self.bootloader_address, [0x02, 0x02, addrh,
-                                                       addrl] + data)
+        self.proxy.i2c_write(self.bootloader_address,
+                             _command_bytes([0x02, 0x02, addrh, addrl], data))
+
+    def changed_pages(self, pages, addresses, page_size, delay_s=0.02):
+        '''
+        Compare pages against current flash contents.
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        pages : numpy.ndarray or list
+            Page contents, with one row (or list of integer byte values) per
+            page (see :func:`load_pages`).
+        addresses : numpy.ndarray or list
+            Flash start address of each page (see :func:`load_pages`).
+        page_size : int
+            Size of each page.
+        delay_s : float, optional
+            Time to wait after each read operation.
+
+        Returns
+        -------
+        list
+            Indexes of pages that differ from the current flash contents.
+
+            Pages already holding identical contents (including erased pages,
+            i.e., all ``0xFF``, in place of blank pages) are omitted.
+        '''
+        page_size = int(page_size)
+        changed = []
+        for i, page_i in enumerate(pages):
+            print('Compare page: %4d/%d   \r' % (i + 1, len(pages)), end=' ')
+            flash_data_i = self.read_flash(int(addresses[i]), page_size)
+            # Delay to allow bootloader to finish processing flash read.
+            time.sleep(delay_s)
+            if not np.array_equal(flash_data_i, page_i):
+                changed.append(i)
+        return changed
+
+    def wait_ready(self, timeout_s=1., initial_delay_s=0):
+        '''
+        Poll bootloader until it responds to a read request.
+
+        While ``twiboot`` is busy, e.g., writing a flash page, it does not
+        acknowledge its I2C address, so the read returns no data.
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum time to wait for bootloader to respond.
+        initial_delay_s : float, optional
+            Time to wait before polling, e.g., expected duration of operation.
+
+        Returns
+        -------
+        float
+            Time elapsed (in seconds) until bootloader responded.
 
-    def write_firmware(self, firmware_path, verify=True, delay_s=0.02):
+        Raises
+        ------
+        IOError
+            If bootloader does not respond within :data:`timeout_s`.
+        '''
+        start = monotonic()
+        if initial_delay_s > 0:
+            time.sleep(initial_delay_s)
+        while True:
+            if len(self.proxy.i2c_read(self.bootloader_address, 1)):
+                return monotonic() - start
+            if monotonic() - start > timeout_s:
+                raise IOError('Bootloader did not respond within %s s.' %
+                              timeout_s)
+
+    def write_firmware(self, firmware_path, verify=True, delay_s=0.02,
+                       differential=False, poll=True, skip_blank=False):
         '''
         Write `Intel HEX file`__ and split into pages.
 
@@ -173,18 +275,43 @@ class TwiBootloader(object):
         verify : bool, optional
             If ``True``, verify each page after it is written.
         delay_s : float, optional
-            Time to wait between each write/read operation.
+            Time to wait between each write/read operation (only used if
+            :data:`poll` is ``False``).
 
             This delay allows for operation to complete before triggering I2C
             next call.
+        differential : bool, optional
+            If ``True``, read back current flash contents first and only write
+            pages that differ (see :meth:`changed_pages`).
+        skip_blank : bool, optional
+            If ``True``, do not write pages that are entirely ``0xFF``.
+
+            .. warning::
+                Only use if flash memory has been erased, since blank pages
+                are left with their current contents.
+        poll : bool, optional
+            If ``True``, poll bootloader after each page write and proceed as
+            soon as it responds (see :meth:`wait_ready`), rather than waiting
+            a fixed delay.
+
+            Polling starts after a fraction of the median completion time
+            measured for previously written pages.
 
         Raises
         ------
         IOError
             If a flash page write fails after 10 retry attempts.
 
-            Delay is increased exponentially between operations from one
-            attempt to the next.
+            If :data:`poll` is ``False``, delay is increased exponentially
+            between operations from one attempt to the next.  If :data:`poll`
+            is ``True``, an attempt fails if the bootloader does not respond
+            within the maximum delay (see :meth:`wait_ready`).
+
+        Notes
+        -----
+        Per-page timing is stored in the :attr:`page_stats` list, with one
+        ``dict`` per written page containing the keys ``page``, ``attempts``,
+        and ``write_s`` (time until page write completed).
 
         .. versionchanged:: 0.34
             Prior to version 0.34, if a page write failed while writing
@@ -196,10 +323,33 @@ class TwiBootloader(object):
             As of version 0.34, retry failed page writes up to 10 times,
             increasing the delay between operations exponentially from one
             attempt to the next.
+
+        .. versionchanged:: 0.52
+            Add :data:`differential` argument.
+
+        .. versionchanged:: 0.52
+            Add :data:`poll` argument (enabled by default) and record per-page
+            timing in :attr:`page_stats`.
+
+        .. versionchanged:: 0.52
+            Add :data:`skip_blank` argument.
         '''
         chip_info = self.read_chip_info()
 
-        pages = load_pages(firmware_path, chip_info['page_size'])
+        firmware = load_pages(firmware_path, chip_info['page_size'])
+        pages = firmware.pages
+        if differential:
+            # Flash reads complete before the I2C read returns, so there is no
+            # need to delay between reads when polling.
+            page_indexes = self.changed_pages(pages, firmware.addresses,
+                                              chip_info['page_size'],
+                                              delay_s=0 if poll else delay_s)
+            print('Skip %d/%d unchanged pages.' %
+                  (len(pages) - len(page_indexes), len(pages)))
+        else:
+            page_indexes = list(range(len(pages)))
+        if skip_blank:
+            page_indexes = [i for i in page_indexes if not firmware.blank[i]]
 
         # At most, wait 100x the specified nominal delay during retries of
         # failed page writes.
@@ -210,34 +360,232 @@ class TwiBootloader(object):
                                       np.log(max_delay) / np.log(10), num=10,
                                       base=10)
 
-        for i, page_i in enumerate(pages):
+        self.page_stats = []
+        for k, i in enumerate(page_indexes):
+            page_i = pages[i]
             # If `verify` is `True`, retry failed page writes up to 10 times.
-            for delay_j in delay_durations:
-                print('Write page: %4d/%d     \r' % (i + 1, len(pages)),
+            for j, delay_j in enumerate(delay_durations):
+                print('Write page: %4d/%d     \r' % (k + 1, len(page_indexes)),
                       end=' ')
-                self.write_flash(i * chip_info['page_size'], page_i)
-                # Delay to allow bootloader to finish writing to flash.
-                time.sleep(delay_j)
+                self.write_flash(firmware.addresses[i], page_i)
+                if poll:
+                    # Start polling shortly before page write is expected to
+                    # complete, based on previously written pages.
+                    write_times = [stats_i['write_s']
+                                   for stats_i in self.page_stats]
+                    initial_s = (.8 * np.median(write_times)
+                                 if write_times else 0)
+                    try:
+                        write_s = self.wait_ready(timeout_s=max_delay,
+                                                  initial_delay_s=initial_s)
+                    except IOError:
+                        # Bootloader did not respond; write page again.
+                        continue
+                else:
+                    # Delay to allow bootloader to finish writing to flash.
+                    time.sleep(delay_j)
+                    write_s = delay_j
 
                 if not verify:
                     break
-                print('Verify page: %4d/%d    \r' % (i + 1, len(pages)),
+                print('Verify page: %4d/%d    \r' % (k + 1, len(page_indexes)),
                       end=' ')
                 # Verify written page.
-                verify_data_i = self.read_flash(i * chip_info['page_size'],
+                verify_data_i = self.read_flash(firmware.addresses[i],
                                                 chip_info['page_size'])
-                # Delay to allow bootloader to finish processing flash read.
-                time.sleep(delay_j)
-                try:
-                    if (verify_data_i == page_i).all():
-                        # Data page has been verified successfully.
-                        break
-                except AttributeError:
-                    # Data lengths do not match.
-                    pass
+                if not poll:
+                    # Delay to allow bootloader to finish processing flash
+                    # read.
+                    time.sleep(delay_j)
+                if np.array_equal(verify_data_i, page_i):
+                    # Data page has been verified successfully.
+                    break
             else:
                 raise IOError('Page write failed to verify for **all** '
                               'attempted delay durations.')
+            self.page_stats.append({'page': i, 'attempts': j + 1,
+                                    'write_s': write_s})
+
+
+def _write_bus_firmwares(jobs, verify, differential, skip_blank, max_attempts,
+                         timeout_s, progress):
+    '''
+    Write firmware to targets sharing a single I2C master, interleaving page
+    writes across targets.
+
+    See :func:`write_firmwares`.
+
+    .. versionadded:: 0.52
+    '''
+    active = []
+    for job in jobs:
+        bootloader = job['bootloader']
+        stats = job['stats']
+        job['start'] = time.time()
+        try:
+            job['page_size'] = bootloader.read_chip_info()['page_size']
+            job['firmware'] = load_pages(job['firmware_path'],
+                                         job['page_size'])
+            job['pages'] = job['firmware'].pages
+            if differential:
+                job['page_indexes'] = \
+                    bootloader.changed_pages(job['pages'],
+                                             job['firmware'].addresses,
+                                             job['page_size'], delay_s=0)
+            else:
+                job['page_indexes'] = list(range(len(job['pages'])))
+            if skip_blank:
+                job['page_indexes'] = [i for i in job['page_indexes']
+                                       if not job['firmware'].blank[i]]
+        except Exception as exception:
+            stats['error'] = str(exception)
+            stats['duration_s'] = time.time() - job['start']
+            continue
+        stats['pages_total'] = len(job['page_indexes'])
+        job['k'] = 0
+        job['attempts'] = 0
+        if job['page_indexes']:
+            active.append(job)
+        else:
+            stats['duration_s'] = time.time() - job['start']
+
+    while active:
+        # Start a page write on every active target before polling any of
+        # them, such that the flash write of each target overlaps the I2C
+        # transfers to the other targets.
+        for job in list(active):
+            i = job['page_indexes'][job['k']]
+            try:
+                job['bootloader'].write_flash(job['firmware'].addresses[i],
+                                              job['pages'][i])
+            except Exception as exception:
+                # Give up on this target, but continue writing the others.
+                stats = job['stats']
+                stats['error'] = str(exception)
+                stats['duration_s'] = time.time() - job['start']
+                active.remove(job)
+                if progress is not None:
+                    progress(dict(stats))
+
+        for job in list(active):
+            bootloader = job['bootloader']
+            stats = job['stats']
+            i = job['page_indexes'][job['k']]
+            try:
+                bootloader.wait_ready(timeout_s=timeout_s)
+                verified = (not verify or
+                            np.array_equal(bootloader
+                                           .read_flash(job['firmware']
+                                                       .addresses[i],
+                                                       job['page_size']),
+                                           job['pages'][i]))
+            except IOError:
+                # E.g., target did not complete page write in time.
+                verified = False
+            except Exception as exception:
+                # Give up on this target, but continue writing the others.
+                stats['error'] = str(exception)
+                verified = False
+
+            if verified:
+                job['k'] += 1
+                job['attempts'] = 0
+                stats['pages_written'] += 1
+            elif not stats['error']:
+                # Page is written again on next pass.
+                job['attempts'] += 1
+                stats['retries'] += 1
+                if job['attempts'] >= max_attempts:
+                    stats['error'] = ('Page %d failed to verify after %d '
+                                      'attempts.' % (i, max_attempts))
+
+            if stats['error'] or job['k'] >= len(job['page_indexes']):
+                stats['duration_s'] = time.time() - job['start']
+                active.remove(job)
+            if progress is not None:
+                progress(dict(stats))
+
+
+def write_firmwares(targets, verify=True, differential=False,
+                    skip_blank=False, max_attempts=10, timeout_s=1.,
+                    progress=None):
+    '''
+    Write firmware to multiple ``twiboot`` targets.
+
+    Targets attached to the same proxy (i.e., I2C master) are written
+    together, one page per target at a time, such that the flash write time of
+    each target overlaps the I2C transfer to the next.  Targets attached to
+    different proxies are written concurrently, in one thread per proxy.
+
+    .. versionadded:: 0.52
+
+    Parameters
+    ----------
+    targets : list
+        List of ``(proxy, bootloader_address, firmware_path)`` tuples.
+    verify : bool, optional
+        If ``True``, verify each page after it is written.
+    differential : bool, optional
+        If ``True``, only write pages that differ from current flash contents
+        (see :meth:`TwiBootloader.changed_pages`).
+    skip_blank : bool, optional
+        If ``True``, do not write pages that are entirely ``0xFF`` (see
+        :meth:`TwiBootloader.write_firmware`).
+    max_attempts : int, optional
+        Maximum number of attempts to write each page before giving up on
+        the respective target.
+    timeout_s : float, optional
+        Maximum time to wait for a target to complete each page write (see
+        :meth:`TwiBootloader.wait_ready`).
+    progress : function, optional
+        Callback function, called with a copy of the statistics ``dict`` of a
+        target (see below) each time a page write attempt for the target
+        completes.
+
+        .. warning::
+            Called from the thread of the respective proxy.
+
+    Returns
+    -------
+    list
+        One ``dict`` per target (in order of :data:`targets`) with the keys:
+
+         - ``proxy``, ``bootloader_address``, ``firmware_path``: target.
+         - ``pages_total``: number of pages to write.
+         - ``pages_written``: number of pages written (and verified).
+         - ``retries``: number of page write retries.
+         - ``duration_s``: time taken to write target.
+         - ``error``: ``None`` if successful; otherwise, error message.
+
+        Failure of one target does not interrupt writing other targets.
+    '''
+    jobs_by_proxy = {}
+    bus_jobs = []
+    results = []
+    for proxy, bootloader_address, firmware_path in targets:
+        stats = {'proxy': proxy, 'bootloader_address': bootloader_address,
+                 'firmware_path': firmware_path, 'pages_total': 0,
+                 'pages_written': 0, 'retries': 0, 'duration_s': None,
+                 'error': None}
+        job = {'bootloader': TwiBootloader(proxy, bootloader_address),
+               'firmware_path': firmware_path, 'stats': stats}
+        if id(proxy) not in jobs_by_proxy:
+            jobs_by_proxy[id(proxy)] = []
+            bus_jobs.append(jobs_by_proxy[id(proxy)])
+        jobs_by_proxy[id(proxy)].append(job)
+        results.append(stats)
+
+    threads = [threading.Thread(target=_write_bus_firmwares,
+                                args=(jobs_i, verify, differential,
+                                      skip_blank, max_attempts, timeout_s,
+                                      progress))
+               for jobs_i in bus_jobs]
+    for thread_i in threads:
+        thread_i.daemon = True
+        thread_i.start()
+    for thread_i in threads:
+        thread_i.join()
+    return results
 
 
 def load_pages(firmware_path, page_size):
@@ -255,20 +603,21 @@ def load_pages(firmware_path, page_size):
 
     Returns
     -------
-    list
-        List of page contents, where each page is represented as a list of
-        integer byte values.
+    FirmwarePages
+        Named tuple with the fields:
+
+         - ``pages``: ``uint8`` array with one row of :data:`page_size` bytes
+           per page.
+         - ``addresses``: start address of each page.
+         - ``blank``: ``True`` for each page that is entirely ``0xFF``.
+
+    .. versionchanged:: 0.52
+        Return :class:`FirmwarePages` with pages as rows of a 2D ``uint8``
+        array, rather than a list of lists of integer byte values.  Gaps
+        between data records are filled with 0xFF.
+
+        Load through :data:`base_node_rpc.firmware_cache.DEFAULT_CACHE`, such
+        that each firmware image is only parsed once.  Returned arrays are
+        read-only.
     '''
-    firmware_path = ph.path(firmware_path)
-    with firmware_path.open('r') as input_:
-        data = input_.read()
-
-    df_data = parse_intel_hex(data)
-    data_bytes = list(it.chain(*df_data.loc[df_data.record_type == 0, 'data']))
-
-    pages = [data_bytes[i:i + page_size]
-             for i in range(0, len(data_bytes), page_size)]
-
-    # Pad end of last page with 0xFF to fill full page size.
-    pages[-1].extend([0xFF] * (page_size - len(pages[-1])))
-    return pages
+    return DEFAULT_CACHE.pages(firmware_path, page_size)
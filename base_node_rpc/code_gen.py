@@ -0,0 +1,89 @@
+'''
+Helpers for writing generated code.
+
+Generated code is stamped with a hash of its contents (rather than the time
+of generation) and only written if changed, such that regenerating code does
+not trigger a rebuild of unchanged sources.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+import hashlib
+import io
+import os
+
+import six
+
+
+def write_if_changed(output_path, content):
+    '''
+    Write content to file, *unless* the file already has the same content.
+
+    Leaving unchanged files untouched (i.e., not updating the modified time)
+    avoids invalidating downstream builds, e.g., PlatformIO recompiling all
+    sources including a generated header.
+
+    Parameters
+    ----------
+    output_path : str
+        Output file path.
+    content : str
+        Content to write.
+
+    Returns
+    -------
+    bool
+        ``True`` if file was written.
+    '''
+    if isinstance(content, six.binary_type):
+        content = content.decode('utf8')
+    output_path = six.text_type(output_path)
+    if os.path.isfile(output_path):
+        with io.open(output_path, 'r', encoding='utf8', newline='') as input_:
+            if input_.read() == content:
+                return False
+    with io.open(output_path, 'w', encoding='utf8', newline='') as output:
+        output.write(content)
+    return True
+
+
+def content_stamp(code):
+    '''
+    Parameters
+    ----------
+    code : str
+        Generated code.
+
+    Returns
+    -------
+    str
+        Stamp identifying :data:`code` by content hash (e.g.,
+        ``sha1:0beec7b5ea3f0fdb``), i.e., unlike a timestamp, the stamp only
+        changes if the generated code changes.
+    '''
+    if not isinstance(code, six.binary_type):
+        code = code.encode('utf8')
+    return 'sha1:%s' % hashlib.sha1(code).hexdigest()[:16]
+
+
+def stamp_code(warning_message, code, separator=''):
+    '''
+    Prepend auto-generated warning to generated code.
+
+    Parameters
+    ----------
+    warning_message : str
+        Warning message with a single ``%s`` placeholder (e.g.,
+        :data:`arduino_rpc.code_gen.C_GENERATED_WARNING_MESSAGE`), filled with
+        the :func:`content_stamp` of :data:`code`.
+    code : str
+        Generated code.
+    separator : str, optional
+        String inserted between warning and code.
+
+    Returns
+    -------
+    str
+        Generated code, prefixed with warning.
+    '''
+    return (warning_message % content_stamp(code)) + separator + code
@@ -0,0 +1,329 @@
+'''
+Precompiled request encoders and response decoders for generated proxy
+methods.
+
+Generated proxy methods encode each request generically (e.g., building a
+structured array describing the arguments on every call).  For each command
+with a supported signature, :func:`install_codecs` replaces the generated
+method with a fast method that encodes the request using a precompiled
+:class:`struct.Struct` (and NumPy dtypes for array arguments) and decodes
+the response using a precompiled NumPy dtype.
+
+The first call of each fast method also calls the generated method and
+compares both the encoded request and the decoded response.  If either
+differs, the generated method is used from then on.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+from collections import OrderedDict
+import functools
+import logging
+import struct
+import threading
+
+from nadamq.NadaMq import cPacket, PACKET_TYPES
+import numpy as np
+import six
+
+logger = logging.getLogger(__name__)
+
+#: NumPy dtype of each supported C atom type.
+ATOM_DTYPES = {'bool': 'bool', 'int8_t': 'int8', 'uint8_t': 'uint8',
+               'int16_t': 'int16', 'uint16_t': 'uint16', 'int32_t': 'int32',
+               'uint32_t': 'uint32', 'int64_t': 'int64',
+               'uint64_t': 'uint64', 'float': 'float32',
+               'double': 'float64'}
+
+#: :mod:`struct` format character of each supported NumPy dtype (i.e.,
+#: standard size, as on the device).
+DTYPE_FORMATS = {'bool': '?', 'int8': 'b', 'uint8': 'B', 'int16': 'h',
+                 'uint16': 'H', 'int32': 'i', 'uint32': 'I', 'int64': 'q',
+                 'uint64': 'Q', 'float32': 'f', 'float64': 'd'}
+
+#: :mod:`struct` format character of each pointer width (in bits).
+POINTER_FORMATS = {16: 'H', 32: 'I', 64: 'Q'}
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def command_signatures(df_sig):
+    '''
+    Extract signature of each command with a supported signature (i.e.,
+    scalar and one-dimensional array arguments and return values of types
+    listed in :data:`ATOM_DTYPES`).
+
+    Parameters
+    ----------
+    df_sig : pandas.DataFrame
+        Method signature frame (e.g., as returned by
+        :func:`base_node_rpc.method_sig_cache.get_method_sig_frame`).
+
+    Returns
+    -------
+    collections.OrderedDict
+        ``(arguments, return)`` tuple for each supported command, keyed by
+        method name, where ``arguments`` is a tuple of ``(name, dtype,
+        is_array)`` tuples and ``return`` is either ``None`` (i.e., no return
+        value) or a ``(dtype, is_array)`` tuple.
+    '''
+    signatures = OrderedDict()
+    for method_name_i, df_i in df_sig.groupby('method_name', sort=False):
+        first = df_i.iloc[0]
+        try:
+            args = []
+            for j, row_j in df_i.iterrows():
+                if _is_null(row_j.get('arg_name')):
+                    continue
+                ndims = 0 if _is_null(row_j.get('ndims')) else row_j.ndims
+                if ndims > 1:
+                    raise KeyError(ndims)
+                # Cast to `bool`, since `repr` of a NumPy boolean is not a
+                # valid literal (see :func:`get_command_signatures_code`).
+                args.append((str(row_j.arg_name),
+                             ATOM_DTYPES[row_j.atom_type], bool(ndims == 1)))
+
+            return_atom_type = first.get('return_atom_type')
+            if _is_null(return_atom_type) or return_atom_type == 'void':
+                return_ = None
+            else:
+                return_ndims = first.get('return_ndims')
+                if _is_null(return_ndims):
+                    return_array = 'Array' in str(first.get('return_type'))
+                else:
+                    return_array = return_ndims > 0
+                return_ = (ATOM_DTYPES[return_atom_type], bool(return_array))
+        except KeyError:
+            # Unsupported argument or return type.
+            continue
+        signatures[str(method_name_i)] = (tuple(args), return_)
+    return signatures
+
+
+def get_command_signatures_code(df_sig, pointer_width=16,
+                                class_name='Proxy'):
+    '''
+    Returns
+    -------
+    str
+        Python code (e.g., for the footer of a generated ``node.py``) that
+        installs precompiled codecs for each supported command of the
+        specified proxy class (see :func:`install_codecs`).
+    '''
+    signatures = command_signatures(df_sig)
+    lines = ['', '',
+             '#: Signature of each command with a precompiled codec (see',
+             '#: :func:`base_node_rpc.command_codec.install_codecs`).',
+             'COMMAND_SIGNATURES = {']
+    for name_i, (args_i, return_i) in signatures.items():
+        lines.append('    %r: (%r, %r),' % (name_i, args_i, return_i))
+    lines += ['}', '',
+              'install_codecs(%s, COMMAND_SIGNATURES, pointer_width=%d)' %
+              (class_name, pointer_width)]
+    return '\n'.join(lines) + '\n'
+
+
+class CommandCodec(object):
+    '''
+    Precompiled request encoder and response decoder for a command.
+
+    Parameters
+    ----------
+    args : tuple
+        ``(name, dtype, is_array)`` tuple for each argument.
+    return_ : tuple or None
+        ``(dtype, is_array)`` tuple, or ``None`` if command does not return
+        a value.
+    pointer_width : int, optional
+        Device pointer width in bits.
+
+    Attributes
+    ----------
+    fixed_size : bool
+        ``True`` if request size does not depend on the arguments (i.e., no
+        array arguments).
+    verified : bool or None
+        ``True`` if codec was verified to match the generated method,
+        ``False`` if it does not match, or ``None`` if not yet verified.
+    '''
+    def __init__(self, args, return_, pointer_width=16):
+        self.args = tuple(args)
+        self.return_ = return_
+        self.arg_count = len(self.args)
+        self.fixed_size = not any(is_array_i for name_i, dtype_i, is_array_i
+                                  in self.args)
+        self.verified = None
+        self._lock = threading.Lock()
+
+        pointer_format = POINTER_FORMATS[pointer_width]
+        format_ = '<H'
+        for name_i, dtype_i, is_array_i in self.args:
+            if is_array_i:
+                # Array length and pointer to array data (relative to start
+                # of arguments).
+                format_ += 'H' + pointer_format
+            else:
+                format_ += DTYPE_FORMATS[dtype_i]
+        self._struct = struct.Struct(format_)
+        # Array dtype of each argument (``None`` for scalar arguments).
+        self._array_dtypes = [np.dtype(dtype_i) if is_array_i else None
+                              for name_i, dtype_i, is_array_i in self.args]
+        if return_ is None:
+            self._return_dtype = None
+        else:
+            self._return_dtype = np.dtype(return_[0])
+
+    def encode(self, code, *args):
+        '''
+        Parameters
+        ----------
+        code : int
+            Command code.
+        *args
+            Command arguments.
+
+        Returns
+        -------
+        bytes
+            Request payload.
+
+        Raises
+        ------
+        struct.error
+            If an argument cannot be encoded as the respective type.
+        '''
+        if self.fixed_size:
+            return self._struct.pack(code, *args)
+        values = []
+        arrays = []
+        offset = self._struct.size - 2
+        for value_i, dtype_i in zip(args, self._array_dtypes):
+            if dtype_i is None:
+                values.append(value_i)
+                continue
+            array_i = np.ascontiguousarray(value_i, dtype=dtype_i)
+            values += [array_i.size, offset]
+            offset += array_i.nbytes
+            arrays.append(array_i.tobytes())
+        return self._struct.pack(code, *values) + b''.join(arrays)
+
+    def decode(self, response):
+        '''
+        Parameters
+        ----------
+        response : nadamq.NadaMq.cPacket or None
+            Response packet (``None`` for a fire-and-forget request).
+
+        Returns
+        -------
+        numpy.ndarray or numpy.generic or None
+            Decoded return value.
+        '''
+        if self._return_dtype is None or response is None:
+            return None
+        result = np.frombuffer(response.data(), dtype=self._return_dtype)
+        if self.return_[1]:
+            return result.copy()
+        # Return type is a scalar, so return first (and only) element.
+        return result[0]
+
+
+def _same_result(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    a = np.asarray(a)
+    b = np.asarray(b)
+    return (a.dtype == b.dtype and a.shape == b.shape and
+            a.tobytes() == b.tobytes())
+
+
+class _CaptureProxy(object):
+    '''
+    Proxy wrapper recording the request payload sent by a generated method.
+    '''
+    def __init__(self, proxy):
+        self._proxy = proxy
+        self.request = None
+        self.response = None
+
+    def __getattr__(self, name):
+        return getattr(self._proxy, name)
+
+    def _send_command(self, packet, *args, **kwargs):
+        self.request = packet.data()
+        self.response = self._proxy._send_command(packet, *args, **kwargs)
+        return self.response
+
+
+def _fast_method(name, codec, code_attr, original):
+    def method(self, *args, **kwargs):
+        if (kwargs or len(args) != codec.arg_count or
+                codec.verified is False or not self.fast_commands):
+            return original(self, *args, **kwargs)
+        code = getattr(self, code_attr)
+        try:
+            payload = codec.encode(code, *args)
+        except (struct.error, TypeError, ValueError, OverflowError):
+            # E.g., argument out of range; use generated method instead.
+            return original(self, *args)
+
+        if codec.verified is None:
+            # Call generated method and compare request and response.
+            capture = _CaptureProxy(self)
+            result = original(capture, *args)
+            with codec._lock:
+                if codec.verified is None:
+                    codec.verified = (capture.request == payload and
+                                      _same_result(codec
+                                                   .decode(capture.response),
+                                                   result))
+                    if not codec.verified:
+                        logger.debug('Precompiled codec does not match '
+                                     'generated method `%s`.', name)
+            return result
+
+        # Size of fixed-size requests was checked on first call.
+        response = self._send_command(cPacket(data=payload,
+                                              type_=PACKET_TYPES.DATA),
+                                      bounds_checked=codec.fixed_size)
+        return codec.decode(response)
+
+    functools.update_wrapper(method, original)
+    method.codec = codec
+    return method
+
+
+def install_codecs(proxy_class, signatures, pointer_width=16):
+    '''
+    Replace generated methods of proxy class with fast methods using
+    precompiled codecs.
+
+    Parameters
+    ----------
+    proxy_class : type
+        Generated proxy class, with a ``_CMD_<NAME>`` class attribute (command
+        code) for each command method.
+    signatures : dict
+        Signature of each command, keyed by method name (see
+        :func:`command_signatures`).
+    pointer_width : int, optional
+        Device pointer width in bits.
+
+    Returns
+    -------
+    collections.OrderedDict
+        Installed codec of each command, keyed by method name.
+    '''
+    codecs = OrderedDict()
+    for name_i, (args_i, return_i) in six.iteritems(signatures):
+        code_attr = '_CMD_%s' % name_i.upper()
+        original = proxy_class.__dict__.get(name_i)
+        if original is None or not hasattr(proxy_class, code_attr):
+            continue
+        codec = CommandCodec(args_i, return_i, pointer_width=pointer_width)
+        setattr(proxy_class, name_i, _fast_method(name_i, codec, code_attr,
+                                                  original))
+        codecs[name_i] = codec
+    return codecs
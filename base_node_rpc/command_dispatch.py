@@ -0,0 +1,275 @@
+'''
+Generate C++ ``CommandProcessor`` header code with command dispatch ordered by
+command code.
+
+Equivalent to
+:func:`arduino_rpc.rpc_data_frame.get_c_command_processor_header_code`,
+except that the code to decode the arguments of each command (and encode the
+result) is generated as a separate static *stub* function, and dispatch is
+generated as either:
+
+ - ``switch``: a ``switch`` statement with cases ordered by command code,
+   such that the compiler may lower it to a jump table; or
+ - ``table``: a dense table of stub function pointers indexed by command code
+   and stored in flash (i.e., ``PROGMEM`` on AVR), such that dispatch is a
+   single bounds check and indirect call regardless of the number of
+   commands.  A ``static_assert`` (requires C++11) checks that the
+   ``CMD_<NAME>`` code of each command in ``Commands.h`` matches its table
+   index.
+
+Like :mod:`arduino_rpc`, a processing error (i.e., unknown command) is
+indicated by a result with ``NULL`` data and a non-zero length.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+
+import jinja2
+
+#: Supported command dispatch modes.
+DISPATCH_MODES = ('switch', 'table')
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def command_stubs(df_sig_info):
+    '''
+    Parameters
+    ----------
+    df_sig_info : pandas.DataFrame
+        Method signature frame, with one row per method argument (see
+        :func:`arduino_rpc.code_gen.get_multilevel_method_sig_frame`).
+
+    Returns
+    -------
+    list
+        ``dict`` describing stub of each command, ordered by command code.
+    '''
+    stubs = []
+    for code_i, df_i in df_sig_info.groupby('method_i', sort=True):
+        first = df_i.iloc[0]
+        args = [row_j for j, row_j in df_i.iterrows()
+                if not _is_null(row_j.get('arg_name'))]
+        return_atom_type = first.get('return_atom_type')
+        if _is_null(return_atom_type) or return_atom_type == 'void':
+            return_ = None
+        elif (not _is_null(first.get('return_ndims')) and
+              first.return_ndims > 0):
+            return_ = 'array'
+        else:
+            return_ = 'scalar'
+        stubs.append({'code': int(code_i),
+                      'name': str(first.method_name),
+                      'camel_name': str(first.camel_name),
+                      'arg_names': [str(row_j.arg_name) for row_j in args],
+                      'arrays': [(str(row_j.arg_name), str(row_j.atom_type))
+                                 for row_j in args
+                                 if not _is_null(row_j.get('ndims')) and
+                                 row_j.ndims > 0],
+                      'return': return_})
+    return stubs
+
+
+_TEMPLATE = jinja2.Template(r'''
+#ifndef ___{{ namespace.upper() }}__COMMAND_PROCESSOR___
+#define ___{{ namespace.upper() }}__COMMAND_PROCESSOR___
+
+#include "CArrayDefs.h"
+#include "Commands.h"
+{%- if dispatch == 'table' %}
+#if defined(__AVR__)
+#include <avr/pgmspace.h>
+#endif
+#ifndef PROGMEM
+#define PROGMEM
+#endif
+{%- endif %}
+
+{% if extra_header is not none %}
+{{ extra_header }}
+{% endif %}
+
+namespace {{ namespace }} {
+
+template <typename Obj>
+class CommandProcessor {
+  /* # `CommandProcessor` #
+   *
+   * Each call to `process_command` processes a single command, dispatched
+   * by command code using a {{ 'table of stub function pointers stored in '
+   'flash' if dispatch == 'table' else '`switch` ordered by command code' }}.
+   *
+   * Each stub decodes the request arguments, calls the corresponding method
+   * of the wrapped object, and encodes the result. */
+protected:
+  Obj &obj_;
+
+{%- for stub in stubs %}
+
+  static UInt8Array _{{ stub.name }}(Obj &obj, UInt8Array request_arr,
+                                     UInt8Array buffer) {
+    UInt8Array result;
+{%- if stub.arg_names %}
+    /* Cast buffer as request. */
+    {{ stub.camel_name }}Request &request = *(reinterpret_cast
+                                 <{{ stub.camel_name }}Request *>
+                                 (&request_arr.data[2]));
+{%- endif %}
+{%- if stub.arrays %}
+    /* Add relative array data offsets to start payload structure. */
+{%- for arg_name, atom_type in stub.arrays %}
+    request.{{ arg_name }}.data = ({{ atom_type }} *)((uint8_t *)&request + (size_t)request.{{ arg_name }}.data);
+{%- endfor %}
+{%- endif %}
+{%- if stub.return is none %}
+    obj.{{ stub.name }}({{ stub.arg_names|map('add_request')|join(', ') }});
+    result.data = buffer.data;
+    result.length = 0;
+{%- else %}
+    {{ stub.camel_name }}Response response;
+
+    response.result = obj.{{ stub.name }}({{ stub.arg_names|map('add_request')|join(', ') }});
+{%- if stub.return == 'array' %}
+    /* Result type is an array, so return pointer to array data. */
+    result.data = (uint8_t *)response.result.data;
+    result.length = (response.result.length *
+                     sizeof(response.result.data[0]));
+{%- else %}
+    /* Cast start of buffer as reference of result type and assign result. */
+    {{ stub.camel_name }}Response &output = *(reinterpret_cast
+                                  <{{ stub.camel_name }}Response *>
+                                  (&buffer.data[0]));
+    output = response;
+    result.data = buffer.data;
+    result.length = sizeof(output);
+{%- endif %}
+{%- endif %}
+    return result;
+  }
+{%- endfor %}
+
+  static UInt8Array _unknown_command(Obj &obj, UInt8Array request_arr,
+                                     UInt8Array buffer) {
+    UInt8Array result;
+    result.length = 0xFFFFFFFF;
+    result.data = NULL;
+    return result;
+  }
+{%- if dispatch == 'table' %}
+
+  typedef UInt8Array (*stub_t)(Obj &, UInt8Array, UInt8Array);
+  /* Stub of each command, indexed by command code. */
+  static const stub_t stubs_[{{ table|length }}];
+{%- endif %}
+public:
+  CommandProcessor(Obj &obj) : obj_(obj) {}
+
+  UInt8Array process_command(UInt8Array request_arr, UInt8Array buffer) {
+    /* ## Call operator ##
+     *
+     * Arguments:
+     *
+     *  - `request_arr`: Serialized command request structure array,
+     *  - `buffer`: Buffer array (available for writing output). */
+    uint16_t &command = *reinterpret_cast<uint16_t *>(&request_arr.data[0]);
+{%- if dispatch == 'table' %}
+
+    if (command >= {{ table|length }}) {
+      return _unknown_command(obj_, request_arr, buffer);
+    }
+#if defined(__AVR__)
+    stub_t stub = reinterpret_cast<stub_t>(pgm_read_word(&stubs_[command]));
+#else
+    stub_t stub = stubs_[command];
+#endif
+    return stub(obj_, request_arr, buffer);
+{%- else %}
+
+    switch (command) {
+{%- for stub in stubs %}
+      case CMD_{{ stub.name.upper() }}:
+        return _{{ stub.name }}(obj_, request_arr, buffer);
+{%- endfor %}
+      default:
+        return _unknown_command(obj_, request_arr, buffer);
+    }
+{%- endif %}
+  }
+};
+{%- if dispatch == 'table' %}
+
+template <typename Obj>
+const typename CommandProcessor<Obj>::stub_t
+CommandProcessor<Obj>::stubs_[{{ table|length }}] PROGMEM = {
+{%- for stub in table %}
+  &CommandProcessor<Obj>::_{{ stub.name if stub else 'unknown_command' }},
+{%- endfor %}
+};
+
+/* Table is indexed by command code, so codes in `Commands.h` must match. */
+{%- for stub in stubs %}
+static_assert(CMD_{{ stub.name.upper() }} == {{ stub.code }},
+              "`CMD_{{ stub.name.upper() }}` does not match command table.");
+{%- endfor %}
+{%- endif %}
+
+}  // namespace {{ namespace }}
+
+{% if extra_footer is not none %}
+{{ extra_footer }}
+{% endif %}
+
+#endif  // ifndef ___{{ namespace.upper() }}___
+'''.strip())
+_TEMPLATE.environment.filters['add_request'] = lambda name: 'request.' + name
+
+
+def get_c_command_processor_header_code(df_sig_info, namespace,
+                                        dispatch='switch', extra_header=None,
+                                        extra_footer=None, **kwargs):
+    '''
+    Generate C++ command processor header code (see module docstring).
+
+    Parameters
+    ----------
+    df_sig_info : pandas.DataFrame
+        Method signature frame, with one row per method argument (see
+        :func:`arduino_rpc.code_gen.get_multilevel_method_sig_frame`).
+    namespace : str
+        Namespace to wrap ``CommandProcessor`` in.
+    dispatch : str, optional
+        Command dispatch mode (see :data:`DISPATCH_MODES`).
+    extra_header : str, optional
+        Extra text to insert before namespace.
+    extra_footer : str, optional
+        Extra text to insert after namespace.
+    **kwargs
+        Ignored (e.g., ``pointer_width``).
+
+    Returns
+    -------
+    str
+        C++ header code.
+
+    Raises
+    ------
+    ValueError
+        If :data:`dispatch` is not a supported dispatch mode.
+    '''
+    if dispatch not in DISPATCH_MODES:
+        raise ValueError('Dispatch mode must be one of: %s' %
+                         ', '.join(DISPATCH_MODES))
+    stubs = command_stubs(df_sig_info)
+    if not stubs:
+        # Table must have at least one entry.
+        dispatch = 'switch'
+    # Dense table of stubs, indexed by command code (`None` for codes without
+    # a command).
+    table = [None] * (stubs[-1]['code'] + 1 if stubs else 0)
+    for stub_i in stubs:
+        table[stub_i['code']] = stub_i
+    return _TEMPLATE.render(stubs=stubs, table=table, namespace=namespace,
+                            dispatch=dispatch, extra_header=extra_header,
+                            extra_footer=extra_footer)
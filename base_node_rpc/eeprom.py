@@ -0,0 +1,265 @@
+'''
+Paged, cached view of device EEPROM.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+
+from six.moves import range
+import numpy as np
+
+#: Number of bytes of ``update_eeprom_block`` request payload used by the
+#: command code and arguments (i.e., not available for data).
+REQUEST_OVERHEAD = 16
+
+
+def _crc16_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for j in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data, crc=0xFFFF):
+    '''
+    Compute CRC-16 (polynomial ``0xA001``), matching ``_crc16_update()`` from
+    ``<util/crc16.h>`` as used by the ``eeprom_crc16`` device command.
+
+    Parameters
+    ----------
+    data : bytes or list or numpy.ndarray
+        Data bytes.
+    crc : int, optional
+        Initial value.
+
+    Returns
+    -------
+    int
+        CRC-16 of :data:`data`.
+    '''
+    if isinstance(data, np.ndarray):
+        data = data.astype('uint8', copy=False).tobytes()
+    for byte_i in bytearray(data):
+        crc = (crc >> 8) ^ CRC16_TABLE[(crc ^ byte_i) & 0xFF]
+    return crc
+
+
+class EepromView(object):
+    '''
+    Sliceable ``uint8`` view of device EEPROM.
+
+    Reads are performed in pages sized to the maximum packet payload size of
+    the device and cached.  Writes are held in a write-back cache until
+    :meth:`flush` is called, at which point only contiguous ranges of
+    modified bytes are written to the device.
+
+    Example
+    -------
+
+    >>> proxy.eeprom[:16]  # Read first page.
+    >>> proxy.eeprom[4:8] = [1, 2, 3, 4]  # Cached write.
+    >>> proxy.eeprom.flush()  # Write modified bytes to device.
+
+    Parameters
+    ----------
+    proxy : base_node_rpc.proxy.ProxyBase
+        Proxy with ``read_eeprom_block``, ``update_eeprom_block``, and
+        ``eeprom_e2end`` commands (see ``BaseNodeEeprom``).
+    page_size : int, optional
+        Number of bytes per read/write request.
+
+        Default: maximum packet payload size less request overhead.
+    max_gap : int, optional
+        Modified ranges separated by at most this number of cached,
+        unmodified bytes are written in a single request.
+    '''
+    def __init__(self, proxy, page_size=None, max_gap=REQUEST_OVERHEAD):
+        self.proxy = proxy
+        self.max_gap = max_gap
+        self._page_size = page_size
+        self._size = None
+        self._data = None
+        # Bytes with known contents (i.e., read from device or written).
+        self._cached = None
+        # Bytes written but not yet flushed to device.
+        self._dirty = None
+
+    @property
+    def size(self):
+        '''
+        EEPROM size in bytes.
+        '''
+        if self._size is None:
+            self._size = int(self.proxy.eeprom_e2end()) + 1
+            self._data = np.zeros(self._size, dtype='uint8')
+            self._cached = np.zeros(self._size, dtype=bool)
+            self._dirty = np.zeros(self._size, dtype=bool)
+        return self._size
+
+    @property
+    def page_size(self):
+        '''
+        Number of bytes per read/write request.
+        '''
+        if self._page_size is None:
+            self._page_size = int(self.proxy.buffer_size) - REQUEST_OVERHEAD
+        return self._page_size
+
+    @property
+    def dirty(self):
+        '''
+        ``True`` if there are cached writes that have not been flushed.
+        '''
+        return self._dirty is not None and bool(self._dirty.any())
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return '<%s size=%s>' % (self.__class__.__name__, self._size)
+
+    def _indexes(self, key):
+        if isinstance(key, slice):
+            return np.arange(*key.indices(self.size))
+        indexes = np.arange(self.size)[key]
+        return indexes
+
+    def _fetch(self, indexes):
+        '''
+        Read pages containing any uncached byte in :data:`indexes`.
+        '''
+        missing = indexes[~self._cached[indexes]]
+        if not missing.size:
+            return
+        page_size = self.page_size
+        for page_i in np.unique(missing // page_size):
+            start = int(page_i * page_size)
+            n = min(page_size, self.size - start)
+            data = np.asarray(self.proxy.read_eeprom_block(start, n),
+                              dtype='uint8')
+            # Do not overwrite pending writes.
+            keep = self._dirty[start:start + n]
+            self._data[start:start + n][~keep] = data[~keep]
+            self._cached[start:start + n] = True
+
+    def __getitem__(self, key):
+        indexes = self._indexes(key)
+        self._fetch(np.atleast_1d(indexes))
+        if np.ndim(indexes) == 0:
+            return int(self._data[indexes])
+        return self._data[indexes].copy()
+
+    def __setitem__(self, key, value):
+        indexes = self._indexes(key)
+        self._data[indexes] = value
+        self._cached[indexes] = True
+        self._dirty[indexes] = True
+
+    def __array__(self, dtype=None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype)
+
+    def dirty_ranges(self):
+        '''
+        Returns
+        -------
+        list
+            ``(address, size)`` tuples of ranges to write on :meth:`flush`.
+
+            Modified ranges separated by at most :attr:`max_gap` cached
+            bytes are merged, and ranges are split to fit :attr:`page_size`.
+        '''
+        if not self.dirty:
+            return []
+        dirty = np.concatenate([[False], self._dirty, [False]])
+        edges = np.flatnonzero(np.diff(dirty.astype('int8')))
+        starts, ends = edges[::2], edges[1::2]
+
+        merged = [[int(starts[0]), int(ends[0])]]
+        for start_i, end_i in zip(starts[1:], ends[1:]):
+            previous = merged[-1]
+            if (start_i - previous[1] <= self.max_gap and
+                    self._cached[previous[1]:start_i].all()):
+                previous[1] = int(end_i)
+            else:
+                merged.append([int(start_i), int(end_i)])
+
+        return [(address, min(self.page_size, end - address))
+                for start, end in merged
+                for address in range(start, end, self.page_size)]
+
+    def flush(self):
+        '''
+        Write modified bytes to device.
+        '''
+        for address_i, size_i in self.dirty_ranges():
+            self.proxy.update_eeprom_block(address_i,
+                                           self._data[address_i:address_i +
+                                                      size_i])
+            self._dirty[address_i:address_i + size_i] = False
+        # Wait for any pipelined writes to complete.
+        self.proxy.flush()
+
+    def crc16(self, address=0, n=None):
+        '''
+        Compute CRC-16 of EEPROM range on the device, i.e., without reading
+        the contents (see :func:`crc16`).
+
+        Parameters
+        ----------
+        address : int, optional
+            First address.
+        n : int, optional
+            Number of bytes (default: through end of EEPROM).
+
+        Returns
+        -------
+        int
+            CRC-16 of device EEPROM contents.
+        '''
+        if n is None:
+            n = self.size - address
+        return int(self.proxy.eeprom_crc16(address, n))
+
+    def verify(self, address=0, n=None):
+        '''
+        Check whether contents of view match device EEPROM by comparing
+        CRC-16 of cached contents against CRC-16 computed by device.
+
+        Uncached bytes in range are read first.  If the contents do not
+        match, cached contents in range are invalidated (except unflushed
+        writes, which always cause a mismatch).
+
+        Parameters
+        ----------
+        address : int, optional
+            First address.
+        n : int, optional
+            Number of bytes (default: through end of EEPROM).
+
+        Returns
+        -------
+        bool
+            ``True`` if contents of view match device.
+        '''
+        if n is None:
+            n = self.size - address
+        data = self[address:address + n]
+        if crc16(data) == self.crc16(address, n):
+            return True
+        self._cached[address:address + n] = self._dirty[address:address + n]
+        return False
+
+    def invalidate(self):
+        '''
+        Discard cached contents (except unflushed writes), such that
+        subsequent reads are performed on the device.
+        '''
+        if self._cached is not None:
+            self._cached[:] = self._dirty
@@ -0,0 +1,203 @@
+'''
+Content-addressed cache of parsed firmware images.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+from collections import OrderedDict, namedtuple
+import hashlib
+import io
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .intel_hex import parse_intel_hex_image
+
+
+#: Pages of a firmware image (see :func:`split_pages`).
+FirmwarePages = namedtuple('FirmwarePages', 'pages addresses blank')
+
+
+def split_pages(image, page_size):
+    '''
+    Split memory image into pages, starting at address 0.
+
+    Parameters
+    ----------
+    image : base_node_rpc.intel_hex.MemoryImage
+        Memory image.
+    page_size : int
+        Size of each page.
+
+    Returns
+    -------
+    FirmwarePages
+        Named tuple with the fields:
+
+         - ``pages``: ``uint8`` array with one row of :data:`page_size` bytes
+           per page.  Gaps and end of last page are filled with ``0xFF``.
+         - ``addresses``: start address of each page.
+         - ``blank``: ``True`` for each page that is entirely ``0xFF``.
+    '''
+    page_size = int(page_size)
+    page_count = -(-image.end // page_size)
+    pages = image.tobytes(start=0, end=page_count * page_size)\
+        .reshape(page_count, page_size)
+    return _firmware_pages(pages)
+
+
+def _firmware_pages(pages):
+    return FirmwarePages(pages, np.arange(pages.shape[0]) * pages.shape[1],
+                         (pages == 0xFF).all(axis=1))
+
+
+def _map_pages(cache_path, page_size):
+    '''
+    Returns
+    -------
+    numpy.memmap
+        Read-only map of pages stored in cache file, or ``None`` if the file
+        is empty or truncated (i.e., its size is not a multiple of
+        :data:`page_size`), e.g., if it was not completely written.
+    '''
+    try:
+        size = os.path.getsize(cache_path)
+        if not size or size % page_size:
+            return None
+        return np.memmap(cache_path, dtype='uint8', mode='r')\
+            .reshape(-1, page_size)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+class FirmwareCache(object):
+    '''
+    Cache of parsed firmware images, keyed by SHA-1 hash of file contents.
+
+    Parsed images and page layouts (one per page size) are kept in memory.
+    If :attr:`cache_dir` is set, page layouts are also stored on disk as raw
+    binary files and memory-mapped on subsequent use, e.g., by other
+    processes.
+
+    Cached arrays are read-only.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory for on-disk cache.  If ``None``, cache in memory only.
+    max_entries : int, optional
+        Maximum number of firmware images kept in memory.
+    '''
+    def __init__(self, cache_dir=None, max_entries=32):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        '''
+        Clear in-memory cache.
+        '''
+        with self._lock:
+            self._entries.clear()
+
+    def _entry(self, firmware_path):
+        with io.open(firmware_path, 'rb') as input_:
+            data = input_.read()
+        digest = hashlib.sha1(data).hexdigest()
+
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is None:
+                entry = {'data': data, 'image': None, 'pages': {}}
+            # Most recently used entry is last.
+            self._entries[digest] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digest, entry
+
+    def image(self, firmware_path):
+        '''
+        Parameters
+        ----------
+        firmware_path : str
+            Path of Intel HEX file.
+
+        Returns
+        -------
+        base_node_rpc.intel_hex.MemoryImage
+            Parsed firmware image (see
+            :func:`base_node_rpc.intel_hex.parse_intel_hex_image`).
+        '''
+        digest, entry = self._entry(firmware_path)
+        if entry['image'] is None:
+            entry['image'] = parse_intel_hex_image(entry['data']
+                                                   .decode('ascii'))
+        return entry['image']
+
+    def pages(self, firmware_path, page_size):
+        '''
+        Parameters
+        ----------
+        firmware_path : str
+            Path of Intel HEX file.
+        page_size : int
+            Size of each page.
+
+        Returns
+        -------
+        FirmwarePages
+            Firmware image split into pages (see :func:`split_pages`).
+
+        .. versionchanged:: 0.52
+            Treat an empty or truncated on-disk cache file as a cache miss.
+        '''
+        page_size = int(page_size)
+        digest, entry = self._entry(firmware_path)
+        if page_size in entry['pages']:
+            return entry['pages'][page_size]
+
+        pages = None
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = os.path.join(self.cache_dir, '%s-%d.bin' %
+                                      (digest, page_size))
+            if os.path.isfile(cache_path):
+                # Empty or truncated file is rebuilt (i.e., overwritten).
+                pages = _map_pages(cache_path, page_size)
+
+        if pages is None:
+            if entry['image'] is None:
+                entry['image'] = parse_intel_hex_image(entry['data']
+                                                       .decode('ascii'))
+            pages = split_pages(entry['image'], page_size).pages
+            pages.flags.writeable = False
+            if cache_path is not None:
+                self._write(cache_path, pages)
+
+        entry['pages'][page_size] = _firmware_pages(pages)
+        return entry['pages'][page_size]
+
+    def _write(self, cache_path, pages):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        # Write to temporary file first so other processes never map a
+        # partially written file.
+        handle, temp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                             suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                output.write(pages.tobytes())
+            # Replace existing (e.g., truncated) file, where supported.
+            getattr(os, 'replace', os.rename)(temp_path, cache_path)
+        except OSError:
+            # E.g., file was written concurrently by another process.
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+
+
+#: Default firmware cache, e.g., used by
+#: :func:`base_node_rpc.bootloader_driver.load_pages`.
+DEFAULT_CACHE = FirmwareCache()
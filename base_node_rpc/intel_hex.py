@@ -1,16 +1,167 @@
 from __future__ import absolute_import
-import re
+import binascii
 
+import numpy as np
 import pandas as pd
-from six.moves import range
 
 
-cre_hex_record = re.compile(r'^:(?P<byte_count>[0-9a-fA-F]{2})'
-                            r'(?P<address>[0-9a-fA-F]{4})'
-                            r'(?P<record_type>0[0-5])'
-                            r'(?P<data>[0-9a-fA-F]+)?'
-                            r'(?P<checksum>[0-9a-fA-F]{2})'
-                            r'$')
+#: .. versionadded:: 0.52
+RECORD_TYPES = {'data': 0, 'end_of_file': 1,
+                'extended_segment_address': 2, 'start_segment_address': 3,
+                'extended_linear_address': 4, 'start_linear_address': 5}
+
+
+class MemoryImage(object):
+    '''
+    Sparse memory image, i.e., set of contiguous address ranges backed by a
+    single :class:`bytearray`.
+
+    .. versionadded:: 0.52
+
+    Attributes
+    ----------
+    data : bytearray
+        Contents of all address ranges, in order of address.
+    ranges : list
+        List of ``(address, offset, size)`` tuples, where ``offset`` is the
+        position of the first byte of the range in :attr:`data`.
+    start_address : int or None
+        Execution start address (record type 3 or 5), if specified.
+    '''
+    def __init__(self, data, ranges, start_address=None):
+        self.data = data
+        self.ranges = ranges
+        self.start_address = start_address
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return ('<%s ranges=[%s]>' %
+                (self.__class__.__name__,
+                 ', '.join('0x%x-0x%x' % (address_i, address_i + size_i)
+                           for address_i, offset_i, size_i in self.ranges)))
+
+    @property
+    def start(self):
+        '''
+        Lowest address in image.
+        '''
+        return self.ranges[0][0] if self.ranges else 0
+
+    @property
+    def end(self):
+        '''
+        One past highest address in image.
+        '''
+        if not self.ranges:
+            return 0
+        address, offset, size = self.ranges[-1]
+        return address + size
+
+    def segments(self):
+        '''
+        Yields
+        ------
+        tuple
+            ``(address, memoryview)`` for each contiguous address range.
+        '''
+        view = memoryview(self.data)
+        for address_i, offset_i, size_i in self.ranges:
+            yield address_i, view[offset_i:offset_i + size_i]
+
+    def tobytes(self, start=None, end=None, fill=0xFF):
+        '''
+        Parameters
+        ----------
+        start : int, optional
+            First address (default: :attr:`start`).
+        end : int, optional
+            One past last address (default: :attr:`end`).
+        fill : int, optional
+            Value of bytes in gaps between address ranges.
+
+        Returns
+        -------
+        numpy.ndarray
+            Contents of address range as ``uint8`` array, with gaps filled
+            with :data:`fill`.
+        '''
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+        output = np.full(max(end - start, 0), fill, dtype='uint8')
+        data = np.frombuffer(self.data, dtype='uint8')
+        for address_i, offset_i, size_i in self.ranges:
+            # Clip range to requested addresses.
+            begin_i = max(address_i, start)
+            end_i = min(address_i + size_i, end)
+            if begin_i >= end_i:
+                continue
+            output[begin_i - start:end_i - start] = \
+                data[offset_i + begin_i - address_i:
+                     offset_i + end_i - address_i]
+        return output
+
+
+def _decode_records(data):
+    '''
+    Decode and verify all records of Intel HEX file contents at once.
+
+    .. versionadded:: 0.52
+
+    Parameters
+    ----------
+    data : str
+        Intel HEX file contents.
+
+    Returns
+    -------
+    tuple
+        ``(lines, raw, offsets)``, where ``raw`` is a ``uint8`` array of all
+        decoded record bytes and ``offsets`` is the position of each record
+        in ``raw``.
+
+    Raises
+    ------
+    ValueError
+        If a record is malformed or its checksum does not match.
+    '''
+    lines = data.split()
+    if not lines:
+        raise ValueError('No records found.')
+    if not all(line_i.startswith(':') for line_i in lines):
+        raise ValueError('Records must start with ":".')
+    lengths = np.fromiter((len(line_i) for line_i in lines), dtype=int,
+                          count=len(lines))
+    if (lengths % 2 != 1).any() or (lengths < 11).any():
+        i = np.where((lengths % 2 != 1) | (lengths < 11))[0][0]
+        raise ValueError('Invalid record length for line: "%s".' % lines[i])
+    try:
+        raw = np.frombuffer(binascii.unhexlify(''.join(line_i[1:]
+                                                       for line_i in lines)),
+                            dtype='uint8')
+    except (TypeError, binascii.Error):
+        raise ValueError('Records must only contain hexadecimal digits.')
+
+    sizes = (lengths - 1) // 2
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+
+    # Widen byte counts before adding to avoid `uint8` overflow.
+    invalid = raw[offsets].astype(np.intp) + 5 != sizes
+    if invalid.any():
+        raise ValueError('Byte count does not match record length for line: '
+                         '"%s".' % lines[np.where(invalid)[0][0]])
+
+    # Sum of all bytes in a record (including checksum) must be zero.
+    checksums = np.add.reduceat(raw, offsets, dtype='uint32') & 0xFF
+    if checksums.any():
+        i = np.where(checksums)[0][0]
+        checksum_i = raw[offsets[i] + sizes[i] - 1]
+        computed_i = (int(checksum_i) - int(checksums[i])) & 0xFF
+        raise ValueError('Computed checksum (%s) does not match expected '
+                         'checksum (0x%02x) for line: "%s".' %
+                         (hex(computed_i), checksum_i, lines[i]))
+    return lines, raw, offsets
 
 
 def parse_intel_hex(data):
@@ -30,46 +181,113 @@ def parse_intel_hex(data):
     -------
     pandas.DataFrame
         Parsed binary data as a table.
+
+    .. versionchanged:: 0.52
+        Decode all records at once using :func:`binascii.unhexlify` and
+        verify checksums in bulk.  Record types 2-5 and non-contiguous data
+        are accepted (see :func:`parse_intel_hex_image`).
     '''
-    matches = []
+    lines, raw, offsets = _decode_records(data)
+    byte_counts = raw[offsets].astype(int)
+    data_ = np.split(raw, offsets + 4)
+    df_data = pd.DataFrame({'record_type': raw[offsets + 3].astype(int),
+                            'address': (raw[offsets + 1].astype(int) << 8 |
+                                        raw[offsets + 2]),
+                            'byte_count': byte_counts,
+                            'data': [data_[i + 1][:byte_count_i].tolist()
+                                     if byte_count_i else None
+                                     for i, byte_count_i in
+                                     enumerate(byte_counts)],
+                            'checksum': raw[offsets + byte_counts + 4]
+                            .astype(int),
+                            'text': lines},
+                           columns=['record_type', 'address', 'byte_count',
+                                    'data', 'checksum', 'text'])
 
-    def hex2ints(hex_str):
-        return [int(hex_str[j:j + 2], 16) for j in range(0, len(hex_str), 2)]
+    # Verify there is exactly one end of file record.
+    assert(df_data.loc[df_data.record_type ==
+                       RECORD_TYPES['end_of_file']].shape[0] == 1)
+    return df_data
 
-    for i, line_i in enumerate(data.splitlines()):
-        match_i = cre_hex_record.match(line_i).groupdict()
 
-        checksum_i = ((sum(hex2ints(line_i[1:-2])) ^ 0xFF) + 1 & 0xFF)
-        if not checksum_i == int(match_i['checksum'], 16):
-            raise ValueError('Computed checksum (%s) does not match expected '
-                             'checksum (0x%s) for line: "%s".' %
-                             (hex(checksum_i), match_i['checksum'], line_i))
+def parse_intel_hex_image(data):
+    '''
+    Parse Intel HEX file contents into a sparse memory image.
 
-        match_i['text'] = line_i
-        if match_i['data']:
-            match_i['data'] = hex2ints(match_i['data'])
-        matches.append(match_i)
+    Supports all record types, including extended segment/linear addressing
+    (types 2 and 4) and start addresses (types 3 and 5).
 
-    df_data = pd.DataFrame(matches)[['record_type', 'address', 'byte_count',
-                                     'data', 'checksum', 'text']]
-    df_data.loc[:, ['record_type', 'address', 'byte_count', 'checksum']] =\
-        df_data[['record_type', 'address', 'byte_count',
-                 'checksum']].applymap(lambda x: int(x, 16))
+    .. versionadded:: 0.52
 
-    # XXX We don't currently support [record types 2-5][1].
-    # XXX We only currently support **contiguous** data sections.
-    #
-    # [1]: https://en.wikipedia.org/wiki/Intel_HEX#Record_types
+    Parameters
+    ----------
+    data : str
+        Intel HEX file contents.
 
-    # Verify all records are only of type 0 or 1.
-    assert(df_data.record_type.isin([0, 1]).all())
+    Returns
+    -------
+    MemoryImage
+        Data records, merged into contiguous address ranges.
 
-    # Verify there is exactly one 1 type record.
-    assert(df_data.loc[df_data.record_type == 1].shape[0] == 1)
+    Raises
+    ------
+    ValueError
+        If a record is malformed, its checksum does not match, or data
+        records overlap.
+    '''
+    lines, raw, offsets = _decode_records(data)
+    record_types = raw[offsets + 3]
+    byte_counts = raw[offsets].astype(np.int64)
+    addresses = raw[offsets + 1].astype(np.int64) << 8 | raw[offsets + 2]
+    # First two data bytes of each record, as a big-endian value.
+    values = (raw[np.minimum(offsets + 4, raw.size - 1)].astype(np.int64) << 8
+              | raw[np.minimum(offsets + 5, raw.size - 1)])
 
-    # Verify data is contiguous.
-    assert((df_data.loc[df_data.record_type == 0, 'address'].diff()[1:].values
-            == df_data.loc[df_data.record_type == 0,
-                           'byte_count'].iloc[:-1]).all())
+    # Apply the most recent extended address record to each record.
+    extended = ((record_types == RECORD_TYPES['extended_segment_address']) |
+                (record_types == RECORD_TYPES['extended_linear_address']))
+    bases = np.where(record_types == RECORD_TYPES['extended_linear_address'],
+                     values << 16, values << 4)
+    last = np.maximum.accumulate(np.where(extended,
+                                          np.arange(len(offsets)), -1))
+    addresses = addresses + np.where(last >= 0, bases[np.maximum(last, 0)], 0)
 
-    return df_data
+    start_address = None
+    for type_i in (RECORD_TYPES['start_segment_address'],
+                   RECORD_TYPES['start_linear_address']):
+        for i in np.where(record_types == type_i)[0]:
+            # `CS:IP` or `EIP`, both stored as 4 big-endian bytes.
+            cs_ip = raw[offsets[i] + 4:offsets[i] + 8].astype(np.int64)
+            value = cs_ip[0] << 24 | cs_ip[1] << 16 | cs_ip[2] << 8 | cs_ip[3]
+            if type_i == RECORD_TYPES['start_segment_address']:
+                value = (value >> 16 << 4) + (value & 0xFFFF)
+            start_address = int(value)
+
+    is_data = (record_types == RECORD_TYPES['data']) & (byte_counts > 0)
+    order = np.argsort(addresses[is_data], kind='mergesort')
+    data_offsets = offsets[is_data][order] + 4
+    data_counts = byte_counts[is_data][order]
+    data_addresses = addresses[is_data][order]
+
+    if not data_counts.size:
+        return MemoryImage(bytearray(), [], start_address)
+
+    # Gather data bytes of all records (in order of address) at once.
+    starts = np.concatenate([[0], np.cumsum(data_counts)[:-1]])
+    index = (np.repeat(data_offsets - starts, data_counts) +
+             np.arange(data_counts.sum()))
+    buffer_ = bytearray(raw[index].tobytes())
+
+    ends = data_addresses + data_counts
+    if (data_addresses[1:] < ends[:-1]).any():
+        i = np.where(data_addresses[1:] < ends[:-1])[0][0]
+        raise ValueError('Data records overlap at address 0x%x.' %
+                         data_addresses[i + 1])
+    # Start a new range wherever a record does not follow its predecessor.
+    breaks = np.concatenate([[0], np.where(data_addresses[1:] !=
+                                           ends[:-1])[0] + 1])
+    range_ends = np.concatenate([breaks[1:], [len(data_addresses)]])
+    ranges = [(int(data_addresses[b]), int(starts[b]),
+               int(ends[e - 1] - data_addresses[b]))
+              for b, e in zip(breaks, range_ends)]
+    return MemoryImage(buffer_, ranges, start_address)
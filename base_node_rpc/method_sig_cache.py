@@ -0,0 +1,234 @@
+'''
+Cache of method signature frames parsed from C++ headers (using ``clang``)
+for code generation.
+
+Parsed frames are cached in memory and on disk, keyed by a hash of:
+
+ - the contents of the input headers and of every header they include
+   (recursively, as resolved against the header directory and the ``-I``
+   include paths),
+ - the classes to scan,
+ - the compiler arguments (e.g., include paths and ``-D`` defines), and
+ - the pointer width.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+
+import six
+
+#: Incremented whenever the format of cached frames changes.
+CACHE_FORMAT_VERSION = 1
+
+cre_include = re.compile(br'^\s*#\s*include\s*([<"])([^>"]+)[>"]',
+                         re.MULTILINE)
+
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+def default_cache_dir():
+    '''
+    Returns
+    -------
+    str
+        Directory of on-disk cache, i.e., the ``BASE_NODE_RPC_CACHE_DIR``
+        environment variable (if set), or ``base-node-rpc/method-sig`` in the
+        user cache directory.
+    '''
+    if os.environ.get('BASE_NODE_RPC_CACHE_DIR'):
+        return os.environ['BASE_NODE_RPC_CACHE_DIR']
+    cache_home = (os.environ.get('XDG_CACHE_HOME') or
+                  os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'base-node-rpc', 'method-sig')
+
+
+def _include_paths(args):
+    return [arg_i[2:] for arg_i in args if arg_i.startswith('-I')]
+
+
+def header_dependencies(headers, include_paths):
+    '''
+    Parameters
+    ----------
+    headers : list
+        Header file paths.
+    include_paths : list
+        Include directories.
+
+    Returns
+    -------
+    list
+        Sorted real paths of :data:`headers` and all headers included by
+        them (recursively).  Headers included with angle brackets that cannot
+        be found (e.g., system headers) are ignored.
+
+    Raises
+    ------
+    IOError
+        If a header included with quotes cannot be found (e.g., a generated
+        header that has not been written yet).
+    '''
+    pending = [os.path.realpath(header_i) for header_i in headers]
+    found = set()
+    while pending:
+        header_i = pending.pop()
+        if header_i in found:
+            continue
+        if not os.path.isfile(header_i):
+            raise IOError('Header not found: `%s`' % header_i)
+        found.add(header_i)
+        with io.open(header_i, 'rb') as input_:
+            included = cre_include.findall(input_.read())
+        for delimiter_j, name_j in included:
+            name_j = name_j.decode('utf8')
+            for dir_k in [os.path.dirname(header_i)] + list(include_paths):
+                path_k = os.path.join(dir_k, name_j)
+                if os.path.isfile(path_k):
+                    pending.append(os.path.realpath(path_k))
+                    break
+            else:
+                if delimiter_j == b'"':
+                    raise IOError('Header `%s` included by `%s` not found.' %
+                                  (name_j, header_i))
+    return sorted(found)
+
+
+def cache_key(headers, classes, args, pointer_width):
+    '''
+    Returns
+    -------
+    str
+        Hex digest identifying parsed method signatures of :data:`classes`
+        (see module docstring).
+    '''
+    sha1 = hashlib.sha1()
+
+    def _update(value):
+        sha1.update(six.text_type(value).encode('utf8') + b'\0')
+
+    _update(CACHE_FORMAT_VERSION)
+    try:
+        import arduino_rpc
+
+        _update(getattr(arduino_rpc, '__version__', None))
+    except ImportError:
+        pass
+    for value_i in (list(map(six.text_type, headers)) + list(classes) +
+                    list(args) + [pointer_width]):
+        _update(value_i)
+    for path_i in header_dependencies(headers, _include_paths(args)):
+        _update(path_i)
+        with io.open(path_i, 'rb') as input_:
+            sha1.update(hashlib.sha1(input_.read()).digest())
+    return sha1.hexdigest()
+
+
+def get_method_sig_frame(headers, classes, *args, **kwargs):
+    '''
+    Cached equivalent of
+    :func:`arduino_rpc.code_gen.get_multilevel_method_sig_frame`.
+
+    Parameters
+    ----------
+    headers : list
+        Header file path for each class.
+    classes : list
+        Names of classes to scan for methods.
+    *args
+        Compiler arguments (e.g., ``-I<path>``, ``-D<define>``).
+    methods_filter : function, optional
+        Function to filter rows of method signature frame (applied to cached
+        frame, i.e., not part of cache key).
+    pointer_width : int, optional
+        Pointer width in bits.
+    cache_dir : str, optional
+        Directory of on-disk cache (default: :func:`default_cache_dir`).  If
+        ``False``, only cache in memory.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Method signature frame (a copy, i.e., may be modified).
+
+    Notes
+    -----
+    If the header dependencies cannot be resolved (see
+    :func:`header_dependencies`), headers are parsed without caching.
+    '''
+    import pandas as pd
+
+    methods_filter = kwargs.pop('methods_filter', None)
+    pointer_width = kwargs.pop('pointer_width', 16)
+    cache_dir = kwargs.pop('cache_dir', None)
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+
+    try:
+        key = cache_key(headers, classes, args, pointer_width)
+    except IOError:
+        # Dependencies cannot be fully resolved, so a cached frame may be
+        # stale; parse headers without caching.
+        key = None
+    frame = _frames.get(key) if key else None
+    cache_path = (os.path.join(cache_dir, '%s.pickle' % key)
+                  if cache_dir and key else None)
+    if frame is None and cache_path and os.path.isfile(cache_path):
+        try:
+            frame = pd.read_pickle(cache_path)
+        except Exception:
+            # E.g., corrupt file or incompatible `pandas` version.
+            frame = None
+    if frame is None:
+        from arduino_rpc.code_gen import get_multilevel_method_sig_frame
+
+        frame = get_multilevel_method_sig_frame(headers, classes, *args,
+                                                pointer_width=pointer_width,
+                                                **kwargs)
+        if cache_path:
+            _write_pickle(cache_dir, cache_path, frame)
+    if key:
+        with _frames_lock:
+            _frames[key] = frame
+
+    frame = frame.copy()
+    if methods_filter is not None:
+        frame = methods_filter(frame)
+    return frame
+
+
+def _write_pickle(cache_dir, cache_path, frame):
+    temp_path = None
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # Write to temporary file first so other processes never read a
+        # partially written file.
+        handle, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(handle)
+        frame.to_pickle(temp_path)
+        os.rename(temp_path, cache_path)
+    except (IOError, OSError):
+        # On-disk cache is optional (e.g., file was written concurrently by
+        # another process).
+        if temp_path is not None and os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+def clear(cache_dir=None):
+    '''
+    Clear in-memory cache and, if :data:`cache_dir` is specified, on-disk
+    cache.
+    '''
+    with _frames_lock:
+        _frames.clear()
+    if cache_dir and os.path.isdir(cache_dir):
+        for name_i in os.listdir(cache_dir):
+            if name_i.endswith('.pickle'):
+                os.remove(os.path.join(cache_dir, name_i))
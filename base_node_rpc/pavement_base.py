@@ -1,6 +1,5 @@
 from __future__ import absolute_import
 from __future__ import print_function
-from datetime import datetime
 import os
 import platform
 import sys
@@ -8,6 +7,7 @@ import warnings
 
 from paver.easy import task, needs, path, sh, cmdopts, options, consume_args
 import base_node_rpc
+from base_node_rpc.code_gen import stamp_code, write_if_changed
 import path_helpers as ph
 import platformio_helpers as pioh
 import platformio_helpers.develop
@@ -21,6 +21,18 @@ except ImportError:
     LIB_CMDOPTS = None
     LIB_GENERATE_TASKS = None
 
+#: Command-line options applied to both code generation and firmware build
+#: (see :func:`get_build_defines`).
+#:
+#: .. versionadded:: 0.52
+BUILD_CMDOPTS = [('command_profile', None, 'Measure device CPU cycles spent '
+                  'processing each command (i.e., define `COMMAND_PROFILE`).'),
+                 ('command_dispatch=', None, 'Generate command dispatch as '
+                  '`switch` ordered by command code or as jump `table` in '
+                  'flash (default: `arduino_rpc` dispatch).')]
+if LIB_CMDOPTS is not None:
+    LIB_CMDOPTS = LIB_CMDOPTS + BUILD_CMDOPTS
+
 
 DEFAULT_BASE_CLASSES = ['BaseNodeSerialHandler', 'BaseNodeEeprom',
                         'BaseNodeI2c', 'BaseNodeI2cHandler<Handler>',
@@ -73,6 +85,62 @@ def get_base_classes_and_headers(options, lib_dir, sketch_dir):
     return input_classes, input_headers
 
 
+def get_build_defines(options_=None):
+    '''
+    Return preprocessor define arguments for the build options (see
+    :data:`BUILD_CMDOPTS`), e.g., ``-DCOMMAND_PROFILE`` if the
+    ``command_profile`` option is set.
+
+    The same defines must be passed when parsing node headers and when
+    compiling the firmware, such that methods only available with a define
+    (e.g., ``last_command_cycles``) are included in the generated code.
+
+    .. versionadded:: 0.52
+    '''
+    if options_ is None:
+        options_ = options
+    defines = []
+    if getattr(options_, 'command_profile', False):
+        defines.append('-DCOMMAND_PROFILE')
+    return defines
+
+
+def get_clang_args(lib_dir):
+    '''
+    Return arguments to pass to ``clang`` when parsing node headers.
+
+    .. versionadded:: 0.52
+    '''
+    # Add stub `stdint.h` header to includes path.
+    stdint_stub_path = (ph.path(__file__).parent.joinpath('StdIntStub')
+                        .realpath())
+    c_array_defs_path = (pioh.conda_arduino_include_path()
+                         .joinpath('CArrayDefs'))
+    args = ['-DSTDINT_STUB'] + get_build_defines()
+    include_paths = [stdint_stub_path, lib_dir.realpath(), c_array_defs_path]
+    args += ['-I%s' % p for p in include_paths]
+    return args
+
+
+def write_code(input_headers, input_classes, output_path, f_get_code, *args,
+               **kwargs):
+    '''
+    Write code generated from method signatures of the specified classes.
+
+    Equivalent to :func:`arduino_rpc.code_gen.write_code`, except that parsed
+    method signatures are cached (see
+    :func:`base_node_rpc.method_sig_cache.get_method_sig_frame`) and the
+    output file is left untouched if the code has not changed.
+
+    .. versionadded:: 0.52
+    '''
+    from .method_sig_cache import get_method_sig_frame
+
+    df_sig = get_method_sig_frame(input_headers, input_classes, *args,
+                                  **kwargs)
+    write_if_changed(output_path, f_get_code(df_sig))
+
+
 def generate_validate_header(py_proto_module_name, sketch_dir):
     '''
     If package has a Protocol Buffer message class type with the specified
@@ -118,15 +186,7 @@ def generate_validate_header(py_proto_module_name, sketch_dir):
 
         message_type = getattr(mod, c_protobuf_struct_name)
 
-        # Add stub `stdint.h` header to includes path.
-        stdint_stub_path = (ph.path(__file__).parent.joinpath('StdIntStub')
-                            .realpath())
-        c_array_defs_path = (pioh.conda_arduino_include_path()
-                             .joinpath('CArrayDefs'))
-        args = ['-DSTDINT_STUB']
-        include_paths = [stdint_stub_path, lib_dir.realpath(),
-                         c_array_defs_path]
-        args += ['-I%s' % p for p in include_paths]
+        args = get_clang_args(lib_dir)
 
         validator_code = get_handler_validator_class_code(input_headers,
                                                           input_classes,
@@ -178,8 +238,19 @@ def generate_command_processor_header(options):
 
     This header is written to the sketch directory and simply includes the
     three library headers above.
+
+    .. versionchanged:: 0.52
+        Use cached method signatures (see :func:`write_code`).  Stamp
+        generated code with content hash rather than time of generation (see
+        :func:`base_node_rpc.code_gen.stamp_code`).
+
+        If the ``command_dispatch`` option is set (i.e., to ``switch`` or
+        ``table``), generate `CommandProcessor.h` with command dispatch
+        ordered by command code (see :mod:`base_node_rpc.command_dispatch`).
     '''
-    from arduino_rpc.code_gen import write_code, C_GENERATED_WARNING_MESSAGE
+    from functools import partial
+
+    from arduino_rpc.code_gen import C_GENERATED_WARNING_MESSAGE
     from arduino_rpc.rpc_data_frame import (get_c_commands_header_code,
                                             get_c_command_processor_header_code)
     from clang_helpers.data_frame import underscore_to_camelcase
@@ -199,20 +270,22 @@ def generate_command_processor_header(options):
     if not arduino_src_dir.isdir():
         arduino_src_dir.makedirs_p()
 
-    with arduino_src_dir.joinpath('Properties.h').open('w') as output:
-        print(C_GENERATED_WARNING_MESSAGE % datetime.now(), file=output)
-        print('#ifndef ___%s__PROPERTIES___' % module_name.upper(), file=output)
-        print('#define ___%s__PROPERTIES___' % module_name.upper(), file=output)
-        print('', file=output)
-        for k, v in six.iteritems(options.PROPERTIES):
-            print('#ifndef BASE_NODE__%s' % k.upper(), file=output)
-            print('#define BASE_NODE__%s  ("%s")' % (k.upper(), v), file=output)
-            print('#endif', file=output)
-        print('', file=output)
+    output = six.StringIO()
+    print('#ifndef ___%s__PROPERTIES___' % module_name.upper(), file=output)
+    print('#define ___%s__PROPERTIES___' % module_name.upper(), file=output)
+    print('', file=output)
+    for k, v in six.iteritems(options.PROPERTIES):
+        print('#ifndef BASE_NODE__%s' % k.upper(), file=output)
+        print('#define BASE_NODE__%s  ("%s")' % (k.upper(), v), file=output)
         print('#endif', file=output)
-
-    with sketch_dir.joinpath('NodeCommandProcessor.h').open('w') as output:
-        template = jinja2.Template('''\
+    print('', file=output)
+    print('#endif', file=output)
+    write_if_changed(arduino_src_dir.joinpath('Properties.h'),
+                     stamp_code(C_GENERATED_WARNING_MESSAGE, output.getvalue(),
+                                '\n'))
+
+    output = six.StringIO()
+    template = jinja2.Template('''\
 #ifndef ___{{ name.upper()  }}___
 #define ___{{ name.upper()  }}___
 
@@ -220,13 +293,24 @@ def generate_command_processor_header(options):
 #include "{{ camel_name }}/CommandProcessor.h"
 
 #endif  // #ifndef ___{{ name.upper()  }}___''')
-        print(C_GENERATED_WARNING_MESSAGE % datetime.now(), file=output)
-        print(template.render(name=module_name, camel_name=camel_name),
-              file=output)
-        print('', file=output)
+    print(template.render(name=module_name, camel_name=camel_name),
+          file=output)
+    print('', file=output)
+    write_if_changed(sketch_dir.joinpath('NodeCommandProcessor.h'),
+                     stamp_code(C_GENERATED_WARNING_MESSAGE, output.getvalue(),
+                                '\n'))
 
     headers = {'Commands': get_c_commands_header_code,
                'CommandProcessor': get_c_command_processor_header_code}
+    dispatch = getattr(options, 'command_dispatch', None)
+    if dispatch:
+        from . import command_dispatch
+
+        headers['CommandProcessor'] = \
+            partial(command_dispatch.get_c_command_processor_header_code,
+                    dispatch=dispatch)
+        print('[generate_command_processor_header] Command dispatch: %s' %
+              dispatch)
 
     methods_filter = getattr(options, 'methods_filter', DEFAULT_METHODS_FILTER)
     pointer_width = getattr(options, 'pointer_width', DEFAULT_POINTER_BITWIDTH)
@@ -234,20 +318,10 @@ def generate_command_processor_header(options):
     for k, f in six.iteritems(headers):
         output_header = arduino_src_dir.joinpath('%s.h' % k)
         # Prepend auto-generated warning to generated source code.
-        f_get_code = lambda *args_: ((C_GENERATED_WARNING_MESSAGE %
-                                      datetime.now()) +
-                                     f(*(args_ + (module_name, )),
-                                       pointer_width=pointer_width))
-
-        # Add stub `stdint.h` header to includes path.
-        stdint_stub_path = (ph.path(__file__).parent.joinpath('StdIntStub')
-                            .realpath())
-        c_array_defs_path = (pioh.conda_arduino_include_path()
-                             .joinpath('CArrayDefs'))
-        args = ['-DSTDINT_STUB']
-        include_paths = [stdint_stub_path, lib_dir.realpath(),
-                         c_array_defs_path]
-        args += ['-I%s' % p for p in include_paths]
+        f_get_code = lambda *args_: stamp_code(C_GENERATED_WARNING_MESSAGE,
+                                               f(*(args_ + (module_name, )),
+                                                 pointer_width=pointer_width))
+        args = get_clang_args(lib_dir)
         write_code(input_headers, input_classes, output_header, f_get_code,
                    *args, methods_filter=methods_filter,
                    pointer_width=pointer_width)
@@ -256,9 +330,19 @@ def generate_command_processor_header(options):
 @task
 @cmdopts(LIB_CMDOPTS, share_with=LIB_GENERATE_TASKS)
 def generate_python_code(options):
-    from arduino_rpc.code_gen import (write_code,
-                                      PYTHON_GENERATED_WARNING_MESSAGE)
+    '''
+    Generate Python proxy class code (i.e., `<module_name>/node.py`).
+
+    .. versionchanged:: 0.52
+        Use cached method signatures (see :func:`write_code`).  Stamp
+        generated code with content hash rather than time of generation (see
+        :func:`base_node_rpc.code_gen.stamp_code`).  Install precompiled
+        request encoders and response decoders for generated methods (see
+        :mod:`base_node_rpc.command_codec`).
+    '''
+    from arduino_rpc.code_gen import PYTHON_GENERATED_WARNING_MESSAGE
     from arduino_rpc.rpc_data_frame import get_python_code
+    from .command_codec import get_command_signatures_code
 
     module_name = _get_module_name(options.PROPERTIES)
     sketch_dir = options.rpc_module.get_sketch_directory()
@@ -267,7 +351,8 @@ def generate_python_code(options):
     input_classes, input_headers = get_base_classes_and_headers(options,
                                                                 lib_dir,
                                                                 sketch_dir)
-    extra_header = ('from base_node_rpc.proxy import ProxyBase, '
+    extra_header = ('from base_node_rpc.command_codec import install_codecs\n'
+                    'from base_node_rpc.proxy import ProxyBase, '
                     'I2cProxyMixin, SerialProxyMixin')
     extra_footer = '''
 
@@ -278,25 +363,23 @@ class I2cProxy(I2cProxyMixin, Proxy):
 class SerialProxy(SerialProxyMixin, Proxy):
     pass
 '''
-    # Prepend auto-generated warning to generated source code.
-    f_python_code = lambda *args: ((PYTHON_GENERATED_WARNING_MESSAGE %
-                                    datetime.now()) +
-                                   get_python_code(*args,
-                                                   extra_header=extra_header,
-                                                   extra_footer=extra_footer,
-                                                   pointer_width=
-                                                   pointer_width))
+
+    def f_python_code(df_sig, *args):
+        # Install precompiled codecs before defining proxy sub-classes.
+        footer = (get_command_signatures_code(df_sig,
+                                              pointer_width=pointer_width) +
+                  extra_footer)
+        # Prepend auto-generated warning to generated source code.
+        return stamp_code(PYTHON_GENERATED_WARNING_MESSAGE,
+                          get_python_code(df_sig, *args,
+                                          extra_header=extra_header,
+                                          extra_footer=footer,
+                                          pointer_width=pointer_width))
+
     methods_filter = getattr(options, 'methods_filter', DEFAULT_METHODS_FILTER)
     pointer_width = getattr(options, 'pointer_width', DEFAULT_POINTER_BITWIDTH)
 
-    # Add stub `stdint.h` header to includes path.
-    stdint_stub_path = (ph.path(__file__).parent.joinpath('StdIntStub')
-                        .realpath())
-    c_array_defs_path = (pioh.conda_arduino_include_path()
-                         .joinpath('CArrayDefs'))
-    args = ['-DSTDINT_STUB']
-    include_paths = [stdint_stub_path, lib_dir.realpath(), c_array_defs_path]
-    args += ['-I%s' % p for p in include_paths]
+    args = get_clang_args(lib_dir)
     write_code(input_headers, input_classes, output_file, f_python_code,
                *args, methods_filter=methods_filter,
                pointer_width=pointer_width)
@@ -309,6 +392,11 @@ def generate_protobuf_c_code(options):
     For each Protocol Buffer definition (i.e., `*.proto`) in the sketch
     directory, use the nano protocol buffer compiler to generate C code for the
     corresponding protobuf message structure(s).
+
+    .. versionchanged:: 0.52
+        Stamp generated code with content hash rather than time of generation
+        (see :func:`base_node_rpc.code_gen.stamp_code`) and leave unchanged
+        files untouched.
     '''
     import nanopb_helpers as npb
     from arduino_rpc.code_gen import C_GENERATED_WARNING_MESSAGE
@@ -332,16 +420,16 @@ def generate_protobuf_c_code(options):
         nano_pb_code = npb.compile_nanopb(proto_path, **kwargs)
         c_output_base = arduino_src_dir.joinpath(proto_name + '_pb')
         c_header_path = c_output_base + '.h'
-        with open(c_output_base + '.c', 'w') as output:
-            print(C_GENERATED_WARNING_MESSAGE % datetime.now(), file=output)
-            output.write(nano_pb_code['source'].replace('{{ header_path }}',
-                                                        c_header_path.name))
-        with open(c_header_path, 'w') as output:
-            print(C_GENERATED_WARNING_MESSAGE % datetime.now(), file=output)
-            output.write(nano_pb_code['header']
-                         .replace('PB_%s_PB_H_INCLUDED' % proto_name.upper(),
-                                  'PB__%s__%s_PB_H_INCLUDED' %
-                                  (module_name.upper(), proto_name.upper())))
+        source = nano_pb_code['source'].replace('{{ header_path }}',
+                                                c_header_path.name)
+        header = (nano_pb_code['header']
+                  .replace('PB_%s_PB_H_INCLUDED' % proto_name.upper(),
+                           'PB__%s__%s_PB_H_INCLUDED' %
+                           (module_name.upper(), proto_name.upper())))
+        write_if_changed(c_output_base + '.c',
+                         stamp_code(C_GENERATED_WARNING_MESSAGE, source, '\n'))
+        write_if_changed(c_header_path,
+                         stamp_code(C_GENERATED_WARNING_MESSAGE, header, '\n'))
 
 
 @task
@@ -356,7 +444,7 @@ def generate_protobuf_python_code(options):
         pb_code = npb.compile_pb(proto_path)
         module_name = _get_module_name(options.PROPERTIES)
         output_path = path(module_name).joinpath(proto_name + '.py')
-        output_path.write_text(pb_code['python'])
+        write_if_changed(output_path, pb_code['python'])
 
 
 @task
@@ -386,6 +474,34 @@ def build_arduino_library(options):
     pass
 
 
+@task
+@needs('generate_all_code')
+@cmdopts(LIB_CMDOPTS, share_with=LIB_GENERATE_TASKS)
+def build_firmware(options):
+    '''
+    Generate code and compile firmware using PlatformIO (i.e., ``pio run``).
+
+    Build defines (e.g., ``-DCOMMAND_PROFILE`` if the ``command_profile``
+    option is set, see :func:`get_build_defines`) are appended to the build
+    flags of each environment through the ``PLATFORMIO_BUILD_FLAGS``
+    environment variable.
+
+    .. versionadded:: 0.52
+    '''
+    import subprocess
+
+    from paver.easy import BuildFailure
+
+    env = os.environ.copy()
+    defines = get_build_defines(options)
+    if defines:
+        env['PLATFORMIO_BUILD_FLAGS'] = \
+            ' '.join([env.get('PLATFORMIO_BUILD_FLAGS', '')] +
+                     defines).strip()
+    if subprocess.call(['pio', 'run'], env=env) != 0:
+        raise BuildFailure('Firmware build failed.')
+
+
 @task
 @cmdopts([('overwrite', 'f', 'Force overwrite')])
 def init_config():
@@ -429,18 +545,122 @@ def bdist_wheel():
     pass
 
 
+#: Code generation tasks that write headers included by node headers (e.g.,
+#: protobuf message structures and validators).  These tasks run in order,
+#: *before* node headers are parsed (see :func:`generate_all_code`).
+#:
+#: .. versionadded:: 0.52
+GENERATE_PREREQUISITE_TASKS = ['generate_protobuf_c_code',
+                               'generate_protobuf_python_code',
+                               'generate_validate_headers']
+
+#: Groups of independent code generation tasks that may run in parallel once
+#: :data:`GENERATE_PREREQUISITE_TASKS` have completed (see
+#: :func:`generate_all_code`).  Tasks within each group run in order.
+#:
+#: .. versionadded:: 0.52
+GENERATE_TASK_GROUPS = [['generate_command_processor_header'],
+                        ['generate_rpc_buffer_header'],
+                        ['generate_python_code']]
+
+
+def _call_tasks(task_names):
+    '''
+    Call paver tasks in order (e.g., in a worker process).
+
+    Returns
+    -------
+    str or None
+        Traceback if a task failed, otherwise ``None``.
+    '''
+    import traceback
+
+    from paver.easy import call_task
+
+    try:
+        for task_name_i in task_names:
+            call_task(task_name_i)
+    except BaseException:
+        return traceback.format_exc()
+
+
+def _fork_pool(processes):
+    '''
+    Returns
+    -------
+    multiprocessing.pool.Pool or None
+        Pool of *forked* worker processes (i.e., sharing parsed headers and
+        paver environment), or ``None`` if not supported on this platform.
+    '''
+    import multiprocessing
+
+    if not hasattr(os, 'fork'):
+        return None
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context('fork').Pool(processes)
+    return multiprocessing.Pool(processes)
+
+
 @task
-@needs('generate_library_main_header', 'generate_protobuf_c_code',
-       'generate_protobuf_python_code', 'generate_validate_headers',
-       'generate_command_processor_header', 'generate_rpc_buffer_header',
-       'generate_python_code')
+@needs('generate_library_main_header')
 @cmdopts(LIB_CMDOPTS, share_with=LIB_GENERATE_TASKS)
 def generate_all_code(options):
     '''
     Generate all C++ (device) and Python (host) code, but do not compile
     device sketch.
+
+    .. versionchanged:: 0.52
+        Run tasks generating headers included by node headers (see
+        :data:`GENERATE_PREREQUISITE_TASKS`) to completion, parse node
+        headers once, then run independent groups of generation tasks (see
+        :data:`GENERATE_TASK_GROUPS`) in parallel worker processes.
+
+        The number of worker processes may be set through the
+        ``generate_jobs`` option (default: number of task groups).  Tasks
+        run serially if ``generate_jobs`` is 1 or worker processes cannot be
+        forked (e.g., on Windows).
     '''
-    pass
+    from paver.easy import BuildFailure, call_task
+    from .method_sig_cache import get_method_sig_frame
+
+    # Generated protobuf and validator headers are included by node headers,
+    # so they must be written before node headers are parsed.
+    for task_name_i in GENERATE_PREREQUISITE_TASKS:
+        call_task(task_name_i)
+
+    # Parse headers once (method signatures are shared with worker processes
+    # through the method signature cache).
+    sketch_dir = options.rpc_module.get_sketch_directory()
+    lib_dir = base_node_rpc.get_lib_directory()
+    input_classes, input_headers = get_base_classes_and_headers(options,
+                                                                lib_dir,
+                                                                sketch_dir)
+    get_method_sig_frame(input_headers, input_classes,
+                         *get_clang_args(lib_dir),
+                         pointer_width=getattr(options, 'pointer_width',
+                                               DEFAULT_POINTER_BITWIDTH))
+
+    jobs = getattr(options, 'generate_jobs', None) or len(GENERATE_TASK_GROUPS)
+    pool = _fork_pool(jobs) if jobs > 1 else None
+    if pool is None:
+        errors = [_call_tasks(group_i) for group_i in GENERATE_TASK_GROUPS]
+    else:
+        try:
+            errors = pool.map(_call_tasks, GENERATE_TASK_GROUPS)
+        finally:
+            pool.close()
+            pool.join()
+    errors = [error_i for error_i in errors if error_i is not None]
+    if errors:
+        raise BuildFailure('Code generation failed:\n%s' % '\n'.join(errors))
+    if pool is not None:
+        # Tasks were called in worker processes; do not call again, e.g., as
+        # dependencies of other tasks.
+        from paver.tasks import environment
+
+        for group_i in GENERATE_TASK_GROUPS:
+            for task_name_j in group_i:
+                environment.get_task(task_name_j).called = True
 
 
 @task
@@ -457,8 +677,7 @@ def generate_library_main_header(options):
     library_header = library_dir.joinpath('src', '%s.h' % library_dir.name)
     if not library_header.isdir():
         library_header.parent.makedirs_p()
-    with library_header.open('w') as output:
-        output.write('''
+    write_if_changed(library_header, '''
 #ifndef ___{module_name_upper}__H___
 #define ___{module_name_upper}__H___
 
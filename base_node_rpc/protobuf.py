@@ -1,11 +1,13 @@
 from __future__ import absolute_import
 from __future__ import print_function
+import re
 import warnings
 
 import pandas as pd
-from arduino_rpc.protobuf import (extract_callback_data,
-                                  get_protobuf_fields_frame)
-from arduino_rpc.code_gen import get_multilevel_method_sig_frame
+from arduino_rpc.protobuf import TYPE_CALLABLE_MAP, get_protobuf_fields_frame
+
+from .code_gen import write_if_changed
+from .method_sig_cache import get_method_sig_frame
 
 
 def get_handler_sig_info_frame(header, class_, *args, **kwargs):
@@ -16,10 +18,14 @@ def get_handler_sig_info_frame(header, class_, *args, **kwargs):
         bool on_<field ['__' field]*>_changed(...)
 
     Methods are only not included if they cannot be validated.
+
+    .. versionchanged:: 0.52
+        Use cached method signature frame (see
+        :func:`base_node_rpc.method_sig_cache.get_method_sig_frame`).
     '''
     prefix = kwargs.pop('prefix', '')
 
-    frame = get_multilevel_method_sig_frame(header, class_, *args, **kwargs)
+    frame = get_method_sig_frame(header, class_, *args, **kwargs)
 
     # Extract change event handler method signatures.
     df_sig_handlers = frame[((frame.ndims == 0) | (frame.ndims.isin([None]))) &
@@ -53,6 +59,88 @@ def get_handler_sig_info_frame(header, class_, *args, **kwargs):
     return pd.concat(frames)
 
 
+class CallbackFieldIndex(object):
+    '''
+    Index of Protocol Buffer message fields by change callback method name.
+
+    The fields frame of the message type (see
+    :func:`arduino_rpc.protobuf.get_protobuf_fields_frame`) is computed and
+    grouped by field once, so each callback method name is resolved in
+    constant time (rather than scanning the fields frame per method, as
+    :func:`arduino_rpc.protobuf.extract_callback_data` does).
+
+    .. versionadded:: 0.52
+
+    Parameters
+    ----------
+    message_type : type
+        Protocol Buffer message class.
+    '''
+    def __init__(self, message_type):
+        self.message_type = message_type
+        self.df_fields = get_protobuf_fields_frame(message_type)
+        self._cre_method = re.compile(r'on_%s_(?P<fields>.+)_(?P<signal>[^_]+)'
+                                      % message_type.DESCRIPTOR.name.lower())
+        self._df_parents = (self.df_fields[['msg_name', 'msg_desc',
+                                            'parent_name', 'parent_field']]
+                            .drop_duplicates('parent_name')
+                            .set_index('parent_name'))
+        # Leaf field series by `(parent name, field name)`.
+        self._fields = {}
+        for (parent_name, field_name), df_i in \
+                self.df_fields.groupby(['parent_name', 'field_name'],
+                                       sort=False):
+            s_field = df_i.iloc[0].copy()
+            atom_type = TYPE_CALLABLE_MAP.get(s_field.field_desc.type)
+            if atom_type is None:
+                # No callback type for field (e.g., string).
+                continue
+            s_field['atom_type'] = atom_type
+            s_field.name = field_name
+            self._fields[(parent_name, field_name)] = s_field
+
+    def __getitem__(self, method_name):
+        '''
+        Returns
+        -------
+        tuple
+            ``(df_parents, s_field)``, as returned by
+            :func:`arduino_rpc.protobuf.extract_callback_data`.
+
+        Raises
+        ------
+        KeyError
+            If no message field matches the method name.
+        '''
+        match = self._cre_method.match(method_name)
+        if match is None:
+            raise KeyError(method_name)
+        fields = match.group('fields').split('__')
+        parents = [''] + fields[:-1]
+        s_field = self._fields.get((parents[-1], fields[-1]))
+        if s_field is None or not all(parent_i in self._df_parents.index
+                                      for parent_i in parents):
+            raise KeyError(method_name)
+        return self._df_parents.loc[parents], s_field
+
+
+_callback_field_indexes = {}
+
+
+def get_callback_field_index(message_type):
+    '''
+    Returns
+    -------
+    CallbackFieldIndex
+        Index for :data:`message_type` (created on first use).
+
+    .. versionadded:: 0.52
+    '''
+    if message_type not in _callback_field_indexes:
+        _callback_field_indexes[message_type] = CallbackFieldIndex(message_type)
+    return _callback_field_indexes[message_type]
+
+
 def get_handler_template_frame(df_handler_sig, message_type):
     '''
     Return a `pandas.DataFrame` containing only the data required to render the
@@ -69,36 +157,43 @@ def get_handler_template_frame(df_handler_sig, message_type):
       - `depth`: The depth of the field in a nested message (depth is 1 for
         single-level message).
       - `field_name`: The name of the Protocol Buffer field.
+
+    .. versionchanged:: 0.52
+        Look up message fields in memoized index (see
+        :func:`get_callback_field_index`) and build result frame once from
+        records.
     '''
-    frames = []
+    columns = ['method_name', 'camel_name', 'arg_count', 'atom_type', 'tags',
+               'depth', 'field_name']
+    field_index = get_callback_field_index(message_type)
+    records = []
 
     for (method_name, T, arg_count), df_i in (df_handler_sig
                                               .groupby(['method_name',
                                                         'return_atom_type',
                                                         'arg_count'])):
         try:
-            df_parents, s_field = extract_callback_data(get_protobuf_fields_frame
-                                                        (message_type), method_name)
-            assert((df_i.iloc[0].atom_type is None) or
-                   (df_i.iloc[0].atom_type == s_field.atom_type))
-        except IndexError:
+            df_parents, s_field = field_index[method_name]
+        except KeyError:
             warnings.warn('No message field matching method name: %s' % method_name)
             continue
-        except AssertionError:
+        first = df_i.iloc[0]
+        if not ((first.atom_type is None) or
+                (first.atom_type == s_field.atom_type)):
             warnings.warn('[%s] Handler arg type (%s) does not match message field type (%s)'
-                          % (method_name, df_i.iloc[0].atom_type, s_field.atom_type))
+                          % (method_name, first.atom_type, s_field.atom_type))
             continue
         tags = (df_parents.iloc[1:]['parent_field'].map(lambda p: p.number).tolist() +
                 [s_field.field_desc.number])
-        row = df_i.iloc[0].copy()
-        row['tags'] = tags
-        row['depth'] = len(tags)
-        row['atom_type'] = s_field.atom_type
-        row['field_name'] = s_field.name
-        frames.append(pd.DataFrame([row]))
+        records.append({'method_name': first.method_name,
+                        'camel_name': first.camel_name,
+                        'arg_count': first.arg_count,
+                        'atom_type': s_field.atom_type,
+                        'tags': tags,
+                        'depth': len(tags),
+                        'field_name': s_field.name})
 
-    return pd.concat(frames)[['method_name', 'camel_name', 'arg_count',
-                              'atom_type', 'tags', 'depth', 'field_name']]
+    return pd.DataFrame(records, columns=columns)
 
 
 def get_handler_validator_class_code(header, class_, message_type, *args,
@@ -169,6 +264,10 @@ public:{# #}
 
 def write_handler_validator_header(output_path, package_name, message_name,
                                    validator_code):
+    '''
+    .. versionchanged:: 0.52
+        Leave output file untouched if the header has not changed.
+    '''
     import jinja2
 
     template = '''#ifndef ___{{ package_name.upper() }}_{{ message_name.upper() }}_VALIDATE___
@@ -184,9 +283,10 @@ namespace {{ message_name }}_validate {
 
 #endif  // #ifndef ___{{ package_name.upper() }}_{{ message_name.upper() }}_VALIDATE___
     '''
-    with open(output_path, 'w') as output:
-        print(jinja2.Template(template).render(validator_code=validator_code,
-                                               package_name=package_name,
-                                               message_name=message_name),
-              file=output)
+    code = jinja2.Template(template).render(validator_code=validator_code,
+                                            package_name=package_name,
+                                            message_name=message_name)
+    if write_if_changed(output_path, code + '\n'):
         print('Wrote to %s' % output_path)
+    else:
+        print('Skipped %s (unchanged)' % output_path)
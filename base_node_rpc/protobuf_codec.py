@@ -0,0 +1,305 @@
+'''
+Compiled decoders (and field-wise encoders) for Protocol Buffer messages
+(e.g., config and state).
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+from collections import OrderedDict
+from operator import attrgetter
+import struct
+import threading
+
+from arduino_rpc.protobuf import PYTYPE_MAP
+import six
+
+
+def _identity(value):
+    return value
+
+
+def _atom_fields(descriptor, prefix=''):
+    '''
+    Yields
+    ------
+    tuple
+        ``(full_name, field_descriptor)`` for each non-message field, where
+        ``full_name`` is the ``.``-separated field name relative to the root
+        message.
+
+        Fields of each message are listed before the fields of any nested
+        message (same order as
+        :func:`arduino_rpc.protobuf.resolve_field_values`).
+    '''
+    for field_i in descriptor.fields:
+        if field_i.type != field_i.TYPE_MESSAGE:
+            yield prefix + field_i.name, field_i
+    for field_i in descriptor.fields:
+        if field_i.type == field_i.TYPE_MESSAGE:
+            for item in _atom_fields(field_i.message_type,
+                                     prefix + field_i.name + '.'):
+                yield item
+
+
+def _is_repeated(field):
+    if hasattr(field, 'is_repeated'):
+        # `label` is not available in recent `protobuf` releases.
+        return field.is_repeated
+    return field.label == field.LABEL_REPEATED
+
+
+def _converter(field):
+    if _is_repeated(field):
+        return list
+    elif field.enum_type is not None:
+        values_by_number = field.enum_type.values_by_number
+        return lambda value: values_by_number[value].name
+    return PYTYPE_MAP.get(field.type, _identity)
+
+
+def _float32(value):
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+
+class MessageDecoder(object):
+    '''
+    Decoder flattening messages of a Protocol Buffer message type into
+    records of field values.
+
+    Field names and value conversions are resolved once, when the decoder is
+    created, such that decoding a message only requires a single
+    :func:`operator.attrgetter` call.
+
+    Values of unset fields are set to the respective default values.  Values
+    of enumerated type fields are set to the name of the respective value.
+
+    Parameters
+    ----------
+    message_type : type
+        Protocol Buffer message class.
+
+    Attributes
+    ----------
+    names : tuple
+        ``.``-separated full name of each field.
+    fields : collections.OrderedDict
+        Field descriptor of each field, keyed by full name.
+
+    .. versionchanged:: 0.52
+        Add :attr:`fields` attribute and :meth:`flatten`, :meth:`encode`,
+        :meth:`changed`, and :meth:`decode_fields` methods.
+    '''
+    def __init__(self, message_type):
+        self.message_type = message_type
+        fields = list(_atom_fields(message_type.DESCRIPTOR))
+        self.fields = OrderedDict(fields)
+        self.names = tuple(name_i for name_i, field_i in fields)
+        self._converters = tuple(_converter(field_i)
+                                 for name_i, field_i in fields)
+        self._converters_by_name = dict(zip(self.names, self._converters))
+        self._getter = attrgetter(*self.names) if self.names else None
+
+    def decode_message(self, message, as_series=False):
+        '''
+        Parameters
+        ----------
+        message : google.protobuf.message.Message
+            Message of type :attr:`message_type`.
+        as_series : bool, optional
+            If ``True``, return a :class:`pandas.Series`.
+
+        Returns
+        -------
+        collections.OrderedDict or pandas.Series
+            Field values, keyed by full field name.
+        '''
+        if self._getter is None:
+            values = ()
+        elif len(self.names) == 1:
+            values = (self._getter(message), )
+        else:
+            values = self._getter(message)
+        record = OrderedDict(zip(self.names,
+                                 [convert_i(value_i) for convert_i, value_i
+                                  in zip(self._converters, values)]))
+        if as_series:
+            import pandas as pd
+
+            return pd.Series(record, dtype=object)
+        return record
+
+    def __call__(self, data, as_series=False):
+        '''
+        Parameters
+        ----------
+        data : bytes
+            Serialized message of type :attr:`message_type`.
+        as_series : bool, optional
+            If ``True``, return a :class:`pandas.Series`.
+
+        Returns
+        -------
+        collections.OrderedDict or pandas.Series
+            Field values, keyed by full field name.
+        '''
+        return self.decode_message(self.message_type.FromString(data),
+                                   as_series=as_series)
+
+    def decode_fields(self, data):
+        '''
+        Decode *only* the fields that are set in a serialized message, e.g.,
+        a partial message containing only changed fields.
+
+        Parameters
+        ----------
+        data : bytes
+            Serialized message of type :attr:`message_type`.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Values of fields set in :data:`data`, keyed by full field name
+            (converted as in :meth:`decode_message`).
+        '''
+        message = self.message_type.FromString(data)
+        flattened = self.flatten(OrderedDict([(field_i.name, value_i)
+                                              for field_i, value_i in
+                                              message.ListFields()]))
+        return OrderedDict([(name_i,
+                             self._converters_by_name[name_i](value_i))
+                            for name_i, value_i in flattened.items()])
+
+    def flatten(self, values, prefix=''):
+        '''
+        Parameters
+        ----------
+        values : dict
+            Field values, keyed by full field name (e.g., as returned by
+            :meth:`decode_message`) and/or by name of a nested message field,
+            with a ``dict`` or message as value.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Field values, keyed by full field name.
+
+        Raises
+        ------
+        ValueError
+            If a field name is not valid.
+        '''
+        flattened = OrderedDict()
+        for name_i, value_i in values.items():
+            full_name_i = prefix + name_i
+            if full_name_i in self.fields:
+                flattened[full_name_i] = value_i
+                continue
+            if hasattr(value_i, 'ListFields'):
+                # Nested message.  Only include fields that are set.
+                value_i = OrderedDict([(field_j.name, value_j)
+                                       for field_j, value_j in
+                                       value_i.ListFields()])
+            if (not isinstance(value_i, dict) or
+                    not any(name_j.startswith(full_name_i + '.')
+                            for name_j in self.fields)):
+                raise ValueError('Invalid field: `%s`' % full_name_i)
+            flattened.update(self.flatten(value_i, full_name_i + '.'))
+        return flattened
+
+    def encode(self, values):
+        '''
+        Parameters
+        ----------
+        values : dict
+            Field values (see :meth:`flatten`).
+
+        Returns
+        -------
+        google.protobuf.message.Message
+            Message with *only* the specified fields set.
+        '''
+        message = self.message_type()
+        for name_i, value_i in self.flatten(values).items():
+            field_i = self.fields[name_i]
+            parent = message
+            for level_j in name_i.split('.')[:-1]:
+                parent = getattr(parent, level_j)
+            if _is_repeated(field_i):
+                container = getattr(parent, field_i.name)
+                del container[:]
+                container.extend(value_i)
+                continue
+            if (field_i.enum_type is not None and
+                    isinstance(value_i, six.string_types)):
+                value_i = field_i.enum_type.values_by_name[value_i].number
+            setattr(parent, field_i.name, value_i)
+        return message
+
+    def changed(self, values, known):
+        '''
+        Parameters
+        ----------
+        values : dict
+            New field values (see :meth:`flatten`).
+        known : dict
+            Known field values, keyed by full field name.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Field values from :data:`values` that differ from (or are not
+            present in) :data:`known`, keyed by full field name.
+
+            ``float`` fields are compared at single precision, i.e., as stored
+            in the message.
+        '''
+        changed = OrderedDict()
+        for name_i, value_i in self.flatten(values).items():
+            if name_i not in known:
+                changed[name_i] = value_i
+                continue
+            known_i = known[name_i]
+            if _is_repeated(self.fields[name_i]):
+                if list(known_i) == list(value_i):
+                    continue
+            elif self.fields[name_i].type == self.fields[name_i].TYPE_FLOAT:
+                try:
+                    if _float32(value_i) == _float32(known_i):
+                        continue
+                except (TypeError, struct.error):
+                    pass
+            elif (self.fields[name_i].enum_type is not None and
+                  not isinstance(value_i, six.string_types)):
+                # Compare enum values by name (see :meth:`decode_message`).
+                if (value_i in self.fields[name_i].enum_type.values_by_number
+                        and self.fields[name_i].enum_type
+                        .values_by_number[value_i].name == known_i):
+                    continue
+            elif known_i == value_i:
+                continue
+            changed[name_i] = value_i
+        return changed
+
+
+_decoders = {}
+_decoders_lock = threading.Lock()
+
+
+def get_decoder(message_type):
+    '''
+    Parameters
+    ----------
+    message_type : type
+        Protocol Buffer message class.
+
+    Returns
+    -------
+    MessageDecoder
+        Decoder for :data:`message_type` (created on first use).
+    '''
+    decoder = _decoders.get(message_type)
+    if decoder is None:
+        with _decoders_lock:
+            decoder = _decoders.setdefault(message_type,
+                                           MessageDecoder(message_type))
+    return decoder
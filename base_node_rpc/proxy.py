@@ -1,29 +1,35 @@
 from __future__ import absolute_import
 from collections import OrderedDict
 import logging
-import pkg_resources
+import struct
 import sys
 import threading
 import time
 import warnings
 
-from arduino_rpc.protobuf import resolve_field_values, PYTYPE_MAP
 from nadamq.NadaMq import cPacket, PACKET_TYPES
 from or_event import OrEvent
 from six.moves import map
 from six.moves import range
-from six.moves import queue
 import blinker
 import serial
-import serial_device as sd
-import serial_device.threaded
 import six
 
-from .queue import PacketQueueManager
+from .eeprom import EepromView
+from .protobuf_codec import get_decoder
+from .queue import (STATE_STREAM_IUID, AckBarrier, PacketQueueManager,
+                    ResponseWaiter, RttEstimator, monotonic)
 from . import __version__, available_devices, read_device_id
+from ._async_common import comports
+from .records import RecordTable, frame, series
 
 logger = logging.getLogger(__name__)
 
+#: Device serial receive buffer size to assume if not reported by device.
+#:
+#: .. versionadded:: 0.52
+DEFAULT_RX_BUFFER_SIZE = 64
+
 
 class DeviceNotFound(Exception):
     pass
@@ -49,18 +55,153 @@ class DeviceVersionMismatch(Exception):
 
 class ProxyBase(object):
     host_package_name = None
+    #: Names of commands that do not return a value.
+    #:
+    #: .. versionadded:: 0.52
+    void_commands = ('analog_reference', 'analog_write', 'delay_ms',
+                     'delay_us', 'digital_write', 'i2c_disable_broadcast',
+                     'i2c_enable_broadcast', 'i2c_packet_reset', 'i2c_write',
+                     'load_config', 'pin_mode', 'reset_config', 'reset_state',
+                     'save_config', 'set_clock', 'set_i2c_address',
+                     'set_spi_bit_order', 'set_spi_clock_divider',
+                     'set_spi_data_mode', 'update_eeprom_block')
+    #: Timeout (in seconds) to use for specific commands, overriding adaptive
+    #: timeout.  A value of ``None`` corresponds to the proxy default timeout,
+    #: e.g., for commands with an execution time depending on the arguments.
+    #:
+    #: .. versionadded:: 0.52
+    command_timeouts = {'delay_ms': None, 'delay_us': None,
+                        'i2c_request': None}
+    #: Names of commands that may safely be sent more than once, i.e., that
+    #: do not change the state of the device.
+    #:
+    #: .. versionadded:: 0.52
+    idempotent_commands = ('analog_read', 'array_length',
+                           'base_node_software_version', 'config_generation',
+                           'digital_read', 'display_name', 'echo_array',
+                           'eeprom_crc16', 'eeprom_e2end', 'i2c_address',
+                           'i2c_buffer_size', 'manufacturer',
+                           'max_i2c_payload_size', 'max_serial_payload_size',
+                           'microseconds', 'milliseconds', 'package_name',
+                           'ram_free', 'read_eeprom_block',
+                           'serial_rx_buffer_size', 'serialize_config',
+                           'serialize_state', 'software_version',
+                           'state_generation', 'str_echo', 'url')
+    #: If ``True``, generated command methods use precompiled request
+    #: encoders and response decoders (see
+    #: :mod:`base_node_rpc.command_codec`).
+    #:
+    #: .. versionadded:: 0.52
+    fast_commands = True
 
     def __init__(self, buffer_bounds_check=True, high_water_mark=10,
-                 timeout_s=10, **kwargs):
+                 timeout_s=10, fire_and_forget=False, rx_buffer_size=None,
+                 adaptive_timeout=False, command_timeouts=None,
+                 retransmit_count=0, **kwargs):
         '''
+        Parameters
+        ----------
+        fire_and_forget : bool, optional
+            If ``True``, send commands listed in :attr:`void_commands` without
+            waiting for a response.
+
+            Completion (or failure) of such commands is confirmed lazily,
+            i.e., upon the next synchronous command or an explicit call to
+            :meth:`flush`.
+        rx_buffer_size : int, optional
+            Number of request bytes the device is able to buffer.
+
+            Fire-and-forget commands are paced such that the total size of
+            unacknowledged requests never exceeds this size.
+
+            Default: size reported by device (see :attr:`rx_buffer_size`).
+        adaptive_timeout : bool, optional
+            If ``True``, derive the response timeout of each command from the
+            round-trip times observed for the command (see
+            :class:`RttEstimator`), bounded by :data:`timeout_s`.
+        command_timeouts : dict, optional
+            Timeout (in seconds) for specific commands, keyed by command name.
+
+            Merged with (and takes precedence over) :attr:`command_timeouts`.
+        retransmit_count : int, optional
+            Maximum number of times to retransmit a command listed in
+            :attr:`idempotent_commands` if no valid response is received.
+
+            Best combined with :data:`adaptive_timeout` to retransmit quickly.
+
         .. versionchanged:: 0.43
             Ignore extra keyword arguments (rather than throwing an exception).
+        .. versionchanged:: 0.52
+            Add :data:`fire_and_forget`, :data:`rx_buffer_size`,
+            :data:`adaptive_timeout`, :data:`command_timeouts`, and
+            :data:`retransmit_count` arguments.
         '''
         self._buffer_bounds_check = buffer_bounds_check
         self._buffer_size = None
+        self._rx_buffer_size = rx_buffer_size
         self._packet_queue_manager = \
             PacketQueueManager(high_water_mark=high_water_mark)
         self._timeout_s = timeout_s
+        self.fire_and_forget = fire_and_forget
+        self.adaptive_timeout = adaptive_timeout
+        self.retransmit_count = retransmit_count
+        self.command_timeouts = self.command_timeouts.copy()
+        if command_timeouts:
+            self.command_timeouts.update(command_timeouts)
+        self._command_names = None
+        self._rtt_estimators = {}
+        self._eeprom = None
+        #: Cached device values (e.g., decoded config), keyed by name.  Each
+        #: value is a ``(generation, value)`` tuple, where ``generation`` is
+        #: the device-side change counter at the time the value was read.
+        #:
+        #: .. versionadded:: 0.52
+        self._generation_cache = {}
+        self._ack_barrier = AckBarrier()
+        self._response_waiter = ResponseWaiter()
+        signals = self._packet_queue_manager.signals
+        signals.signal('ack-received').connect(self._ack_barrier.on_ack)
+        signals.signal('nack-received').connect(self._ack_barrier.on_nack)
+        for packet_type_i in ('data', 'ack'):
+            signals.signal('%s-received' % packet_type_i)\
+                .connect(self._response_waiter.on_response)
+        signals.signal('nack-received').connect(self._response_waiter.on_nack)
+        signals.signal('parse-error')\
+            .connect(self._response_waiter.on_parse_error)
+        signals.signal('id_response-received').connect(self._on_id_response)
+
+    def _on_id_response(self, packet):
+        '''
+        Discard device values known to host (see
+        :meth:`_forget_device_values`), since an ``ID_RESPONSE`` packet may
+        indicate that device has been reset.
+
+        .. versionadded:: 0.52
+
+        Returns
+        -------
+        bool
+            ``False``, i.e., packet is not consumed.
+        '''
+        self._forget_device_values()
+        return False
+
+    def _forget_device_values(self):
+        '''
+        Discard cached device values (see :func:`_cached_record`), last known
+        config and state values (see :meth:`ConfigMixinBase.update_config`
+        and :meth:`StateMixinBase.update_state`), and state mirror (see
+        :meth:`StateMixinBase.start_state_mirror`), e.g., since device may
+        have been reset (i.e., change counters may repeat).
+
+        .. versionadded:: 0.52
+        '''
+        self._generation_cache.clear()
+        self._config_values = None
+        self._state_values = None
+        if getattr(self, '_state_mirror', None) is not None:
+            # Changes may have been missed; read again on next access.
+            self._state_mirror = None
 
     @property
     def host_software_version(self):
@@ -68,12 +209,16 @@ class ProxyBase(object):
         # (see PEP 396[1]).
         #
         # [1]: https://www.python.org/dev/peps/pep-0396/
+        import pkg_resources
+
         exec('from %s import __version__ as host_version' %
              self.__module__.split('.')[0])
         return pkg_resources.parse_version(host_version)
 
     @property
     def remote_software_version(self):
+        import pkg_resources
+
         return pkg_resources.parse_version(self.properties.software_version)
 
     @property
@@ -105,15 +250,18 @@ class ProxyBase(object):
 
     @property
     def properties(self):
-        import pandas as pd
-
+        '''
+        .. versionchanged:: 0.52
+            Return :class:`base_node_rpc.records.Record` if
+            :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
+        '''
         properties = OrderedDict([(k, getattr(self, k)().tostring())
                                   for k in ['base_node_software_version',
                                             'package_name', 'display_name',
                                             'manufacturer', 'url',
                                             'software_version']
                                   if hasattr(self, k)])
-        return pd.Series(properties, dtype=object)
+        return series(properties)
 
     @property
     def buffer_size(self):
@@ -140,12 +288,210 @@ class ProxyBase(object):
             self._buffer_bounds_check = True
         return self._buffer_size
 
+    @property
+    def rx_buffer_size(self):
+        '''
+        Number of request bytes the device is able to buffer while processing
+        a command.
+
+        Queried from device using ``serial_rx_buffer_size`` command (if
+        available).  Otherwise, :data:`DEFAULT_RX_BUFFER_SIZE` is assumed.
+
+        .. versionadded:: 0.52
+        '''
+        if self._rx_buffer_size is None:
+            try:
+                self._rx_buffer_size = int(self.serial_rx_buffer_size())
+            except AttributeError:
+                self._rx_buffer_size = DEFAULT_RX_BUFFER_SIZE
+        return self._rx_buffer_size
+
+    @property
+    def eeprom(self):
+        '''
+        Paged, cached view of device EEPROM (see :class:`EepromView`).
+
+        Writes are cached until :meth:`EepromView.flush` is called.
+
+        .. versionadded:: 0.52
+        '''
+        if self._eeprom is None:
+            if not hasattr(self, 'read_eeprom_block'):
+                raise AttributeError('Device does not support EEPROM access.')
+            self._eeprom = EepromView(self)
+        return self._eeprom
+
     @property
     def queues(self):
         return self._packet_queue_manager.packet_queues
 
+    def _command_name(self, packet):
+        '''
+        Returns
+        -------
+        str or None
+            Name of command encoded in request packet, or ``None`` if command
+            is unknown.
+
+        .. versionadded:: 0.52
+        '''
+        if self._command_names is None:
+            # Map each command code to name, based on `_CMD_<NAME>` class
+            # attributes of generated proxy.
+            self._command_names = dict((getattr(self, attr_i),
+                                        attr_i[len('_CMD_'):].lower())
+                                       for attr_i in dir(type(self))
+                                       if attr_i.startswith('_CMD_'))
+        data = packet.data()
+        if len(data) < 2:
+            return None
+        return self._command_names.get(struct.unpack('<H', data[:2])[0])
+
+    def _is_void_command(self, packet):
+        '''
+        Returns
+        -------
+        bool
+            ``True`` if request packet encodes a command listed in
+            :attr:`void_commands`.
+
+        .. versionadded:: 0.52
+        '''
+        return self._command_name(packet) in self.void_commands
+
+    def _command_timeout_s(self, command_name):
+        '''
+        Returns
+        -------
+        float
+            Response timeout for specified command.
+
+            See :attr:`command_timeouts` and :data:`adaptive_timeout`.
+
+        .. versionadded:: 0.52
+        '''
+        if command_name in self.command_timeouts:
+            timeout_s = self.command_timeouts[command_name]
+            return self._timeout_s if timeout_s is None else timeout_s
+        elif self.adaptive_timeout and command_name in self._rtt_estimators:
+            return self._rtt_estimators[command_name].timeout_s
+        return self._timeout_s
+
+    def _rtt_estimator(self, command_name):
+        '''
+        Returns
+        -------
+        RttEstimator
+            Round-trip time estimator for specified command.
+
+        .. versionadded:: 0.52
+        '''
+        if command_name not in self._rtt_estimators:
+            self._rtt_estimators[command_name] = \
+                RttEstimator(max_timeout_s=self._timeout_s)
+        return self._rtt_estimators[command_name]
+
+    @property
+    def rtt_stats(self):
+        '''
+        Returns
+        -------
+        pandas.DataFrame or base_node_rpc.records.RecordTable
+            Smoothed round-trip time (``srtt_s``), round-trip time variation
+            (``rttvar_s``), and current timeout (``timeout_s``) for each
+            command sent, indexed by command name.
+
+        .. versionadded:: 0.52
+        '''
+        return frame([(name_i, estimator_i.srtt_s, estimator_i.rttvar_s,
+                       estimator_i.timeout_s)
+                      for name_i, estimator_i in
+                      sorted(self._rtt_estimators.items(),
+                             key=lambda item: str(item[0]))],
+                     columns=['command', 'srtt_s', 'rttvar_s', 'timeout_s'],
+                     index='command')
+
+    def command_cycles(self, commands=None, repeat=5):
+        '''
+        Measure number of device CPU cycles spent processing each command
+        (i.e., dispatch, argument decoding, and execution).
+
+        Requires firmware compiled with ``COMMAND_PROFILE`` defined (see
+        ``Handler::last_command_cycles_`` in ``BaseHandler.h``).  Resolution
+        is limited to that of ``micros()`` on the device (e.g., 64 cycles on
+        a 16 MHz AVR).
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        commands : dict or list, optional
+            Command arguments (as a tuple), keyed by command name, or list of
+            names of commands taking no arguments.
+
+            Default: commands listed in :attr:`idempotent_commands` that take
+            no arguments (according to precompiled codecs, see
+            :mod:`base_node_rpc.command_codec`).
+        repeat : int, optional
+            Number of times to call each command.
+
+        Returns
+        -------
+        pandas.DataFrame or base_node_rpc.records.RecordTable
+            Minimum, median, and maximum number of cycles for each command,
+            indexed by command name.
+        '''
+        import numpy as np
+
+        if not hasattr(self, 'last_command_cycles'):
+            raise AttributeError('Firmware was not compiled with '
+                                 '`COMMAND_PROFILE` defined.')
+        if commands is None:
+            commands = [name_i for name_i in self.idempotent_commands
+                        if getattr(getattr(self, name_i, None), 'codec',
+                                   None) is not None and
+                        getattr(self, name_i).codec.arg_count == 0]
+        if not isinstance(commands, dict):
+            commands = OrderedDict((name_i, ()) for name_i in commands)
+
+        records = []
+        for name_i, args_i in commands.items():
+            cycles_i = []
+            for j in range(repeat):
+                getattr(self, name_i)(*args_i)
+                # Cycles of previous command (i.e., not including this one).
+                cycles_i.append(int(self.last_command_cycles()))
+            records.append((name_i, min(cycles_i), np.median(cycles_i),
+                            max(cycles_i)))
+        return frame(records, columns=['command', 'min', 'median', 'max'],
+                     index='command')
+
+    def flush(self, timeout_s=None):
+        '''
+        Wait for device to acknowledge all outstanding fire-and-forget
+        commands.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum number of seconds to wait.
+
+            Default: proxy timeout.
+
+        Raises
+        ------
+        IOError
+            If not all outstanding commands were acknowledged in time, or if
+            the device reported an error processing any of them.
+
+        .. versionadded:: 0.52
+        '''
+        if timeout_s is None:
+            timeout_s = self._timeout_s
+        self._ack_barrier.wait(timeout_s)
+
     def _send_command(self, packet, timeout_s=None,
-                      poll=sd.threaded.POLL_QUEUES):
+                      poll=None, bounds_checked=False):
         raise NotImplementedError
 
 
@@ -154,7 +500,11 @@ class I2cProxyMixin(object):
         self.proxy = proxy
         self.address = i2c_address
 
-    def _send_command(self, packet):
+    def _send_command(self, packet, **kwargs):
+        '''
+        .. versionchanged:: 0.52
+            Ignore extra keyword arguments (e.g., ``bounds_checked``).
+        '''
         response = self.proxy.i2c_request(self.address,
                                           list(map(ord, packet.data())))
         return cPacket(data=response.tostring(), type_=PACKET_TYPES.DATA)
@@ -184,7 +534,7 @@ def serial_ports(device_name=None, timeout=5., allow_multiple=False, **kwargs):
 
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or base_node_rpc.records.RecordTable
         Table of serial ports that match the specified :data:`device_name`.
 
         If no device name was specified, returns all serial ports that are not
@@ -195,24 +545,29 @@ def serial_ports(device_name=None, timeout=5., allow_multiple=False, **kwargs):
         Add :data:`allow_multiple` argument.
     .. versionchanged:: 0.51.2
         Pass extra keyword arguments to `available_devices()` function.
+    .. versionchanged:: 0.52
+        Return :class:`base_node_rpc.records.RecordTable` if
+        :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
     '''
     if device_name is None:
         # No device name specified in base class.
-        return sd.comports(only_available=True)
+        return comports(only_available=True)
     else:
         # Device name specified in base class.
         # Only return serial ports with matching device name in ``ID_RESPONSE``
         # packet.
         df_comports = available_devices(timeout=timeout, **kwargs)
-        if 'device_name' not in df_comports:
+        if 'device_name' not in df_comports.columns:
             # No devices found with matching name.
             raise DeviceNotFound('No named devices found.')
+        elif isinstance(df_comports, RecordTable):
+            df_comports = df_comports.matching(device_name=device_name)
         elif df_comports.shape[0]:
             df_comports = df_comports.loc[df_comports.device_name ==
                                           device_name].copy()
-        if not df_comports.shape[0]:
+        if not len(df_comports):
             raise DeviceNotFound('No devices found with matching name.')
-        elif df_comports.shape[0] > 1 and not allow_multiple:
+        elif len(df_comports) > 1 and not allow_multiple:
             # Multiple devices found with matching name.
             raise MultipleDevicesFound(df_comports)
         return df_comports
@@ -275,6 +630,9 @@ class SerialProxyMixin(object):
 
         self.serial_thread = None
         self._command_lock = threading.Lock()
+        self._last_response_time = None
+        self._heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
 
         super(SerialProxyMixin, self).__init__(**kwargs)
 
@@ -304,8 +662,18 @@ class SerialProxyMixin(object):
         '''
         Callback called if/when device is reconnected to port after lost
         connection.
+
+        .. versionchanged:: 0.52
+            Discard device values known to host (see
+            :meth:`_forget_device_values`), since device may have been reset.
+            Accept untagged responses again until device echoes request
+            identifiers, since device may have been flashed with firmware
+            predating request identifiers (see
+            :class:`base_node_rpc.queue.ResponseWaiter`).
         '''
         logger.debug('Reconnected to `%s`', protocol.port)
+        self._forget_device_values()
+        self._response_waiter.echoes_iuid = False
 
     def connection_lost(self, protocol, exception):
         '''
@@ -371,7 +739,13 @@ class SerialProxyMixin(object):
             device ID.  This is required to support devices that cannot
             communicate using the default baudrate of 9600, e.g.,
             ``pro8MHzatmega328``.
+        .. versionchanged:: 0.52
+            Import :mod:`serial_device` on connection (i.e., not when
+            importing this module, since it requires :mod:`pandas`).
         '''
+        import serial_device as sd
+        import serial_device.threaded
+
         if port is None and self.port:
             port = self.port
         if settling_time_s is None:
@@ -415,6 +789,9 @@ class SerialProxyMixin(object):
             def data_received(self, data):
                 # New data received from serial port.  Parse using queue
                 # manager.
+                #
+                # N.B., a caller waiting on a response is woken directly from
+                # here (see `ResponseWaiter`).
                 parent._packet_queue_manager.parse(data)
                 parent.serial_signals.signal('data_received')\
                     .send({'event': 'data_received', 'data': data})
@@ -440,7 +817,7 @@ class SerialProxyMixin(object):
                                        settling_time_s=settling_time_s,
                                        baudrate=baudrate)
             if port is None:
-                ports = df_comports.index.tolist()
+                ports = list(df_comports.index)
             else:
                 # List of ports was specified.
                 ports = port
@@ -515,39 +892,275 @@ class SerialProxyMixin(object):
             return
         raise IOError('Device not found on any port.')
 
+    def start_heartbeat(self, interval_s=.1, max_missed=3):
+        '''
+        Start background thread to ping device whenever the link has been
+        idle for :data:`interval_s` seconds, to detect a dead link.
+
+        Each ping is a ``ram_free`` request, with a timeout derived from the
+        round-trip times observed for the command (see
+        :class:`RttEstimator`).
+
+        A ``link-lost`` signal is sent in the :attr:`serial_signals`
+        namespace after :data:`max_missed` consecutive pings go unanswered.
+        A ``link-restored`` signal is sent upon the next successful ping.
+
+        Parameters
+        ----------
+        interval_s : float, optional
+            Idle duration (in seconds) after which to ping device.
+        max_missed : int, optional
+            Number of consecutive missed pings before link is considered
+            lost.
+
+        .. versionadded:: 0.52
+        '''
+        self.stop_heartbeat()
+        self._heartbeat_stop.clear()
+
+        ping = cPacket(data=struct.pack('<H', self._CMD_RAM_FREE),
+                       type_=PACKET_TYPES.DATA)
+
+        def _heartbeat():
+            missed = 0
+            while not self._heartbeat_stop.wait(interval_s):
+                if (self._last_response_time is not None and
+                        monotonic() - self._last_response_time <
+                        interval_s):
+                    # Link was recently active.
+                    continue
+                timeout_s = self._rtt_estimator('ram_free').timeout_s
+                try:
+                    self._send_command(ping, timeout_s=timeout_s)
+                except IOError:
+                    missed += 1
+                    logger.debug('Heartbeat missed (%d/%d).', missed,
+                                 max_missed)
+                    if missed == max_missed:
+                        self.serial_signals.signal('link-lost')\
+                            .send({'event': 'link-lost'})
+                    continue
+                if missed >= max_missed:
+                    self.serial_signals.signal('link-restored')\
+                        .send({'event': 'link-restored'})
+                missed = 0
+
+        self._heartbeat_thread = threading.Thread(target=_heartbeat)
+        self._heartbeat_thread.daemon = True
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        '''
+        Stop heartbeat thread (if running).
+
+        .. versionadded:: 0.52
+        '''
+        if self._heartbeat_thread is not None:
+            self._heartbeat_stop.set()
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
     def terminate(self):
+        '''
+        .. versionchanged:: 0.52
+            Stop heartbeat thread (if running).
+        '''
+        self.stop_heartbeat()
         if self.serial_thread is not None:
             self.serial_thread.__exit__()
 
     def _send_command(self, packet, timeout_s=None,
-                      poll=sd.threaded.POLL_QUEUES):
+                      poll=None, bounds_checked=False):
         '''
         .. versionchanged:: 0.51
             Add thread-safety using lock.
+        .. versionchanged:: 0.52
+            If :attr:`fire_and_forget` is set, send commands listed in
+            :attr:`void_commands` without waiting for a response.  Otherwise,
+            wait for any outstanding fire-and-forget commands to be
+            acknowledged before sending request.
+
+            Fire-and-forget commands are paced to avoid overflowing the
+            receive buffer of the device (see :attr:`rx_buffer_size`).
+
+            Tag each request with a unique identifier and wake caller as soon
+            as the matching response is parsed, rather than polling the
+            ``data`` queue.  Stale responses are discarded as they arrive.
+            The :data:`poll` argument is ignored.
+
+            Raise :class:`IOError` if device reports an error (i.e., ``NACK``)
+            processing request.
+
+            If :data:`timeout_s` is not specified, use timeout for command as
+            returned by :meth:`_command_timeout_s`.  Record round-trip time of
+            each synchronous command.
+
+            Retransmit commands listed in :attr:`idempotent_commands` (up to
+            :attr:`retransmit_count` times) if the response is lost or
+            corrupted, or if the device could not parse the request.
+
+            Skip request size check if :data:`bounds_checked` is ``True``
+            (e.g., for fixed-size requests already checked, see
+            :mod:`base_node_rpc.command_codec`).
         '''
-        if timeout_s is None:
-            timeout_s = self._timeout_s
+        command_name = self._command_name(packet)
+        fixed_timeout_s = timeout_s
 
-        if self._buffer_bounds_check and len(packet.data()) > self.buffer_size:
+        if (not bounds_checked and self._buffer_bounds_check and
+                len(packet.data()) > self.buffer_size):
             raise IOError('Packet size %s bytes too large.' %
                           (len(packet.data()) - self.buffer_size))
 
+        if self.fire_and_forget and self._is_void_command(packet):
+            if timeout_s is None:
+                timeout_s = self._command_timeout_s(command_name)
+            rx_buffer_size = self.rx_buffer_size
+            request_size = len(packet.tostring())
+            with self._command_lock:
+                # Wait for acknowledgements to return enough credit to fit
+                # request in device receive buffer.
+                self._ack_barrier.wait_for_credit(request_size,
+                                                  rx_buffer_size,
+                                                  timeout_s=timeout_s)
+                # Tag request with identifier to have device acknowledge
+                # request with a compact `ACK` packet.
+                iuid = self._ack_barrier.add(request_size)
+                try:
+                    self.serial_thread.write(cPacket(iuid=iuid,
+                                                     type_=PACKET_TYPES.DATA,
+                                                     data=packet.data())
+                                             .tostring())
+                except Exception:
+                    self._ack_barrier.discard(iuid)
+                    raise
+            return None
+
+        # Confirm outstanding fire-and-forget commands (if any) completed.
+        self.flush()
+
+        idempotent = command_name in self.idempotent_commands
+        attempt_count = 1 + (self.retransmit_count if idempotent else 0)
+
         with self._command_lock:
-            # Flush outstanding data packets.
-            for p in range(self.queues['data'].qsize()):
-                self.queues['data'].get()
+            for attempt_i in range(attempt_count):
+                if fixed_timeout_s is None:
+                    # Timeout may have been backed off by previous attempt.
+                    timeout_s = self._command_timeout_s(command_name)
+                try:
+                    response = self._request(packet, command_name, timeout_s,
+                                             abort_on_error=idempotent)
+                    break
+                except IOError as exception:
+                    if attempt_i + 1 >= attempt_count:
+                        raise
+                    logger.debug('Retransmit `%s` request (%s)', command_name,
+                                 exception)
+
+        if response.type_ == PACKET_TYPES.NACK:
+            raise IOError('Device reported error processing request.')
+        elif response.type_ == PACKET_TYPES.ACK:
+            # Request returned no data.
+            response = cPacket(iuid=response.iuid, type_=PACKET_TYPES.DATA,
+                               data=b'')
+        return response
 
-            try:
-                timestamp, response = (self.serial_thread
-                                       .request(self.queues['data'],
-                                                packet.tostring(),
-                                                timeout_s=timeout_s,
-                                                poll=poll))
-            except queue.Empty:
-                raise IOError('Did not receive response.')
+    def _request(self, packet, command_name, timeout_s, abort_on_error=False):
+        '''
+        Send request tagged with a new identifier and wait for response.
+
+        **N.B.,** Must be called with command lock held.
+
+        Returns
+        -------
+        nadamq.NadaMq.cPacket
+            Response packet.
+
+        Raises
+        ------
+        IOError
+            If no response is received.
+
+        .. versionadded:: 0.52
+        '''
+        iuid = self._ack_barrier.next_iuid()
+        # Any response to a previous request arriving from now on (e.g., a
+        # late response to a retransmitted request) is discarded.
+        self._response_waiter.expect(iuid, abort_on_error=abort_on_error)
+        start = monotonic()
+        self.serial_thread.write(cPacket(iuid=iuid, type_=PACKET_TYPES.DATA,
+                                         data=packet.data()).tostring())
+        try:
+            timestamp, response = self._response_waiter.wait(timeout_s)
+        except IOError:
+            self._rtt_estimator(command_name).backoff()
+            raise
+        # Measure using monotonic clock (see `ResponseWaiter.received_s`).
+        received_s = self._response_waiter.received_s
+        self._rtt_estimator(command_name).update(received_s - start)
+        self._last_response_time = received_s
         return response
 
 
+def _cached_record(proxy, name, message_class, enabled=True):
+    '''
+    Read and decode message (e.g., config) from device.
+
+    If device provides a ``<name>_generation`` command and :data:`enabled` is
+    ``True``, only query the device-side change counter and return cached
+    values if the counter has not changed since the message was last read.
+
+    Cached values are discarded upon reconnecting to the device or receiving
+    an ``ID_RESPONSE`` packet.  On AVR devices, counters start from a value
+    identifying the current boot (see ``BootNonce.h``), such that counter
+    values are not repeated after the device is otherwise reset.
+
+    .. versionadded:: 0.52
+
+    Parameters
+    ----------
+    proxy : ProxyBase
+        Device proxy.
+    name : str
+        Message name, e.g., ``'config'`` or ``'state'``.
+    message_class : type
+        Protocol Buffer message class.
+    enabled : bool, optional
+        If ``False``, always read message from device.
+
+    Returns
+    -------
+    collections.OrderedDict
+        Field values, keyed by full field name.
+    '''
+    generation = None
+    if enabled and hasattr(proxy, '%s_generation' % name):
+        # Query counter *before* reading message, such that a concurrent
+        # change causes the next query to read the message again.
+        generation = int(getattr(proxy, '%s_generation' % name)())
+        if not hasattr(proxy, '_generation_cache'):
+            proxy._generation_cache = {}
+        cached = proxy._generation_cache.get(name)
+        if cached is not None and cached[0] == generation:
+            return cached[1].copy()
+
+    serialize = getattr(proxy, 'serialize_%s' % name)
+    record = get_decoder(message_class)(serialize().tostring())
+    if generation is not None:
+        proxy._generation_cache[name] = (generation, record.copy())
+    return record
+
+
+def _forget_values(values, names):
+    '''
+    Remove names from last known field values (if any).
+
+    .. versionadded:: 0.52
+    '''
+    if values is not None:
+        for name_i in names:
+            values.pop(name_i, None)
+
+
 class ConfigMixinBase(object):
     '''
     Mixin class to add convenience wrappers around config getter/setter.
@@ -567,17 +1180,49 @@ class ConfigMixinBase(object):
 
     @property
     def config(self):
-        import pandas as pd
-
+        '''
+        .. versionchanged:: 0.52
+            Decode using compiled decoder (see :meth:`get_config`).  Return
+            :class:`base_node_rpc.records.Record` if
+            :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
+        '''
         try:
-            fv = resolve_field_values(self._config_pb,
-                                      set_default=True).set_index(['full_name'])
-            return pd.Series(OrderedDict([(k, PYTYPE_MAP[v.field_desc
-                                                         .type](v.value))
-                                          for k, v in fv.iterrows()]),
-                             dtype=object)
+            return series(self.get_config())
         except ValueError:
-            return pd.Series()
+            return series({})
+
+    def get_config(self, as_series=False):
+        '''
+        Read config from device.
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        as_series : bool, optional
+            If ``True``, return a :class:`pandas.Series`.
+
+        Returns
+        -------
+        collections.OrderedDict or pandas.Series
+            Config field values, keyed by ``.``-separated full field name.
+
+        If the device provides a ``config_generation`` command, the config is
+        only read if it has changed since it was last read.  Otherwise, cached
+        values are returned.
+
+        See also
+        --------
+        :class:`base_node_rpc.protobuf_codec.MessageDecoder`
+        '''
+        record = _cached_record(self, 'config', self.config_class)
+        # Last known device values (see :meth:`update_config`).
+        self._config_values = record.copy()
+        if as_series:
+            import pandas as pd
+
+            return pd.Series(record, dtype=object)
+        return record
 
     @config.setter
     def config(self, value):
@@ -596,14 +1241,39 @@ class ConfigMixinBase(object):
         can pass the special keyword argument 'save=False'. In this case, you
         will need to call the method save_config() to make your changes
         persistent.
+
+        By default, only fields that differ from the last known device values
+        are sent.  If no field differs, neither the config update nor the
+        save are sent to the device and ``None`` is returned.  To send all
+        specified fields, pass the special keyword argument 'delta=False'.
+
+        .. versionchanged:: 0.52
+            Only send changed fields (see 'delta' keyword argument).  Field
+            names may also be full field names (e.g., as in :attr:`config`).
         '''
         save = True
         if 'save' in kwargs and not kwargs.pop('save'):
             save = False
+        delta = kwargs.pop('delta', True)
+
+        decoder = get_decoder(self.config_class)
+        if delta:
+            if (getattr(self, '_config_values', None) is None or
+                    hasattr(self, 'config_generation')):
+                # Read current values from device to compare against (only
+                # queries change counter if config is cached).
+                self.get_config()
+            kwargs = decoder.changed(kwargs, self._config_values)
+            if not kwargs:
+                return None
 
         # convert dictionary to a protobuf
-        config_pb = self.config_class(**kwargs)
+        config_pb = decoder.encode(kwargs)
 
+        # Device may reject or adjust values, so values of updated fields
+        # are no longer known.
+        _forget_values(getattr(self, '_config_values', None),
+                       decoder.flatten(kwargs))
         return_code = super(ConfigMixinBase, self).update_config(config_pb)
 
         if save:
@@ -625,10 +1295,20 @@ class ConfigMixinBase(object):
         if 'save' in kwargs and not kwargs.pop('save'):
             save = False
 
+        self._config_values = None
         super(ConfigMixinBase, self).reset_config()
         if save:
             super(ConfigMixinBase, self).save_config()
 
+    def load_config(self, *args, **kwargs):
+        '''
+        Load config from EEPROM, discarding last known config values.
+
+        .. versionadded:: 0.52
+        '''
+        self._config_values = None
+        return super(ConfigMixinBase, self).load_config(*args, **kwargs)
+
 
 class StateMixinBase(object):
     '''
@@ -636,7 +1316,22 @@ class StateMixinBase(object):
 
     **N.B.,** Sub-classes *MUST* implement the `state_class` method to return
     the `State` class type for the proxy.
+
+    .. versionchanged:: 0.52
+        Add state mirror updated by state changes pushed by device (see
+        :meth:`start_state_mirror`).
     '''
+    #: If ``True``, cache state based on device-side change counter (see
+    #: :meth:`get_state`).
+    #:
+    #: .. warning::
+    #:     Only enable if firmware increments ``state_generation_`` whenever
+    #:     it modifies the state directly (i.e., other than through
+    #:     ``update_state`` or ``reset_state``).
+    #:
+    #: .. versionadded:: 0.52
+    cache_state = False
+
     @property
     def state_class(self):
         raise NotImplementedError('Sub-classes must implement this method to '
@@ -649,18 +1344,50 @@ class StateMixinBase(object):
 
     @property
     def state(self):
-        import pandas as pd
-
+        '''
+        .. versionchanged:: 0.52
+            Decode using compiled decoder (see :meth:`get_state`).  Return
+            :class:`base_node_rpc.records.Record` if
+            :data:`base_node_rpc.records.USE_PANDAS` is ``False``.
+        '''
         try:
-            fv = (resolve_field_values(self._state_pb,
-                                       set_default=True)
-                  .set_index(['full_name']))
-            return pd.Series(OrderedDict([(k, PYTYPE_MAP[v.field_desc
-                                                         .type](v.value))
-                                          for k, v in fv.iterrows()]),
-                             dtype=object)
+            return series(self.get_state())
         except ValueError:
-            return pd.Series()
+            return series({})
+
+    def get_state(self, as_series=False):
+        '''
+        Read state from device.
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        as_series : bool, optional
+            If ``True``, return a :class:`pandas.Series`.
+
+        Returns
+        -------
+        collections.OrderedDict or pandas.Series
+            State field values, keyed by ``.``-separated full field name.
+
+        If :attr:`cache_state` is ``True`` and the device provides a
+        ``state_generation`` command, the state is only read if it has changed
+        since it was last read.  Otherwise, cached values are returned.
+
+        See also
+        --------
+        :class:`base_node_rpc.protobuf_codec.MessageDecoder`
+        '''
+        record = _cached_record(self, 'state', self.state_class,
+                                enabled=self.cache_state)
+        # Last known device values (see :meth:`update_state`).
+        self._state_values = record.copy()
+        if as_series:
+            import pandas as pd
+
+            return pd.Series(record, dtype=object)
+        return record
 
     @state.setter
     def state(self, value):
@@ -671,5 +1398,188 @@ class StateMixinBase(object):
         self.update_state(**value)
 
     def update_state(self, **kwargs):
-        state = self.state_class(**kwargs)
+        '''
+        Update fields in the state object based on keyword arguments.
+
+        If the special keyword argument 'delta=True' is passed, only fields
+        that differ from the last known device values (i.e., as of the last
+        :meth:`get_state` call) are sent.  If no field differs, the update is
+        skipped and ``None`` is returned.
+
+        .. note::
+            Unlike config, state may be changed by the device itself, in which
+            case last known values are stale.  Only set 'delta=True' if this
+            is not the case.
+
+        .. versionchanged:: 0.52
+            Add 'delta' keyword argument.  Field names may also be full field
+            names (e.g., as in :attr:`state`).
+        '''
+        delta = kwargs.pop('delta', False)
+
+        decoder = get_decoder(self.state_class)
+        if delta:
+            if (getattr(self, '_state_values', None) is None or
+                    (self.cache_state and hasattr(self, 'state_generation'))):
+                # Read current values from device to compare against (only
+                # queries change counter if state is cached).
+                self.get_state()
+            kwargs = decoder.changed(kwargs, self._state_values)
+            if not kwargs:
+                return None
+
+        state = decoder.encode(kwargs)
+        # Device may reject or adjust values, so values of updated fields are
+        # no longer known.
+        _forget_values(getattr(self, '_state_values', None),
+                       decoder.flatten(kwargs))
         return super(StateMixinBase, self).update_state(state)
+
+    @property
+    def state_signals(self):
+        '''
+        Namespace of state change signals sent by the state mirror (see
+        :meth:`start_state_mirror`):
+
+         - ``<full field name>``: sent with ``value`` and ``previous``
+           keyword arguments whenever the respective field changes.
+         - ``state-changed``: sent with ``changes`` keyword argument (changed
+           field values, keyed by full field name) for each pushed update
+           that changes any field.
+
+        Example
+        -------
+
+        >>> def on_voltage(sender, value=None, previous=None):
+        ...     print('voltage: %s -> %s' % (previous, value))
+        >>> proxy.state_signals.signal('voltage').connect(on_voltage)
+        >>> proxy.start_state_mirror()
+
+        .. versionadded:: 0.52
+
+        Returns
+        -------
+        blinker.Namespace
+        '''
+        if getattr(self, '_state_signals', None) is None:
+            self._state_signals = blinker.Namespace()
+        return self._state_signals
+
+    def start_state_mirror(self):
+        '''
+        Mirror device state on the host based on state changes pushed by the
+        device in STREAM packets, i.e., rather than polling
+        ``serialize_state()``.
+
+        Requires firmware compiled with ``STATE_STREAM`` defined (see
+        ``BaseNodeState.h``).
+
+        .. versionadded:: 0.52
+
+        Returns
+        -------
+        collections.OrderedDict
+            Current state field values (see :attr:`state_mirror`).
+        '''
+        if getattr(self, '_state_mirror_lock', None) is None:
+            self._state_mirror_lock = threading.Lock()
+        self._state_mirror = None
+        self._packet_queue_manager.signals.signal('stream-received')\
+            .connect(self._on_state_stream)
+        return self.state_mirror
+
+    def stop_state_mirror(self):
+        '''
+        Stop mirroring device state (see :meth:`start_state_mirror`).
+
+        .. versionadded:: 0.52
+        '''
+        self._packet_queue_manager.signals.signal('stream-received')\
+            .disconnect(self._on_state_stream)
+        self._state_mirror = None
+
+    @property
+    def state_mirror(self):
+        '''
+        Mirrored state field values, keyed by full field name.
+
+        State is read from the device on first access after
+        :meth:`start_state_mirror` is called (or after reconnecting), and
+        afterwards only updated by changes pushed by the device.
+
+        .. versionadded:: 0.52
+
+        Returns
+        -------
+        collections.OrderedDict
+            Copy of mirrored state (``None`` if mirror is not started).
+        '''
+        if getattr(self, '_state_mirror_lock', None) is None:
+            return None
+        with self._state_mirror_lock:
+            mirror = self._state_mirror
+        if mirror is None:
+            record = self.get_state()
+            with self._state_mirror_lock:
+                if self._state_mirror is None:
+                    self._state_mirror = record
+                mirror = self._state_mirror
+        with self._state_mirror_lock:
+            return mirror.copy()
+
+    def _on_state_stream(self, packet):
+        '''
+        Apply state changes pushed by device to :attr:`state_mirror` and send
+        corresponding :attr:`state_signals`.
+
+        .. versionadded:: 0.52
+
+        Returns
+        -------
+        bool
+            ``True`` if :data:`packet` contains state changes (i.e., packet is
+            consumed).
+        '''
+        if packet.iuid != STATE_STREAM_IUID:
+            return False
+        try:
+            values = get_decoder(self.state_class)\
+                .decode_fields(packet.data())
+        except Exception:
+            logger.debug('Error decoding state stream packet.', exc_info=True)
+            return True
+
+        changes = OrderedDict()
+        with self._state_mirror_lock:
+            mirror = self._state_mirror
+            if mirror is None:
+                # Mirror is read in full on next access.
+                return True
+            for name_i, value_i in values.items():
+                previous_i = mirror.get(name_i)
+                if previous_i != value_i:
+                    changes[name_i] = (value_i, previous_i)
+                mirror[name_i] = value_i
+            if getattr(self, '_state_values', None) is not None:
+                # Last known device values (see :meth:`update_state`).
+                self._state_values.update(values)
+
+        # Send signals outside of lock, since receivers may access mirror.
+        for name_i, (value_i, previous_i) in changes.items():
+            self.state_signals.signal(name_i).send(self, value=value_i,
+                                                   previous=previous_i)
+        if changes:
+            self.state_signals.signal('state-changed')\
+                .send(self, changes=OrderedDict([(name_i, value_i)
+                                                 for name_i, (value_i, _) in
+                                                 changes.items()]))
+        return True
+
+    def reset_state(self, *args, **kwargs):
+        '''
+        Reset state to default values, discarding last known state values.
+
+        .. versionadded:: 0.52
+        '''
+        self._state_values = None
+        return super(StateMixinBase, self).reset_state(*args, **kwargs)
@@ -2,14 +2,21 @@ from __future__ import absolute_import
 import logging
 import time
 from datetime import datetime
-from threading import Thread
+from threading import Condition, Event, Lock, Thread
 
 from nadamq.NadaMq import cPacketParser, PACKET_TYPES
 from six.moves import queue
 import blinker
 import json_tricks
 import numpy as np
-import pandas as pd
+
+from .records import Record
+
+try:
+    from time import monotonic
+except ImportError:
+    # Python 2 (not monotonic, but highest resolution timer available).
+    from timeit import default_timer as monotonic
 
 logger = logging.getLogger(name=__name__)
 
@@ -17,6 +24,12 @@ logger = logging.getLogger(name=__name__)
 # behaviour.
 json_tricks.NumpyEncoder.SHOW_SCALAR_WARNING = False
 
+#: Packet identifier of STREAM packets containing state changes pushed by
+#: device (see ``STATE_STREAM_IUID`` in ``BaseNodeState.h``).
+#:
+#: .. versionadded:: 0.52
+STATE_STREAM_IUID = 0x5354
+
 
 class PacketQueueManager(object):
     '''
@@ -64,14 +77,26 @@ class PacketQueueManager(object):
     .. versionchanged:: 0.41.1
         Do not add event packets to a queue.  This prevents the ``stream``
         queue from filling up with rapidly occurring events.
+
+    .. versionchanged:: 0.52
+        Add queue for :attr:`nadamq.NadaMq.PACKET_TYPES.NACK` packets.
+
+    .. versionchanged:: 0.52
+        A packet is not added to a queue if any receiver connected to the
+        corresponding ``<type>-received`` signal returns ``True``, i.e.,
+        indicates that it has consumed the packet.
+
+    .. versionchanged:: 0.52
+        :attr:`packet_queues` is a :class:`base_node_rpc.records.Record`
+        (rather than a :class:`pandas.Series`).
     '''
     def __init__(self, high_water_mark=None):
         self._packet_parser = cPacketParser()
-        packet_types = ['data', 'ack', 'stream', 'id_response']
+        packet_types = ['data', 'ack', 'nack', 'stream', 'id_response']
         # Signals to connect to indicating packet received or queue is full.
         self.signals = blinker.Namespace()
-        self.packet_queues = pd.Series([queue.Queue() for t in packet_types],
-                                       index=packet_types)
+        self.packet_queues = Record([(t, queue.Queue())
+                                     for t in packet_types])
         self.high_water_mark = high_water_mark
 
     def parse_available(self, stream):
@@ -113,6 +138,18 @@ class PacketQueueManager(object):
             Do not add event packets to a queue.  This prevents the ``stream``
             queue from filling up with rapidly occurring events.
 
+        .. versionchanged:: 0.52
+            Add handling for :attr:`nadamq.NadaMq.PACKET_TYPES.NACK` packets.
+            Do not queue packets consumed by a ``<type>-received`` signal
+            receiver (i.e., a receiver that returns ``True``).  Send
+            ``parse-error`` signal if an error occurs while parsing a packet
+            (e.g., CRC mismatch).
+
+        .. versionchanged:: 0.52
+            Do not attempt to decode state change packets (i.e., STREAM
+            packets with :data:`STATE_STREAM_IUID` as identifier) as JSON
+            event messages.
+
         Parameters
         ----------
         data : str or bytes
@@ -136,33 +173,55 @@ class PacketQueueManager(object):
                 # Reset the state of the packet parser to prepare for next
                 # packet.
                 self._packet_parser.reset()
+                self.signals.signal('parse-error').send()
 
         # Filter packets parsed during this method call and queue according to
         # packet type.
         for t, p in packets:
-            if p.type_ == PACKET_TYPES.STREAM:
-                try:
-                    # XXX Use `json_tricks` rather than standard `json` to
-                    # support serializing [Numpy arrays and scalars][1].
-                    #
-                    # [1]: http://json-tricks.readthedocs.io/en/latest/#numpy-arrays
-                    message = json_tricks.loads(p.data().decode('utf8'))
-                    self.signals.signal(message['event']).send(message)
-                    # Do not add event packets to a queue.  This prevents the
-                    # `stream` queue from filling up with rapidly occurring
-                    # events.
+            self._dispatch(t, p)
+
+    def _dispatch(self, t, p):
+        '''
+        Send signals for parsed packet and/or push packet on queue according
+        to the type of packet (see :meth:`parse`).
+
+        .. versionadded:: 0.52
+
+        Parameters
+        ----------
+        t : datetime.datetime
+            Time packet was parsed.
+        p : nadamq.NadaMq.cPacket
+            Parsed packet.
+        '''
+        # State changes are binary encoded, so skip JSON decoding.
+        if p.type_ == PACKET_TYPES.STREAM and p.iuid != STATE_STREAM_IUID:
+            try:
+                # XXX Use `json_tricks` rather than standard `json` to
+                # support serializing [Numpy arrays and scalars][1].
+                #
+                # [1]: http://json-tricks.readthedocs.io/en/latest/#numpy-arrays
+                message = json_tricks.loads(p.data().decode('utf8'))
+                self.signals.signal(message['event']).send(message)
+                # Do not add event packets to a queue.  This prevents the
+                # `stream` queue from filling up with rapidly occurring
+                # events.
+                return
+            except Exception:
+                logger.debug('Stream packet contents do not describe an '
+                             'event: %s', p.data(), exc_info=True)
+
+        for packet_type_i in ('data', 'ack', 'nack', 'stream', 'id_response'):
+            if p.type_ == getattr(PACKET_TYPES, packet_type_i.upper()):
+                results = (self.signals.signal('%s-received' %
+                                               packet_type_i).send(p))
+                if any(result_i for receiver_i, result_i in results):
+                    # Packet was consumed by a signal receiver.
                     continue
-                except Exception:
-                    logger.debug('Stream packet contents do not describe an '
-                                 'event: %s', p.data(), exc_info=True)
-
-            for packet_type_i in ('data', 'ack', 'stream', 'id_response'):
-                if p.type_ == getattr(PACKET_TYPES, packet_type_i.upper()):
-                    self.signals.signal('%s-received' % packet_type_i).send(p)
-                    if self.queue_full(packet_type_i):
-                        self.signals.signal('%s-full' % packet_type_i).send()
-                    else:
-                        self.packet_queues[packet_type_i].put((t, p))
+                elif self.queue_full(packet_type_i):
+                    self.signals.signal('%s-full' % packet_type_i).send()
+                else:
+                    self.packet_queues[packet_type_i].put((t, p))
 
     def queue_full(self, name):
         '''
@@ -181,6 +240,393 @@ class PacketQueueManager(object):
                 (self.packet_queues[name].qsize() >= self.high_water_mark))
 
 
+class AckBarrier(object):
+    '''
+    Track requests sent without waiting for a response (i.e.,
+    *fire-and-forget* requests), each tagged with a unique identifier
+    (``iuid``) which the device echoes in the corresponding ``ACK`` (or
+    ``NACK``) packet.
+
+    Connect :meth:`on_ack` and :meth:`on_nack` to the ``ack-received`` and
+    ``nack-received`` signals of a :class:`PacketQueueManager`, respectively.
+    Call :meth:`wait` to block until all outstanding requests are
+    acknowledged, or :meth:`wait_for_credit` to pace writes according to the
+    number of request bytes the device has yet to acknowledge.
+
+    .. versionadded:: 0.52
+    '''
+    def __init__(self):
+        self._condition = Condition()
+        self._iuid = 0
+        #: Size in bytes of each request awaiting acknowledgement, keyed by
+        #: identifier.
+        self.pending = {}
+        #: Identifiers of requests the device reported errors for.
+        self.errors = []
+
+    @property
+    def pending_bytes(self):
+        '''
+        Total size in bytes of requests awaiting acknowledgement.
+        '''
+        with self._condition:
+            return sum(self.pending.values())
+
+    def next_iuid(self):
+        '''
+        Returns
+        -------
+        int
+            Unique (non-zero) identifier to tag a request with.
+
+            Identifiers are unique among outstanding requests, including
+            requests *not* tracked by this barrier (e.g., synchronous
+            requests).
+        '''
+        with self._condition:
+            # Identifier is 16-bit and `0` is reserved for untagged requests.
+            self._iuid = self._iuid % 0xFFFF + 1
+            return self._iuid
+
+    def add(self, size=0):
+        '''
+        Parameters
+        ----------
+        size : int, optional
+            Size of request in bytes.
+
+        Returns
+        -------
+        int
+            Unique (non-zero) identifier to tag outstanding request with.
+        '''
+        with self._condition:
+            iuid = self.next_iuid()
+            self.pending[iuid] = size
+            return iuid
+
+    def discard(self, iuid):
+        '''
+        Returns
+        -------
+        bool
+            ``True`` if request with specified identifier was outstanding.
+        '''
+        with self._condition:
+            found = self.pending.pop(iuid, None) is not None
+            self._condition.notify_all()
+            return found
+
+    def on_ack(self, packet):
+        return self.discard(packet.iuid)
+
+    def on_nack(self, packet):
+        '''
+        .. versionchanged:: 0.52
+            Record an error if a ``NACK`` with an identifier of 0 is received
+            while requests are outstanding, i.e., device discarded a corrupted
+            request, which may be any outstanding request.
+        '''
+        with self._condition:
+            if packet.iuid in self.pending or (packet.iuid == 0 and
+                                               self.pending):
+                self.errors.append(packet.iuid)
+            return self.discard(packet.iuid)
+
+    def _wait_until(self, predicate, timeout_s):
+        '''
+        Wait (with condition lock held) until :data:`predicate` returns
+        ``True``.
+
+        Raises
+        ------
+        IOError
+            If timeout is reached.  Outstanding requests are assumed to be lost
+            and are cleared before raising.
+        '''
+        if timeout_s is not None:
+            end_time = monotonic() + timeout_s
+        while not predicate():
+            if timeout_s is None:
+                self._condition.wait()
+                continue
+            remaining_s = end_time - monotonic()
+            if remaining_s <= 0:
+                lost_count = len(self.pending)
+                self.pending.clear()
+                self.errors = []
+                raise IOError('%d request(s) not acknowledged.' % lost_count)
+            self._condition.wait(remaining_s)
+
+    def wait(self, timeout_s=None):
+        '''
+        Wait for all outstanding requests to be acknowledged.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum number of seconds to wait.
+
+            If ``None``, block until all outstanding requests are
+            acknowledged.
+
+        Raises
+        ------
+        IOError
+            If not all outstanding requests were acknowledged before the
+            timeout, or if the device reported an error (i.e., ``NACK``) for
+            any request since the last call.
+
+            Outstanding requests and errors are cleared before raising.
+        '''
+        with self._condition:
+            self._wait_until(lambda: not self.pending, timeout_s)
+            if self.errors:
+                error_count = len(self.errors)
+                self.errors = []
+                raise IOError('Device reported error for %d request(s).' %
+                              error_count)
+
+    def wait_for_credit(self, size, capacity, timeout_s=None):
+        '''
+        Wait until a request of :data:`size` bytes fits within the receive
+        :data:`capacity` of the device, i.e., until enough outstanding
+        requests have been acknowledged to return the required credit.
+
+        A request is always allowed when no other requests are outstanding,
+        regardless of size.
+
+        Parameters
+        ----------
+        size : int
+            Size of request in bytes.
+        capacity : int
+            Number of bytes the device is able to buffer.
+        timeout_s : float, optional
+            Maximum number of seconds to wait.
+
+        Raises
+        ------
+        IOError
+            If credit was not returned before the timeout.
+
+        .. versionadded:: 0.52
+        '''
+        with self._condition:
+            self._wait_until(lambda: (not self.pending or
+                                      sum(self.pending.values()) + size <=
+                                      capacity), timeout_s)
+
+
+class ResponseWaiter(object):
+    '''
+    Wake a caller waiting for the response to a request directly from the
+    thread parsing received packets, i.e., without polling a queue.
+
+    Each request is tagged with an identifier (``iuid``), which acts as a
+    generation counter: a response that does not match the current request
+    (e.g., a late response to a request that timed out) is discarded as soon
+    as it arrives.  There is therefore no need to flush stale responses
+    before sending a request.
+
+    Firmware predating request identifiers responds with an identifier of 0.
+    Until a response echoing the identifier of its request is received (see
+    :attr:`echoes_iuid`), an untagged response is accepted as the response
+    to the current (i.e., only outstanding) request.
+
+    Connect :meth:`on_response` to the ``data-received`` and ``ack-received``
+    signals, :meth:`on_nack` to the ``nack-received`` signal, and
+    :meth:`on_parse_error` to the ``parse-error`` signal of a
+    :class:`PacketQueueManager`.
+
+    .. versionadded:: 0.52
+    '''
+    def __init__(self):
+        self._lock = Lock()
+        self._event = Event()
+        self._iuid = None
+        self._response = None
+        self._abort_on_error = False
+        self._error = None
+        #: Reception time of most recent response according to
+        #: :func:`monotonic` (in seconds), e.g., to measure round-trip time
+        #: unaffected by system clock adjustments.
+        self.received_s = None
+        #: ``True`` once device has echoed the identifier of a request, i.e.,
+        #: once only responses tagged with the current identifier are
+        #: accepted.
+        self.echoes_iuid = False
+
+    def expect(self, iuid, abort_on_error=False):
+        '''
+        Prepare to receive response to request tagged with :data:`iuid`.
+
+        Any response to a previous request is discarded.
+
+        Parameters
+        ----------
+        iuid : int
+            Request identifier.
+        abort_on_error : bool, optional
+            If ``True``, stop waiting as soon as a packet parse error occurs,
+            since the response may have been corrupted.
+        '''
+        with self._lock:
+            self._iuid = iuid
+            self._response = None
+            self._abort_on_error = abort_on_error
+            self._error = None
+            self._event.clear()
+
+    def on_response(self, packet):
+        '''
+        Returns
+        -------
+        bool
+            ``True`` if packet was accepted as response to current request.
+        '''
+        with self._lock:
+            if self._iuid is None:
+                return False
+            if packet.iuid == self._iuid:
+                self.echoes_iuid = True
+            elif packet.iuid != 0 or self.echoes_iuid:
+                # Response to another request (an identifier of 0 does not
+                # identify any request once device is known to echo
+                # identifiers).
+                return False
+            self._iuid = None
+            self.received_s = monotonic()
+            self._response = (datetime.now(), packet)
+            self._event.set()
+            return True
+
+    def on_nack(self, packet):
+        '''
+        A ``NACK`` with an identifier of 0 indicates that the device discarded
+        a corrupted request (see ``SerialHandler.h``), i.e., since requests
+        are sent one at a time, the current request.  Stop waiting, since no
+        response will arrive.
+
+        Returns
+        -------
+        bool
+            ``True`` if packet was accepted as response to current request.
+        '''
+        if packet.iuid != 0:
+            return self.on_response(packet)
+        with self._lock:
+            if self._iuid is not None:
+                self._iuid = None
+                self._error = 'Device could not parse request.'
+                self._event.set()
+        return False
+
+    def on_parse_error(self, *args):
+        with self._lock:
+            if self._iuid is not None and self._abort_on_error:
+                self._iuid = None
+                self._error = 'Error parsing response.'
+                self._event.set()
+
+    def wait(self, timeout_s=None):
+        '''
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum number of seconds to wait for response.
+
+        Returns
+        -------
+        tuple
+            Response reception time and response packet, i.e.,
+            ``(datetime, cPacket)``.
+
+            See :attr:`received_s` for reception time according to
+            :func:`monotonic`.
+
+        Raises
+        ------
+        IOError
+            If no response was received before the timeout, or if waiting was
+            aborted due to a parse error (see :meth:`expect`) or due to the
+            device discarding the request (see :meth:`on_nack`).
+        '''
+        self._event.wait(timeout_s)
+        with self._lock:
+            if self._response is None:
+                # Discard response if it arrives after timeout.
+                self._iuid = None
+                if self._error is not None:
+                    raise IOError(self._error)
+                raise IOError('Did not receive response.')
+            return self._response
+
+
+class RttEstimator(object):
+    '''
+    Estimate round-trip time (RTT) from observed request/response times and
+    derive a response timeout, using the smoothed RTT (``SRTT``) and RTT
+    variation (``RTTVAR``) estimators of `TCP`__.
+
+    __ https://tools.ietf.org/html/rfc6298
+
+    Parameters
+    ----------
+    min_timeout_s : float, optional
+        Lower bound on timeout.
+    max_timeout_s : float, optional
+        Upper bound on timeout.  Also used as timeout until the first sample
+        is recorded.
+    k : float, optional
+        Number of RTT variations to allow beyond the smoothed RTT.
+    alpha : float, optional
+        Gain of smoothed RTT estimator.
+    beta : float, optional
+        Gain of RTT variation estimator.
+
+    .. versionadded:: 0.52
+    '''
+    def __init__(self, min_timeout_s=.05, max_timeout_s=10., k=4,
+                 alpha=1. / 8, beta=1. / 4):
+        self.min_timeout_s = min_timeout_s
+        self.max_timeout_s = max_timeout_s
+        self.k = k
+        self.alpha = alpha
+        self.beta = beta
+        self.srtt_s = None
+        self.rttvar_s = None
+        self._backoff = 1
+
+    def update(self, rtt_s):
+        '''
+        Record round-trip time sample.
+        '''
+        if self.srtt_s is None:
+            self.srtt_s = rtt_s
+            self.rttvar_s = rtt_s / 2.
+        else:
+            self.rttvar_s = ((1 - self.beta) * self.rttvar_s + self.beta *
+                             abs(self.srtt_s - rtt_s))
+            self.srtt_s = (1 - self.alpha) * self.srtt_s + self.alpha * rtt_s
+        self._backoff = 1
+
+    def backoff(self):
+        '''
+        Double timeout (up to :attr:`max_timeout_s`) after a response was not
+        received in time.  Reset by the next call to :meth:`update`.
+        '''
+        if self.timeout_s < self.max_timeout_s:
+            self._backoff *= 2
+
+    @property
+    def timeout_s(self):
+        if self.srtt_s is None:
+            return self.max_timeout_s
+        timeout_s = self._backoff * (self.srtt_s + self.k * self.rttvar_s)
+        return min(max(timeout_s, self.min_timeout_s), self.max_timeout_s)
+
+
 class SerialStream(object):
     '''
     Wrapper around :class:`serial.Serial` device to provide a parameterless
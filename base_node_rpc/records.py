@@ -0,0 +1,211 @@
+'''
+Lightweight record types used by the core runtime in place of :mod:`pandas`
+containers, with optional conversion to :mod:`pandas` types at the API edge.
+
+Values returned to the caller (e.g., :attr:`base_node_rpc.proxy.ProxyBase
+.properties`, :func:`base_node_rpc.available_devices`) are converted to
+:mod:`pandas` types if :data:`USE_PANDAS` is ``True``.  Otherwise, records
+are returned as is and :mod:`pandas` is never imported, e.g., on embedded
+hosts where memory use and start-up time matter.
+
+.. versionadded:: 0.52
+'''
+from __future__ import absolute_import
+from collections import OrderedDict
+import os
+
+
+def _pandas_available():
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        # Python 2.
+        import imp
+
+        try:
+            imp.find_module('pandas')
+        except ImportError:
+            return False
+        return True
+    return find_spec('pandas') is not None
+
+
+#: If ``True``, convert records to :mod:`pandas` types at the API edge.
+#:
+#: Default: ``True`` if :mod:`pandas` is installed, unless the
+#: ``BASE_NODE_RPC_PANDAS`` environment variable is set to ``0``.
+USE_PANDAS = (os.environ.get('BASE_NODE_RPC_PANDAS', '1') != '0' and
+              _pandas_available())
+
+
+class Record(OrderedDict):
+    '''
+    Ordered mapping of values, with attribute access to items (i.e., like a
+    :class:`pandas.Series` with an ``object`` dtype).
+    '''
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            # E.g., internal `OrderedDict` or pickle attributes.
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @property
+    def index(self):
+        return list(self.keys())
+
+    def to_dict(self):
+        return dict(self)
+
+    def to_series(self):
+        '''
+        Returns
+        -------
+        pandas.Series
+        '''
+        import pandas as pd
+
+        return pd.Series(self, dtype=object)
+
+
+class RecordTable(OrderedDict):
+    '''
+    Ordered mapping of :class:`Record` rows, keyed by index value (i.e., like
+    a :class:`pandas.DataFrame`).
+
+    Parameters
+    ----------
+    rows : list, optional
+        ``(index value, row)`` tuples, where each row is a mapping.
+    index_name : str, optional
+        Name of index (e.g., ``port``).
+    '''
+    def __init__(self, rows=(), index_name=None):
+        super(RecordTable, self).__init__((key_i, Record(row_i))
+                                          for key_i, row_i in rows)
+        self.index_name = index_name
+
+    def __reduce__(self):
+        return (self.__class__, (list(self.items()), self.index_name))
+
+    def copy(self):
+        return self.__class__(self.items(), index_name=self.index_name)
+
+    @property
+    def index(self):
+        return list(self.keys())
+
+    @property
+    def columns(self):
+        '''
+        Names of all items of rows (in order of first occurrence).
+        '''
+        columns = OrderedDict()
+        for row_i in self.values():
+            columns.update((name_j, None) for name_j in row_i)
+        return list(columns)
+
+    def matching(self, **values):
+        '''
+        Returns
+        -------
+        RecordTable
+            Rows with the specified item values.
+        '''
+        return self.__class__([(key_i, row_i) for key_i, row_i in
+                               self.items()
+                               if all(row_i.get(name_j) == value_j
+                                      for name_j, value_j in
+                                      values.items())],
+                              index_name=self.index_name)
+
+    def join_records(self, records, key):
+        '''
+        Parameters
+        ----------
+        records : list
+            Mappings, each containing the index value of a row as the
+            :data:`key` item.
+        key : str
+            Name of item containing index value.
+
+        Returns
+        -------
+        RecordTable
+            Copy of table with the items of each record added to the
+            respective row.  Records not matching a row are ignored (i.e.,
+            like :meth:`pandas.DataFrame.join`).
+        '''
+        table = self.copy()
+        for record_i in records:
+            row = table.get(record_i[key])
+            if row is not None:
+                row.update((name_j, value_j) for name_j, value_j in
+                           record_i.items() if name_j != key)
+        return table
+
+    def to_frame(self):
+        '''
+        Returns
+        -------
+        pandas.DataFrame
+        '''
+        import pandas as pd
+
+        df = pd.DataFrame(list(self.values()), index=self.index,
+                          columns=self.columns)
+        df.index.name = self.index_name
+        return df
+
+
+def series(values):
+    '''
+    Parameters
+    ----------
+    values : dict
+        Values, keyed by name.
+
+    Returns
+    -------
+    pandas.Series or Record
+        :class:`pandas.Series` (with ``object`` dtype) if :data:`USE_PANDAS`
+        is ``True``.  Otherwise, :class:`Record`.
+    '''
+    record = Record(values)
+    return record.to_series() if USE_PANDAS else record
+
+
+def frame(rows, columns, index=None):
+    '''
+    Parameters
+    ----------
+    rows : list
+        Row tuples.
+    columns : list
+        Column names.
+    index : str, optional
+        Name of column to use as index (i.e., removed from rows).  If not
+        specified, index rows by number.
+
+    Returns
+    -------
+    pandas.DataFrame or RecordTable
+        :class:`pandas.DataFrame` if :data:`USE_PANDAS` is ``True``.
+        Otherwise, :class:`RecordTable`.
+    '''
+    records = [OrderedDict(zip(columns, row_i)) for row_i in rows]
+    if index is None:
+        table = RecordTable(enumerate(records))
+    else:
+        table = RecordTable([(record_i.pop(index), record_i)
+                             for record_i in records], index_name=index)
+    if USE_PANDAS:
+        df = table.to_frame()
+        if not len(table):
+            # Preserve columns of empty table.
+            df = df.reindex(columns=[column_i for column_i in columns
+                                     if column_i != index])
+        return df
+    return table
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from base_node_rpc.bootloader_driver import TwiBootloader, write_firmwares
+from base_node_rpc.tests.test_firmware_cache import _write_hex
+
+PAGE_SIZE = 4
+
+
+class FakeTwiboot(object):
+    '''
+    Emulate ``twiboot`` flash commands of one target.
+    '''
+    def __init__(self, flash_size=4 * PAGE_SIZE, busy_reads=0,
+                 fail_write=False, fail_read=False):
+        self.flash = np.full(flash_size, 0xFF, dtype='uint8')
+        #: Number of reads to leave unanswered after each page write.
+        self.busy_reads = busy_reads
+        self.fail_write = fail_write
+        #: If ``True``, raise unexpected error on reads (except chip info).
+        self.fail_read = fail_read
+        self.busy = 0
+        self.address = 0
+        self.chip_info = False
+
+    def write(self, data):
+        data = np.atleast_1d(np.asarray(data, dtype='uint8'))
+        if data[:2].tolist() == [0x02, 0x00]:
+            self.chip_info = True
+        elif data[:2].tolist() == [0x02, 0x01]:
+            self.chip_info = False
+            self.address = (int(data[2]) << 8) | int(data[3])
+            if len(data) > 4:
+                if self.fail_write:
+                    raise IOError('I2C write failed.')
+                self.flash[self.address:self.address + len(data) - 4] = \
+                    data[4:]
+                self.busy = self.busy_reads
+
+    def read(self, n_bytes):
+        if self.fail_read and not self.chip_info:
+            raise ValueError('Unexpected error.')
+        if self.busy:
+            # Busy bootloader does not acknowledge its address.
+            self.busy -= 1
+            return np.array([], dtype='uint8')
+        if self.chip_info:
+            return np.array([0x1E, 0x95, 0x0F, PAGE_SIZE, 0, len(self.flash),
+                             0, 0], dtype='uint8')
+        return self.flash[self.address:self.address + n_bytes].copy()
+
+
+class FakeProxy(object):
+    def __init__(self, targets):
+        self.targets = targets
+
+    def i2c_write(self, address, data):
+        self.targets[address].write(data)
+
+    def i2c_read(self, address, n_bytes):
+        return self.targets[address].read(n_bytes)
+
+
+#: .. versionadded:: 0.52
+def test_changed_pages():
+    target = FakeTwiboot()
+    target.flash[:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+    bootloader = TwiBootloader(FakeProxy({0x29: target}))
+    pages = np.array([[1, 2, 3, 4], [5, 6, 0, 8], [0xFF] * 4, [9] * 4],
+                     dtype='uint8')
+    addresses = np.arange(len(pages)) * PAGE_SIZE
+    assert (bootloader.changed_pages(pages, addresses, PAGE_SIZE,
+                                     delay_s=0) == [1, 3])
+
+    # Pages are compared against flash contents at their own addresses.
+    assert bootloader.changed_pages(pages[:2], [4, 0], PAGE_SIZE,
+                                    delay_s=0) == [0, 1]
+    assert bootloader.changed_pages(pages[2:3], [8], PAGE_SIZE,
+                                    delay_s=0) == []
+
+
+#: .. versionadded:: 0.52
+def test_wait_ready():
+    target = FakeTwiboot()
+    bootloader = TwiBootloader(FakeProxy({0x29: target}))
+    target.busy = 3
+    assert bootloader.wait_ready(timeout_s=1.) >= 0
+    assert target.busy == 0
+
+    target.busy = 10 ** 9
+    with pytest.raises(IOError):
+        bootloader.wait_ready(timeout_s=0.01)
+
+
+#: .. versionadded:: 0.52
+def test_write_firmware_poll_retry():
+    directory = tempfile.mkdtemp()
+    try:
+        path = _write_hex(directory, 'a.hex', b'\x01\x02\x03\x04\x05\x06')
+        target = FakeTwiboot(busy_reads=2)
+        bootloader = TwiBootloader(FakeProxy({0x29: target}))
+        wait_ready = bootloader.wait_ready
+        timeouts = [IOError('Bootloader did not respond.')]
+
+        def _wait_ready(**kwargs):
+            if timeouts:
+                raise timeouts.pop()
+            return wait_ready(**kwargs)
+
+        bootloader.wait_ready = _wait_ready
+        # Page write is retried if bootloader does not respond in time.
+        bootloader.write_firmware(path)
+        assert ([stats_i['attempts'] for stats_i in bootloader.page_stats] ==
+                [2, 1])
+        assert target.flash[:8].tolist() == [1, 2, 3, 4, 5, 6, 0xFF, 0xFF]
+    finally:
+        shutil.rmtree(directory)
+
+
+#: .. versionadded:: 0.52
+def test_write_firmwares():
+    directory = tempfile.mkdtemp()
+    try:
+        data = b'\x01\x02\x03\x04\x05\x06'
+        path = _write_hex(directory, 'a.hex', data)
+        targets = {0x10: FakeTwiboot(busy_reads=2),
+                   0x11: FakeTwiboot(fail_write=True),
+                   0x12: FakeTwiboot(),
+                   0x13: FakeTwiboot(fail_read=True)}
+        proxy = FakeProxy(targets)
+        progress = []
+        results = write_firmwares([(proxy, address_i, path)
+                                   for address_i in sorted(targets)],
+                                  progress=progress.append)
+        assert [result_i['bootloader_address']
+                for result_i in results] == [0x10, 0x11, 0x12, 0x13]
+        ok_a, failed, ok_b, failed_read = results
+        # Failure of one target does not interrupt writing the others.
+        assert failed['error'] == 'I2C write failed.'
+        assert failed['pages_written'] == 0
+        # Unexpected errors are not retried.
+        assert failed_read['error'] == 'Unexpected error.'
+        assert failed_read['pages_written'] == failed_read['retries'] == 0
+        assert failed_read['duration_s'] is not None
+        for result_i in (ok_a, ok_b):
+            assert result_i['error'] is None
+            assert result_i['pages_total'] == result_i['pages_written'] == 2
+            assert result_i['duration_s'] is not None
+        for address_i in (0x10, 0x12):
+            assert (targets[address_i].flash[:8].tolist() ==
+                    [1, 2, 3, 4, 5, 6, 0xFF, 0xFF])
+        assert any(stats_i['error'] for stats_i in progress)
+
+        # Only pages that differ from the flash contents are written.
+        targets[0x10].flash[4] = 0
+        results = write_firmwares([(proxy, 0x10, path)], differential=True)
+        assert results[0]['pages_total'] == results[0]['pages_written'] == 1
+        assert targets[0x10].flash[4] == 5
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+
+from base_node_rpc.code_gen import stamp_code, write_if_changed
+
+
+#: .. versionadded:: 0.52
+def test_write_if_changed():
+    directory = tempfile.mkdtemp()
+    try:
+        output_path = os.path.join(directory, 'Commands.h')
+        assert write_if_changed(output_path, '#define FOO\n')
+        # Unchanged file is not written.
+        os.utime(output_path, (0, 0))
+        assert not write_if_changed(output_path, '#define FOO\n')
+        assert os.path.getmtime(output_path) == 0
+        assert write_if_changed(output_path, '#define BAR\n')
+        with open(output_path) as input_:
+            assert input_.read() == '#define BAR\n'
+    finally:
+        shutil.rmtree(directory)
+
+
+#: .. versionadded:: 0.52
+def test_stamp_code():
+    warning = '/* Generated (%s). */\n'
+    code = stamp_code(warning, '#define FOO\n')
+    assert code.startswith('/* Generated (sha1:')
+    assert code.endswith('#define FOO\n')
+    # Stamp only depends on content.
+    assert code == stamp_code(warning, '#define FOO\n')
+    assert code != stamp_code(warning, '#define BAR\n')
@@ -0,0 +1,169 @@
+import struct
+
+from nadamq.NadaMq import cPacket, PACKET_TYPES
+import numpy as np
+import pandas as pd
+
+from base_node_rpc.command_codec import (CommandCodec,
+                                         get_command_signatures_code,
+                                         install_codecs)
+
+SIGNATURES = {'ram_free': ((), ('uint32', False)),
+              'echo': ((('value', 'uint8', False), ), ('uint8', False))}
+
+
+class FakeResponse(object):
+    def __init__(self, data):
+        self._data = data
+
+    def data(self):
+        return self._data
+
+
+def _proxy_class(echo_format='<HB'):
+    '''
+    Returns
+    -------
+    type
+        Proxy class with "generated" methods, i.e., encoding each request
+        generically.  Generated ``echo`` method encodes request according to
+        :data:`echo_format`.
+    '''
+    class FakeProxy(object):
+        _CMD_RAM_FREE = 0xA0
+        _CMD_ECHO = 0xA1
+        fast_commands = True
+
+        def __init__(self):
+            #: Payload of each request sent to device.
+            self.requests = []
+            #: Name of generated method of each call.
+            self.generated = []
+
+        def _send_command(self, packet, timeout_s=None, bounds_checked=False):
+            data = packet.data()
+            self.requests.append(data)
+            if struct.unpack('<H', data[:2])[0] == self._CMD_RAM_FREE:
+                return FakeResponse(struct.pack('<I', 1024))
+            # Echo first byte of argument.
+            return FakeResponse(data[2:3])
+
+        def ram_free(self):
+            self.generated.append('ram_free')
+            response = self._send_command(cPacket(data=struct
+                                                  .pack('<H',
+                                                        self._CMD_RAM_FREE),
+                                                  type_=PACKET_TYPES.DATA))
+            return np.frombuffer(response.data(), dtype='uint32')[0]
+
+        def echo(self, value):
+            self.generated.append('echo')
+            # Truncate to fit type, i.e., like a NumPy array.
+            data = struct.pack(echo_format, self._CMD_ECHO, value & 0xFF)
+            response = self._send_command(cPacket(data=data,
+                                                  type_=PACKET_TYPES.DATA))
+            return np.frombuffer(response.data(), dtype='uint8')[0]
+
+    return FakeProxy
+
+
+#: .. versionadded:: 0.52
+def test_command_codec():
+    codec = CommandCodec([('address', 'uint8', False),
+                          ('data', 'uint16', True)], ('uint16', True))
+    assert not codec.fixed_size
+    # Command code, arguments structure (scalar, then array length and
+    # pointer relative to start of arguments), and array data.
+    assert (codec.encode(0xA0, 7, [1, 2]) ==
+            b'\xa0\x00' b'\x07' b'\x02\x00\x05\x00' b'\x01\x00\x02\x00')
+    result = codec.decode(FakeResponse(b'\x01\x00\x02\x00'))
+    assert result.dtype == np.uint16 and result.tolist() == [1, 2]
+
+    codec = CommandCodec([('a', 'int16', False), ('b', 'float32', False)],
+                         ('float32', False))
+    assert codec.fixed_size
+    assert codec.encode(0xA1, -1, 0.5) == b'\xa1\x00\xff\xff\x00\x00\x00?'
+    assert codec.decode(FakeResponse(b'\x00\x00\x00?')) == np.float32(0.5)
+    assert codec.decode(None) is None
+
+
+#: .. versionadded:: 0.52
+def test_install_codecs():
+    proxy_class = _proxy_class()
+    codecs = install_codecs(proxy_class, SIGNATURES)
+    assert sorted(codecs) == ['echo', 'ram_free']
+    assert proxy_class.ram_free.codec is codecs['ram_free']
+
+    proxy = proxy_class()
+    # First call is verified against generated method.
+    assert proxy.echo(7) == 7
+    assert proxy.generated == ['echo'] and codecs['echo'].verified is True
+    assert codecs['ram_free'].verified is None
+    # Subsequent calls use precompiled codec.
+    assert proxy.echo(8) == 8
+    assert proxy.generated == ['echo']
+    assert proxy.requests == [b'\xa1\x00\x07', b'\xa1\x00\x08']
+
+    # Precompiled codec is not used if disabled.
+    proxy.fast_commands = False
+    assert proxy.echo(9) == 9
+    assert proxy.generated == ['echo', 'echo']
+
+
+#: .. versionadded:: 0.52
+def test_install_codecs_mismatch():
+    # Generated method encodes argument as `uint16`.
+    proxy_class = _proxy_class(echo_format='<HH')
+    codec = install_codecs(proxy_class, SIGNATURES)['echo']
+    proxy = proxy_class()
+    assert proxy.echo(7) == 7
+    assert codec.verified is False
+    # Generated method is used from then on.
+    assert proxy.echo(8) == 8
+    assert proxy.generated == ['echo', 'echo']
+    assert proxy.requests[-1] == b'\xa1\x00\x08\x00'
+
+
+#: .. versionadded:: 0.52
+def test_install_codecs_out_of_range():
+    proxy_class = _proxy_class()
+    codec = install_codecs(proxy_class, SIGNATURES)['echo']
+    proxy = proxy_class()
+    # Argument does not fit `uint8`, so generated method is used without
+    # verifying codec.
+    assert proxy.echo(0x102) == 2
+    assert proxy.generated == ['echo'] and codec.verified is None
+    assert proxy.echo(3) == 3 and codec.verified is True
+
+
+#: .. versionadded:: 0.52
+def test_get_command_signatures_code():
+    columns = ['method_name', 'arg_name', 'atom_type', 'ndims',
+               'return_atom_type', 'return_ndims', 'return_type']
+    df_sig = pd.DataFrame([('echo', 'value', 'uint8_t', 0, 'uint8_t', 0,
+                            'uint8_t'),
+                           ('ram_free', None, None, None, 'uint32_t', 0,
+                            'uint32_t'),
+                           # Unsupported argument type.
+                           ('str_echo', 'msg', 'char', 1, 'uint8_t', 1,
+                            'UInt8Array')], columns=columns)
+    code = get_command_signatures_code(df_sig, pointer_width=32,
+                                       class_name='FakeProxy')
+    assert code == ('\n\n'
+                    '#: Signature of each command with a precompiled codec '
+                    '(see\n'
+                    '#: :func:`base_node_rpc.command_codec.install_codecs`).\n'
+                    'COMMAND_SIGNATURES = {\n'
+                    "    'echo': ((('value', 'uint8', False),), "
+                    "('uint8', False)),\n"
+                    "    'ram_free': ((), ('uint32', False)),\n"
+                    '}\n\n'
+                    'install_codecs(FakeProxy, COMMAND_SIGNATURES, '
+                    'pointer_width=32)\n')
+
+    # Generated code is valid (e.g., in footer of generated `node.py`).
+    namespace = {'install_codecs': install_codecs,
+                 'FakeProxy': _proxy_class()}
+    exec(code, namespace)
+    assert namespace['COMMAND_SIGNATURES'] == SIGNATURES
+    assert namespace['FakeProxy'].echo.codec.arg_count == 1
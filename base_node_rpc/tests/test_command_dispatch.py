@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from base_node_rpc.command_dispatch import \
+    command_stubs, get_c_command_processor_header_code
+
+COLUMNS = ['method_i', 'method_name', 'camel_name', 'arg_count', 'arg_name',
+           'atom_type', 'ndims', 'return_atom_type', 'return_ndims']
+
+
+def _sig_frame():
+    # Rows intentionally out of command code order, with a gap at code 2.
+    return pd.DataFrame([(3, 'echo_array', 'EchoArray', 1, 'array', 'uint8_t',
+                          1, 'uint8_t', 1),
+                         (0, 'ram_free', 'RamFree', 0, None, None, None,
+                          'uint32_t', 0),
+                         (1, 'pin_mode', 'PinMode', 2, 'pin', 'uint8_t', 0,
+                          None, None),
+                         (1, 'pin_mode', 'PinMode', 2, 'mode', 'uint8_t', 0,
+                          None, None)], columns=COLUMNS)
+
+
+#: .. versionadded:: 0.52
+def test_command_stubs():
+    stubs = command_stubs(_sig_frame())
+    assert [stub_i['code'] for stub_i in stubs] == [0, 1, 3]
+    ram_free, pin_mode, echo_array = stubs
+    assert ram_free['arg_names'] == [] and ram_free['return'] == 'scalar'
+    assert pin_mode['arg_names'] == ['pin', 'mode']
+    assert pin_mode['return'] is None
+    assert echo_array['arrays'] == [('array', 'uint8_t')]
+    assert echo_array['return'] == 'array'
+
+
+#: .. versionadded:: 0.52
+def test_switch_dispatch():
+    code = get_c_command_processor_header_code(_sig_frame(), 'foo')
+    cases = [line_i.strip() for line_i in code.splitlines()
+             if line_i.strip().startswith('case ')]
+    # Cases ordered by command code.
+    assert cases == ['case CMD_RAM_FREE:', 'case CMD_PIN_MODE:',
+                     'case CMD_ECHO_ARRAY:']
+    assert 'PROGMEM' not in code
+
+
+#: .. versionadded:: 0.52
+def test_table_dispatch():
+    code = get_c_command_processor_header_code(_sig_frame(), 'foo',
+                                               dispatch='table')
+    entries = [line_i.strip() for line_i in code.splitlines()
+               if line_i.strip().startswith('&CommandProcessor<Obj>::')]
+    # Dense table indexed by command code, with gaps filled by unknown
+    # command stub.
+    assert entries == ['&CommandProcessor<Obj>::_ram_free,',
+                       '&CommandProcessor<Obj>::_pin_mode,',
+                       '&CommandProcessor<Obj>::_unknown_command,',
+                       '&CommandProcessor<Obj>::_echo_array,']
+    assert 'stubs_[4] PROGMEM' in code
+    assert 'case ' not in code
+    # Command codes are checked against table indexes at compile time.
+    asserts = [line_i.strip() for line_i in code.splitlines()
+               if line_i.strip().startswith('static_assert(')]
+    assert asserts == ['static_assert(CMD_RAM_FREE == 0,',
+                       'static_assert(CMD_PIN_MODE == 1,',
+                       'static_assert(CMD_ECHO_ARRAY == 3,']
+
+
+#: .. versionadded:: 0.52
+def test_invalid_dispatch():
+    with pytest.raises(ValueError):
+        get_c_command_processor_header_code(_sig_frame(), 'foo', dispatch='if')
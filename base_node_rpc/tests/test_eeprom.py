@@ -0,0 +1,90 @@
+import numpy as np
+
+from base_node_rpc.eeprom import EepromView, crc16
+
+
+class FakeProxy(object):
+    buffer_size = 32
+
+    def __init__(self, size=100):
+        self.memory = np.arange(size, dtype='uint8')
+        self.reads = []
+        self.writes = []
+
+    def eeprom_e2end(self):
+        return self.memory.size - 1
+
+    def read_eeprom_block(self, address, n):
+        self.reads.append((address, n))
+        return self.memory[address:address + n].copy()
+
+    def update_eeprom_block(self, address, data):
+        self.writes.append((address, len(data)))
+        self.memory[address:address + len(data)] = data
+
+    def eeprom_crc16(self, address, n):
+        return crc16(self.memory[address:address + n])
+
+    def flush(self):
+        pass
+
+
+#: .. versionadded:: 0.52
+def test_eeprom_read():
+    proxy = FakeProxy()
+    eeprom = EepromView(proxy, page_size=16)
+    assert len(eeprom) == 100
+    assert eeprom[5] == 5
+    assert eeprom[-1] == 99
+    assert eeprom[10:20].tolist() == list(range(10, 20))
+    # Pages are only read once.
+    assert proxy.reads == [(0, 16), (96, 4), (16, 16)]
+    assert np.array_equal(eeprom[:], proxy.memory)
+    assert len(proxy.reads) == 7
+
+    proxy.memory[0] = 42
+    assert eeprom[0] == 0
+    eeprom.invalidate()
+    assert eeprom[0] == 42
+
+
+#: .. versionadded:: 0.52
+def test_eeprom_write_back():
+    proxy = FakeProxy()
+    eeprom = EepromView(proxy, page_size=16, max_gap=4)
+    eeprom[2:4] = [0xFF, 0xFE]
+    eeprom[50] = 7
+    # Writes are cached (without reading from device).
+    assert not proxy.writes and not proxy.reads
+    assert eeprom.dirty
+    assert eeprom[50] == 7
+
+    # Cached write is preserved when the rest of the page is read.
+    assert eeprom[49:52].tolist() == [49, 7, 51]
+    # Gap of cached bytes is merged into the range; uncached gap is not.
+    eeprom[53] = 8
+    assert eeprom.dirty_ranges() == [(2, 2), (50, 4)]
+
+    eeprom.flush()
+    assert proxy.writes == [(2, 2), (50, 4)]
+    assert not eeprom.dirty
+    assert proxy.memory[[2, 3, 50, 53]].tolist() == [0xFF, 0xFE, 7, 8]
+
+    # Large writes are split to fit page size.
+    eeprom[:40] = 0
+    assert eeprom.dirty_ranges() == [(0, 16), (16, 16), (32, 8)]
+
+
+#: .. versionadded:: 0.52
+def test_crc16():
+    # CRC-16/MODBUS check value.
+    assert crc16(b'123456789') == 0x4B37
+
+    proxy = FakeProxy()
+    eeprom = EepromView(proxy, page_size=16)
+    assert eeprom.verify(0, 20)
+    proxy.memory[3] = 0
+    # Stale cached contents are detected and invalidated.
+    assert not eeprom.verify(0, 20)
+    assert eeprom[3] == 0
+    assert eeprom.verify()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from base_node_rpc.firmware_cache import FirmwareCache
+from base_node_rpc.tests.test_intel_hex import EOF_RECORD, _record
+
+
+def _write_hex(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as output:
+        output.write('\n'.join([_record(0, 0, data), EOF_RECORD]))
+    return path
+
+
+#: .. versionadded:: 0.52
+def test_firmware_cache():
+    directory = tempfile.mkdtemp()
+    try:
+        path_a = _write_hex(directory, 'a.hex', b'\x01\x02\x03')
+        # Same contents, different path.
+        path_b = _write_hex(directory, 'b.hex', b'\x01\x02\x03')
+
+        cache = FirmwareCache()
+        assert cache.image(path_a) is cache.image(path_b)
+        firmware = cache.pages(path_a, 2)
+        assert firmware is cache.pages(path_b, 2)
+        assert firmware.pages.tolist() == [[1, 2], [3, 0xFF]]
+        assert firmware.addresses.tolist() == [0, 2]
+        assert not firmware.blank.any()
+        # Cached arrays are read-only.
+        assert not firmware.pages.flags.writeable
+
+        # Modified contents are parsed again.
+        _write_hex(directory, 'a.hex', b'\x04')
+        assert cache.pages(path_a, 2).pages.tolist() == [[4, 0xFF]]
+    finally:
+        shutil.rmtree(directory)
+
+
+#: .. versionadded:: 0.52
+def test_firmware_cache_on_disk():
+    directory = tempfile.mkdtemp()
+    try:
+        path = _write_hex(directory, 'a.hex', b'\x01\x02\x03')
+        cache_dir = os.path.join(directory, 'cache')
+
+        pages = FirmwareCache(cache_dir=cache_dir).pages(path, 2).pages
+        assert len(os.listdir(cache_dir)) == 1
+        # New cache instance, e.g., in another process, maps cached file.
+        cached = FirmwareCache(cache_dir=cache_dir).pages(path, 2).pages
+        assert isinstance(cached, np.memmap)
+        assert np.array_equal(cached, pages)
+        del cached
+    finally:
+        shutil.rmtree(directory)
+
+
+#: .. versionadded:: 0.52
+def test_firmware_cache_truncated():
+    directory = tempfile.mkdtemp()
+    try:
+        path = _write_hex(directory, 'a.hex', b'\x01\x02\x03')
+        cache_dir = os.path.join(directory, 'cache')
+        FirmwareCache(cache_dir=cache_dir).pages(path, 2)
+        cache_path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+
+        # Empty or truncated cache file is rebuilt.
+        for data_i in (b'', b'\x01\x02\x03'):
+            with open(cache_path, 'wb') as output:
+                output.write(data_i)
+            pages = FirmwareCache(cache_dir=cache_dir).pages(path, 2).pages
+            assert pages.tolist() == [[1, 2], [3, 0xFF]]
+            assert os.path.getsize(cache_path) == 4
+        del pages
+    finally:
+        shutil.rmtree(directory)
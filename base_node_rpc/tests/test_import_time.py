@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+#: Maximum time to import :mod:`base_node_rpc` (in seconds).
+#:
+#: .. versionadded:: 0.52
+IMPORT_TIME_BUDGET = 1.
+
+#: Modules that must *not* be imported by ``import base_node_rpc``.
+#:
+#: .. versionadded:: 0.52
+HEAVY_MODULES = ['asyncserial', 'blinker', 'json_tricks', 'numpy', 'pandas',
+                 'pkg_resources', 'serial_device']
+
+IMPORT_SCRIPT = '''
+import json
+import sys
+import timeit
+
+start = timeit.default_timer()
+import base_node_rpc
+duration = timeit.default_timer() - start
+json.dump({'duration': duration,
+           'modules': [name_i for name_i in %r if name_i in sys.modules]},
+          sys.stdout)
+''' % HEAVY_MODULES
+
+
+def _import_base_node_rpc():
+    # Import in a new interpreter, i.e., without any modules already loaded.
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT])
+    return json.loads(output.decode('utf8'))
+
+
+#: .. versionadded:: 0.52
+def test_import_lazy():
+    result = _import_base_node_rpc()
+    if sys.version_info[:2] >= (3, 7):
+        assert result['modules'] == []
+
+
+#: .. versionadded:: 0.52
+def test_import_time():
+    # Use fastest of several runs to reduce noise (e.g., cold file cache).
+    duration = min(_import_base_node_rpc()['duration'] for i in range(3))
+    assert duration < IMPORT_TIME_BUDGET, \
+        'Import took %.3f s (budget: %.3f s)' % (duration,
+                                                 IMPORT_TIME_BUDGET)
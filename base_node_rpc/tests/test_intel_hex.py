@@ -0,0 +1,89 @@
+import binascii
+
+import numpy as np
+import pytest
+
+from base_node_rpc.intel_hex import parse_intel_hex, parse_intel_hex_image
+
+
+def _record(record_type, address, data=b''):
+    body = bytearray([len(data), address >> 8 & 0xFF, address & 0xFF,
+                      record_type]) + bytearray(data)
+    body.append(-sum(body) & 0xFF)
+    return ':' + binascii.hexlify(bytes(body)).decode('ascii').upper()
+
+
+EOF_RECORD = _record(1, 0)
+
+
+#: .. versionadded:: 0.52
+def test_parse_contiguous():
+    data = bytearray(range(40))
+    text = '\n'.join([_record(0, 0, data[:16]), _record(0, 16, data[16:32]),
+                      _record(0, 32, data[32:]), EOF_RECORD])
+    df_data = parse_intel_hex(text)
+    assert df_data.record_type.tolist() == [0, 0, 0, 1]
+    assert df_data.address.tolist() == [0, 16, 32, 0]
+    assert df_data.data.iloc[1] == list(range(16, 32))
+
+    image = parse_intel_hex_image(text)
+    assert image.ranges == [(0, 0, 40)]
+    assert image.tobytes().tolist() == list(data)
+
+
+#: .. versionadded:: 0.52
+def test_parse_sparse_extended():
+    text = '\r\n'.join([_record(0, 0x10, b'\x01\x02'),
+                        # Extended linear address: 0x10000.
+                        _record(4, 0, b'\x00\x01'),
+                        _record(0, 0x20, b'\x03'),
+                        # Extended segment address: 0x100 * 16.
+                        _record(2, 0, b'\x01\x00'),
+                        _record(0, 0x4, b'\x04\x05'),
+                        _record(5, 0, b'\x00\x00\x01\x23'), EOF_RECORD])
+    image = parse_intel_hex_image(text)
+    assert image.ranges == [(0x10, 0, 2), (0x1004, 2, 2), (0x10020, 4, 1)]
+    assert image.start_address == 0x123
+    assert image.tobytes(start=0x1003, end=0x1007).tolist() == [0xFF, 4, 5,
+                                                                0xFF]
+    segments = [(address_i, bytes(data_i))
+                for address_i, data_i in image.segments()]
+    assert segments[0] == (0x10, b'\x01\x02')
+
+
+#: .. versionadded:: 0.52
+def test_parse_invalid():
+    record = _record(0, 0, b'\x01\x02')
+    # Corrupt checksum.
+    text = record[:-2] + '%02X' % ((int(record[-2:], 16) + 1) & 0xFF)
+    with pytest.raises(ValueError):
+        parse_intel_hex_image(text)
+    with pytest.raises(ValueError):
+        parse_intel_hex_image(record[1:])
+    with pytest.raises(ValueError):
+        parse_intel_hex_image(record + '0')
+    # Overlapping data records.
+    with pytest.raises(ValueError):
+        parse_intel_hex_image('\n'.join([record, _record(0, 1, b'\x03')]))
+    assert np.array_equal(parse_intel_hex_image(record).tobytes(), [1, 2])
+
+
+#: .. versionadded:: 0.52
+def test_parse_max_byte_count():
+    # Byte count of 255 must not overflow when adding record overhead.
+    data = bytearray(i & 0xFF for i in range(255))
+    text = '\n'.join([_record(0, 0, data), EOF_RECORD])
+    image = parse_intel_hex_image(text)
+    assert image.ranges == [(0, 0, 255)]
+    assert image.tobytes().tolist() == list(data)
+    assert parse_intel_hex(text).byte_count.tolist() == [255, 0]
+
+
+#: .. versionadded:: 0.52
+def test_parse_empty():
+    with pytest.raises(ValueError):
+        parse_intel_hex_image('')
+    with pytest.raises(ValueError):
+        parse_intel_hex_image(' \r\n\t')
+    with pytest.raises(ValueError):
+        parse_intel_hex('')
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from base_node_rpc.method_sig_cache import cache_key, header_dependencies
+
+
+#: .. versionadded:: 0.52
+def test_cache_key():
+    directory = tempfile.mkdtemp()
+    try:
+        include_dir = os.path.join(directory, 'include')
+        os.makedirs(include_dir)
+        header = os.path.join(directory, 'Node.h')
+        with open(header, 'w') as output:
+            output.write('#include <stdint.h>\n#include "Base.h"\n')
+        base_header = os.path.join(include_dir, 'Base.h')
+        with open(base_header, 'w') as output:
+            output.write('class Base {};\n')
+
+        args = ['-I%s' % include_dir]
+        # System headers (i.e., not found in include paths) are ignored.
+        assert (header_dependencies([header], [include_dir]) ==
+                sorted(map(os.path.realpath, [header, base_header])))
+
+        key = cache_key([header], ['Node'], args, 16)
+        assert key == cache_key([header], ['Node'], args, 16)
+        assert key != cache_key([header], ['Node'], args + ['-DFOO'], 16)
+        assert key != cache_key([header], ['Node'], args, 32)
+        # Key changes if contents of an included header change.
+        with open(base_header, 'w') as output:
+            output.write('class Base { void foo(); };\n')
+        assert key != cache_key([header], ['Node'], args, 16)
+    finally:
+        shutil.rmtree(directory)
+
+
+#: .. versionadded:: 0.52
+def test_missing_include():
+    directory = tempfile.mkdtemp()
+    try:
+        header = os.path.join(directory, 'Node.h')
+        with open(header, 'w') as output:
+            output.write('#include "config_pb.h"\n')
+        # Missing headers included with quotes are not silently ignored
+        # (e.g., generated header not written yet).
+        with pytest.raises(IOError, match='config_pb.h'):
+            header_dependencies([header], [])
+        with pytest.raises(IOError):
+            cache_key([header], ['Node'], [], 16)
+    finally:
+        shutil.rmtree(directory)
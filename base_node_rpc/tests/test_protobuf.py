@@ -0,0 +1,35 @@
+from arduino_rpc.protobuf import extract_callback_data
+import pytest
+
+from base_node_rpc.protobuf import CallbackFieldIndex
+from .test_protobuf_codec import State
+
+
+#: .. versionadded:: 0.52
+def test_callback_field_index():
+    field_index = CallbackFieldIndex(State)
+
+    # Fields match those resolved by `extract_callback_data`.
+    for method_name in ('on_state_voltage_changed',
+                        'on_state_frequency_changed',
+                        'on_state_limits__max_changed'):
+        df_parents, s_field = field_index[method_name]
+        df_expected, s_expected = extract_callback_data(field_index.df_fields,
+                                                        method_name)
+        assert df_parents.index.tolist() == df_expected.index.tolist()
+        assert (df_parents.parent_field.tolist() ==
+                df_expected.parent_field.tolist())
+        assert s_field.name == s_expected.name
+        assert s_field.atom_type == s_expected.atom_type
+        assert s_field.field_desc is s_expected.field_desc
+
+    df_parents, s_field = field_index['on_state_limits__min_changed']
+    assert df_parents.index.tolist() == ['', 'limits']
+    assert (s_field.name, s_field.atom_type) == ('min', 'float')
+
+    for method_name in ('on_state_missing_changed',
+                        'on_state_limits__missing_changed',
+                        'on_state_missing__min_changed',
+                        'on_config_voltage_changed'):
+        with pytest.raises(KeyError):
+            field_index[method_name]
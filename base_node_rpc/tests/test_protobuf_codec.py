@@ -0,0 +1,134 @@
+from collections import OrderedDict
+
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+import pytest
+
+from base_node_rpc.protobuf_codec import MessageDecoder, get_decoder
+
+
+def _message_class(name):
+    '''
+    Build Protocol Buffer message class (with nested message, repeated, and
+    enumerated type fields) without compiling a ``.proto`` file.
+    '''
+    file_ = descriptor_pb2.FileDescriptorProto(name='base_node_rpc_test.proto',
+                                               package='base_node_rpc_test')
+    mode = file_.enum_type.add(name='Mode')
+    mode.value.add(name='IDLE', number=0)
+    mode.value.add(name='RUN', number=1)
+    limits = file_.message_type.add(name='Limits')
+    state = file_.message_type.add(name='State')
+    for message_i, name_i, number_i, type_i, label_i, type_name_i in \
+            [(limits, 'min', 1, 'FLOAT', 'OPTIONAL', None),
+             (limits, 'max', 2, 'FLOAT', 'OPTIONAL', None),
+             (state, 'voltage', 1, 'FLOAT', 'OPTIONAL', None),
+             (state, 'frequency', 2, 'UINT32', 'OPTIONAL', None),
+             (state, 'channels', 3, 'UINT32', 'REPEATED', None),
+             (state, 'limits', 4, 'MESSAGE', 'OPTIONAL', 'Limits'),
+             (state, 'mode', 5, 'ENUM', 'OPTIONAL', 'Mode')]:
+        field_i = message_i.field.add(name=name_i, number=number_i,
+                                      type=getattr(FieldDescriptorProto,
+                                                   'TYPE_' + type_i),
+                                      label=getattr(FieldDescriptorProto,
+                                                    'LABEL_' + label_i))
+        if type_name_i is not None:
+            field_i.type_name = '.base_node_rpc_test.' + type_name_i
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_)
+    descriptor = pool.FindMessageTypeByName('base_node_rpc_test.' + name)
+    try:
+        from google.protobuf.message_factory import GetMessageClass
+    except ImportError:
+        # `protobuf<4.21`.
+        from google.protobuf.message_factory import MessageFactory
+
+        return MessageFactory(pool).GetPrototype(descriptor)
+    return GetMessageClass(descriptor)
+
+
+State = _message_class('State')
+
+
+def _state():
+    return State(voltage=1.5, frequency=3, channels=[1, 2],
+                 limits={'min': .5, 'max': 2.}, mode='RUN')
+
+
+#: .. versionadded:: 0.52
+def test_decode_message():
+    decoder = MessageDecoder(State)
+    # Fields of nested messages are listed last.
+    assert decoder.names == ('voltage', 'frequency', 'channels', 'mode',
+                             'limits.min', 'limits.max')
+    record = decoder.decode_message(_state())
+    assert record == OrderedDict([('voltage', 1.5), ('frequency', 3),
+                                  ('channels', [1, 2]), ('mode', 'RUN'),
+                                  ('limits.min', .5), ('limits.max', 2.)])
+    assert decoder(_state().SerializeToString()) == record
+
+    # Unset fields are set to default values.
+    assert (decoder(b'') ==
+            OrderedDict([('voltage', 0), ('frequency', 0), ('channels', []),
+                         ('mode', 'IDLE'), ('limits.min', 0),
+                         ('limits.max', 0)]))
+    assert get_decoder(State) is get_decoder(State)
+
+
+#: .. versionadded:: 0.52
+def test_flatten():
+    decoder = MessageDecoder(State)
+    assert (decoder.flatten({'limits': {'max': 3.}}) ==
+            OrderedDict([('limits.max', 3.)]))
+    # Only fields set in nested message are included.
+    assert (decoder.flatten({'limits': State(limits={'min': 1.}).limits}) ==
+            OrderedDict([('limits.min', 1.)]))
+    assert decoder.flatten({'limits.min': 1.}) == {'limits.min': 1.}
+    for values_i in ({'foo': 1}, {'limits': {'foo': 1}}, {'limits': 1}):
+        with pytest.raises(ValueError):
+            decoder.flatten(values_i)
+
+
+#: .. versionadded:: 0.52
+def test_encode():
+    decoder = MessageDecoder(State)
+    message = decoder.encode(decoder.decode_message(_state()))
+    assert message.SerializeToString() == _state().SerializeToString()
+
+    # Only specified fields are set.
+    data = decoder.encode({'limits': {'max': 3.}, 'channels': [4],
+                           'mode': 'IDLE'}).SerializeToString()
+    assert (data == State(channels=[4], limits={'max': 3.},
+                          mode='IDLE').SerializeToString())
+    assert (State.FromString(data).ListFields() ==
+            State(channels=[4], limits={'max': 3.}, mode=0).ListFields())
+
+
+#: .. versionadded:: 0.52
+def test_changed():
+    decoder = MessageDecoder(State)
+    known = decoder.decode_message(State(voltage=.1, channels=[1, 2],
+                                         mode='RUN'))
+    # Float fields are compared at single precision and enumerated type
+    # fields by name or number.
+    assert decoder.changed({'voltage': .1, 'channels': [1, 2], 'mode': 1},
+                           known) == {}
+    assert (decoder.changed({'voltage': .2, 'channels': [1], 'mode': 'IDLE',
+                             'limits': {'min': 1.}}, known) ==
+            OrderedDict([('voltage', .2), ('channels', [1]),
+                         ('mode', 'IDLE'), ('limits.min', 1.)]))
+    # Fields missing from known values are always changed.
+    assert decoder.changed({'frequency': 0}, {}) == {'frequency': 0}
+
+
+#: .. versionadded:: 0.52
+def test_decode_fields():
+    decoder = MessageDecoder(State)
+    data = State(frequency=0, limits={'max': 3.}).SerializeToString()
+    # Only fields set in (partial) message are decoded.
+    assert (decoder.decode_fields(data) ==
+            OrderedDict([('frequency', 0), ('limits.max', 3.)]))
+    assert decoder.decode_fields(b'') == {}
+    # Fields are listed in order of field number (i.e., as serialized).
+    assert (dict(decoder.decode_fields(_state().SerializeToString())) ==
+            dict(decoder(_state().SerializeToString())))
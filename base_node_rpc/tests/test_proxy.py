@@ -0,0 +1,287 @@
+from collections import namedtuple
+
+import pytest
+
+from base_node_rpc import records
+from base_node_rpc.protobuf_codec import _is_repeated
+from base_node_rpc.proxy import (ConfigMixinBase, ProxyBase, SerialProxyMixin,
+                                 StateMixinBase)
+from base_node_rpc.queue import STATE_STREAM_IUID
+from base_node_rpc.tests.test_protobuf_codec import State
+
+Protocol = namedtuple('Protocol', 'port')
+
+
+class FakeArray(object):
+    def __init__(self, data):
+        self.data = data
+
+    def tostring(self):
+        return self.data
+
+
+class FakePacket(object):
+    def __init__(self, iuid, data):
+        self.iuid = iuid
+        self._data = data
+
+    def data(self):
+        return self._data
+
+
+def _update(message, update):
+    '''
+    Update device message in place (i.e., like ``update_config`` command).
+    '''
+    for field_i, value_i in update.ListFields():
+        if _is_repeated(field_i):
+            # Repeated fields are replaced, rather than extended.
+            message.ClearField(field_i.name)
+    message.MergeFrom(update)
+
+
+class FakeStateDevice(object):
+    '''
+    Emulate state commands of generated proxy.
+    '''
+    def __init__(self, **kwargs):
+        super(FakeStateDevice, self).__init__()
+        self.device_state = State(**kwargs)
+        self.generation = 0
+        #: Number of ``serialize_state`` calls.
+        self.reads = 0
+        #: Serialized state sent by each ``update_state`` call.
+        self.requests = []
+
+    def serialize_state(self):
+        self.reads += 1
+        return FakeArray(self.device_state.SerializeToString())
+
+    def state_generation(self):
+        return self.generation
+
+    def update_state(self, state):
+        self.requests.append(state.SerializeToString())
+        _update(self.device_state, state)
+        self.generation += 1
+        return True
+
+
+class FakeStateProxy(StateMixinBase, FakeStateDevice, ProxyBase):
+    state_class = State
+
+
+class FakeConfigDevice(object):
+    '''
+    Emulate config commands of generated proxy.
+    '''
+    def __init__(self, **kwargs):
+        super(FakeConfigDevice, self).__init__()
+        self.device_config = State(**kwargs)
+        self.generation = 0
+        #: Serialized config sent by each ``update_config`` call.
+        self.requests = []
+        #: Number of ``save_config`` calls.
+        self.saves = 0
+
+    def serialize_config(self):
+        return FakeArray(self.device_config.SerializeToString())
+
+    def config_generation(self):
+        return self.generation
+
+    def update_config(self, config):
+        self.requests.append(config.SerializeToString())
+        _update(self.device_config, config)
+        self.generation += 1
+        return 0
+
+    def save_config(self):
+        self.saves += 1
+
+
+class FakeConfigProxy(ConfigMixinBase, FakeConfigDevice, ProxyBase):
+    config_class = State
+
+
+class FakeCodec(object):
+    def __init__(self, arg_count):
+        self.arg_count = arg_count
+
+
+class FakeCommand(object):
+    def __init__(self, proxy, cycles, arg_count=0):
+        self.proxy = proxy
+        self.cycles = list(cycles)
+        self.codec = FakeCodec(arg_count)
+
+    def __call__(self, *args):
+        # Device reports cycles of *previous* command on next request.
+        self.proxy.cycles = self.cycles.pop(0)
+
+
+class FakeProxy(ProxyBase):
+    idempotent_commands = ('ram_free', 'str_echo', 'url')
+
+    def __init__(self):
+        self.cycles = None
+        self.ram_free = FakeCommand(self, [128, 64, 192])
+        self.str_echo = FakeCommand(self, [256], arg_count=1)
+
+    def last_command_cycles(self):
+        return self.cycles
+
+
+#: .. versionadded:: 0.52
+def test_command_cycles():
+    use_pandas = records.USE_PANDAS
+    records.USE_PANDAS = False
+    try:
+        proxy = FakeProxy()
+        # Only idempotent commands without arguments are profiled by default.
+        cycles = proxy.command_cycles(repeat=3)
+        assert cycles.index == ['ram_free']
+        assert cycles['ram_free'] == records.Record([('min', 64),
+                                                     ('median', 128),
+                                                     ('max', 192)])
+
+        cycles = proxy.command_cycles({'str_echo': ('foo', )}, repeat=1)
+        assert cycles['str_echo'].max == 256
+    finally:
+        records.USE_PANDAS = use_pandas
+
+
+#: .. versionadded:: 0.52
+def test_command_cycles_unsupported():
+    # Firmware compiled without `COMMAND_PROFILE` does not provide
+    # `last_command_cycles` command.
+    proxy = ProxyBase.__new__(ProxyBase)
+    with pytest.raises(AttributeError):
+        proxy.command_cycles()
+
+
+#: .. versionadded:: 0.52
+def test_state_mirror():
+    proxy = FakeStateProxy(voltage=1., frequency=10)
+    mirror = proxy.start_state_mirror()
+    assert mirror['voltage'] == 1. and mirror['frequency'] == 10
+    changes = []
+    proxy.state_signals.signal('voltage')\
+        .connect(lambda sender, **kwargs: changes.append(kwargs),
+                 weak=False)
+    stream = proxy._packet_queue_manager.signals.signal('stream-received')
+
+    # Pushed state changes are consumed and applied to mirror.
+    results = stream.send(FakePacket(STATE_STREAM_IUID,
+                                     State(voltage=2.).SerializeToString()))
+    assert [result_i for receiver_i, result_i in results] == [True]
+    assert proxy.state_mirror['voltage'] == 2.
+    assert proxy.state_mirror['frequency'] == 10
+    assert changes == [{'value': 2., 'previous': 1.}]
+
+    # Other stream packets are not consumed.
+    results = stream.send(FakePacket(0, State(voltage=3.)
+                                     .SerializeToString()))
+    assert [result_i for receiver_i, result_i in results] == [False]
+    assert proxy.state_mirror['voltage'] == 2.
+
+    proxy.stop_state_mirror()
+    assert not stream.send(FakePacket(STATE_STREAM_IUID, b''))
+
+
+#: .. versionadded:: 0.52
+def test_cached_state():
+    proxy = FakeStateProxy(voltage=1.)
+    proxy.cache_state = True
+    assert proxy.get_state()['voltage'] == 1. and proxy.reads == 1
+
+    # Hit: change counter is unchanged.
+    assert proxy.get_state()['voltage'] == 1. and proxy.reads == 1
+
+    # Miss: change counter is incremented by device.
+    proxy.update_state(voltage=2.)
+    assert proxy.get_state()['voltage'] == 2. and proxy.reads == 2
+
+    # Reset: device is reset and change counter happens to repeat.
+    proxy.device_state = State(voltage=3.)
+    proxy.generation = 1
+    assert proxy.get_state()['voltage'] == 2.
+    proxy._on_id_response(FakePacket(0, b''))
+    assert proxy.get_state()['voltage'] == 3. and proxy.reads == 3
+
+    proxy.device_state = State(voltage=4.)
+    SerialProxyMixin.reconnection_made(proxy, Protocol('COM1'))
+    assert proxy.get_state()['voltage'] == 4. and proxy.reads == 4
+
+
+#: .. versionadded:: 0.52
+def test_update_config_delta():
+    proxy = FakeConfigProxy(voltage=1., frequency=3, channels=[1, 2])
+
+    # Only changed fields are sent.
+    assert proxy.update_config(voltage=2., frequency=3, channels=[1, 2],
+                               limits={'max': 0}) == 0
+    assert proxy.requests == [State(voltage=2.).SerializeToString()]
+    assert proxy.saves == 1
+    assert proxy.config['voltage'] == 2.
+
+    # No-op update is neither sent nor saved.
+    assert proxy.update_config(voltage=2., **{'limits.max': 0}) is None
+    assert len(proxy.requests) == 1 and proxy.saves == 1
+
+    # Repeated and nested fields.
+    proxy.update_config(channels=[1], limits={'min': 1., 'max': 0},
+                        save=False)
+    assert (proxy.requests[-1] ==
+            State(channels=[1], limits={'min': 1.}).SerializeToString())
+    assert proxy.saves == 1
+
+    # All specified fields are sent without delta.
+    proxy.update_config(voltage=2., delta=False)
+    assert proxy.requests[-1] == State(voltage=2.).SerializeToString()
+
+
+#: .. versionadded:: 0.52
+def test_update_state_delta():
+    proxy = FakeStateProxy(voltage=1., frequency=3)
+
+    # All specified fields are sent by default.
+    proxy.update_state(voltage=1., frequency=4)
+    assert (proxy.requests[-1] ==
+            State(voltage=1., frequency=4).SerializeToString())
+
+    proxy.get_state()
+    assert proxy.update_state(voltage=1., frequency=4, delta=True) is None
+    assert len(proxy.requests) == 1
+    proxy.update_state(voltage=2., frequency=4, delta=True)
+    assert proxy.requests[-1] == State(voltage=2.).SerializeToString()
+
+    # Device may reject or adjust values, so values of updated fields are no
+    # longer known (i.e., are sent again).
+    assert 'voltage' not in proxy._state_values
+    proxy.update_state(voltage=2., frequency=4, delta=True)
+    assert len(proxy.requests) == 3
+    assert proxy.requests[-1] == State(voltage=2.).SerializeToString()
+
+
+#: .. versionadded:: 0.52
+def test_forget_device_values():
+    for reset in (lambda proxy: proxy._on_id_response(FakePacket(0, b'')),
+                  lambda proxy: SerialProxyMixin
+                  .reconnection_made(proxy, Protocol('COM1'))):
+        proxy = FakeStateProxy(voltage=1.)
+        proxy.get_state()
+        assert proxy.update_state(voltage=1., delta=True) is None
+        # Device is reset, i.e., last known values are stale.
+        proxy.device_state = State(voltage=2.)
+        reset(proxy)
+        proxy.update_state(voltage=1., delta=True)
+        assert proxy.requests == [State(voltage=1.).SerializeToString()]
+
+        proxy = FakeConfigProxy(voltage=1.)
+        proxy.config
+        assert proxy.update_config(voltage=1.) is None
+        proxy.device_config = State(voltage=2.)
+        reset(proxy)
+        assert proxy.update_config(voltage=1.) == 0
+        assert proxy.requests == [State(voltage=1.).SerializeToString()]
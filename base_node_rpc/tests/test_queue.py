@@ -0,0 +1,197 @@
+from collections import namedtuple
+from datetime import datetime
+
+from nadamq.NadaMq import PACKET_TYPES
+import pytest
+
+from base_node_rpc.queue import (STATE_STREAM_IUID, AckBarrier,
+                                 PacketQueueManager, ResponseWaiter,
+                                 RttEstimator)
+
+
+Packet = namedtuple('Packet', 'iuid')
+
+
+class StreamPacket(object):
+    def __init__(self, iuid, data):
+        self.iuid = iuid
+        self.type_ = PACKET_TYPES.STREAM
+        self._data = data
+
+    def data(self):
+        return self._data
+
+
+#: .. versionadded:: 0.52
+def test_ack_barrier():
+    barrier = AckBarrier()
+    iuids = [barrier.add() for i in range(3)]
+    assert len(set(iuids)) == 3
+    assert 0 not in iuids
+
+    for iuid_i in iuids:
+        barrier.on_ack(Packet(iuid_i))
+    barrier.wait(timeout_s=0)
+    assert not barrier.pending
+
+
+#: .. versionadded:: 0.52
+def test_ack_barrier_nack():
+    barrier = AckBarrier()
+    barrier.on_nack(Packet(barrier.add()))
+    with pytest.raises(IOError):
+        barrier.wait(0)
+    # Errors are cleared after being reported.
+    barrier.wait(timeout_s=0)
+
+
+#: .. versionadded:: 0.52
+def test_ack_barrier_timeout():
+    barrier = AckBarrier()
+    barrier.add()
+    with pytest.raises(IOError):
+        barrier.wait(0.01)
+    assert not barrier.pending
+
+
+#: .. versionadded:: 0.52
+def test_ack_barrier_credit():
+    barrier = AckBarrier()
+    # Request is always allowed if no other requests are outstanding.
+    barrier.wait_for_credit(100, 64, timeout_s=0)
+    iuid = barrier.add(40)
+    barrier.wait_for_credit(24, 64, timeout_s=0)
+    # Acknowledgement returns credit.
+    barrier.on_ack(Packet(iuid))
+    barrier.wait_for_credit(64, 64, timeout_s=0)
+
+    barrier.add(40)
+    assert barrier.pending_bytes == 40
+    # Outstanding requests are assumed lost if credit is not returned.
+    with pytest.raises(IOError):
+        barrier.wait_for_credit(25, 64, 0.01)
+    assert barrier.pending_bytes == 0
+
+
+#: .. versionadded:: 0.52
+def test_response_waiter():
+    waiter = ResponseWaiter()
+    waiter.expect(2)
+    # Late response to previous request is discarded.
+    assert not waiter.on_response(Packet(1))
+    assert waiter.on_response(Packet(2))
+    timestamp, response = waiter.wait(timeout_s=0)
+    assert response.iuid == 2
+    # Reception time is reported as `datetime` (and monotonic time).
+    assert isinstance(timestamp, datetime)
+    assert isinstance(waiter.received_s, float)
+    # Only first response is accepted.
+    assert not waiter.on_response(Packet(2))
+    # Untagged packet does not identify any request once device is known to
+    # echo request identifiers.
+    waiter.expect(3)
+    assert waiter.echoes_iuid and not waiter.on_response(Packet(0))
+
+
+#: .. versionadded:: 0.52
+def test_response_waiter_untagged():
+    # Firmware predating request identifiers always responds with an
+    # identifier of 0.
+    waiter = ResponseWaiter()
+    waiter.expect(1)
+    assert waiter.on_response(Packet(0))
+    assert waiter.wait(timeout_s=0)[1].iuid == 0
+    assert not waiter.echoes_iuid
+    # Response is only accepted while a request is outstanding.
+    assert not waiter.on_response(Packet(0))
+    waiter.expect(2)
+    assert waiter.on_response(Packet(0))
+
+
+#: .. versionadded:: 0.52
+def test_response_waiter_timeout():
+    waiter = ResponseWaiter()
+    waiter.expect(3)
+    with pytest.raises(IOError):
+        waiter.wait(0.01)
+    # Response arriving after timeout is discarded.
+    assert not waiter.on_response(Packet(3))
+
+
+#: .. versionadded:: 0.52
+def test_rtt_estimator():
+    estimator = RttEstimator(min_timeout_s=0, max_timeout_s=10.)
+    # Maximum timeout is used until first sample is recorded.
+    assert estimator.timeout_s == 10.
+    for i in range(100):
+        estimator.update(.002)
+    assert abs(estimator.srtt_s - .002) < 1e-6
+    assert estimator.timeout_s < .01
+
+    timeout_s = estimator.timeout_s
+    estimator.backoff()
+    assert estimator.timeout_s == 2 * timeout_s
+    estimator.update(.002)
+    assert estimator.timeout_s <= timeout_s
+
+
+#: .. versionadded:: 0.52
+def test_response_waiter_parse_error():
+    waiter = ResponseWaiter()
+    waiter.expect(4)
+    # Parse errors are ignored unless requested.
+    waiter.on_parse_error()
+    assert waiter.on_response(Packet(4))
+
+    waiter.expect(5, abort_on_error=True)
+    waiter.on_parse_error()
+    with pytest.raises(IOError):
+        waiter.wait(10.)
+
+
+#: .. versionadded:: 0.52
+def test_response_waiter_nack():
+    waiter = ResponseWaiter()
+    waiter.expect(6)
+    assert waiter.on_nack(Packet(6))
+    assert waiter.wait(timeout_s=0)[1].iuid == 6
+
+    # Device discarded corrupted request, so no response will arrive.
+    waiter.expect(7)
+    assert not waiter.on_nack(Packet(0))
+    with pytest.raises(IOError):
+        waiter.wait(10.)
+    assert not waiter.on_response(Packet(7))
+
+
+#: .. versionadded:: 0.52
+def test_ack_barrier_nack_untagged():
+    barrier = AckBarrier()
+    # No outstanding requests, so no request was lost.
+    barrier.on_nack(Packet(0))
+    barrier.wait(timeout_s=0)
+
+    iuid = barrier.add()
+    barrier.on_nack(Packet(0))
+    barrier.on_ack(Packet(iuid))
+    with pytest.raises(IOError):
+        barrier.wait(0)
+
+
+#: .. versionadded:: 0.52
+def test_state_stream_dispatch():
+    manager = PacketQueueManager()
+    events = []
+    manager.signals.signal('foo').connect(events.append, weak=False)
+    data = b'{"event": "foo"}'
+
+    # Event message.
+    manager._dispatch(datetime.now(), StreamPacket(0, data))
+    assert len(events) == 1 and manager.packet_queues.stream.empty()
+
+    # State change packet is never decoded as JSON, even if it would be a
+    # valid event message.
+    packet = StreamPacket(STATE_STREAM_IUID, data)
+    manager._dispatch(datetime.now(), packet)
+    assert len(events) == 1
+    assert manager.packet_queues.stream.get_nowait()[1] is packet
@@ -0,0 +1,52 @@
+import pickle
+
+import pytest
+
+from base_node_rpc import records
+from base_node_rpc.records import Record, RecordTable
+
+
+#: .. versionadded:: 0.52
+def test_record():
+    record = Record([('software_version', '0.52'), ('url', None)])
+    assert record.software_version == '0.52'
+    assert record['url'] is None
+    assert record.index == ['software_version', 'url']
+    assert record.to_dict() == {'software_version': '0.52', 'url': None}
+    with pytest.raises(AttributeError):
+        record.package_name
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+#: .. versionadded:: 0.52
+def test_record_table():
+    ports = RecordTable([('COM1', {'descriptor': 'Arduino'}),
+                         ('COM2', {'descriptor': 'Teensy'})],
+                        index_name='port')
+    assert ports.index == ['COM1', 'COM2']
+    assert ports.columns == ['descriptor']
+
+    devices = ports.join_records([{'port': 'COM2', 'device_name': 'foo'},
+                                  {'port': 'COM3', 'device_name': 'bar'}],
+                                 'port')
+    assert devices.columns == ['descriptor', 'device_name']
+    assert devices.matching(device_name='foo').index == ['COM2']
+    # Original table is not modified.
+    assert 'device_name' not in ports['COM2']
+
+    copy = pickle.loads(pickle.dumps(devices))
+    assert copy == devices and copy.index_name == 'port'
+
+
+#: .. versionadded:: 0.52
+def test_frame_without_pandas():
+    use_pandas = records.USE_PANDAS
+    records.USE_PANDAS = False
+    try:
+        table = records.frame([('echo', 64, 128)], ['command', 'min', 'max'],
+                              index='command')
+        assert isinstance(table, RecordTable)
+        assert table['echo'] == Record([('min', 64), ('max', 128)])
+        assert isinstance(records.series({'url': None}), Record)
+    finally:
+        records.USE_PANDAS = use_pandas
@@ -4,6 +4,9 @@
 #include <string.h>
 
 #include <Packet.h>
+#if defined(COMMAND_PROFILE)
+#include <Arduino.h>
+#endif  // #if defined(COMMAND_PROFILE)
 
 
 #if defined(DEVICE_ID_RESPONSE)
@@ -30,6 +33,11 @@ public:
     if (parser_.parse_error_) { return 'e'; }
     return 0;
   }
+  /* Called when a packet is discarded due to a parse error (e.g., CRC
+   * mismatch).
+   *
+   * ..versionadded:: 0.52 */
+  virtual void on_parse_error() {}
   virtual void operator()(int16_t byte_count) = 0;
 };
 
@@ -43,10 +51,22 @@ public:
   FixedPacket packet_;
   parser_t parser_;
   receiver_t receiver_;
+#if defined(COMMAND_PROFILE)
+  /* Number of CPU cycles (at a resolution of `micros()`) spent processing
+   * most recent request, i.e., dispatch, argument decoding, and execution of
+   * the command.
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t last_command_cycles_;
+#endif  // #if defined(COMMAND_PROFILE)
 
   Handler()
     : packet_(PacketSize, &packet_buffer_[0]), parser_(&packet_),
-      receiver_(parser_) {}
+      receiver_(parser_) {
+#if defined(COMMAND_PROFILE)
+    last_command_cycles_ = 0;
+#endif  // #if defined(COMMAND_PROFILE)
+  }
 
   uint32_t max_payload_size() {
     return (PacketSize
@@ -58,6 +78,7 @@ public:
   void packet_reset() { receiver_.reset(); }
   uint8_t packet_ready() {
     if (packet_error() != 0) {
+      receiver_.on_parse_error();
       packet_reset();
       return false;
     }
@@ -107,11 +128,46 @@ public:
 
     if (packet_ready()) {
       if (packet_.type() == Packet::packet_type::DATA) {
+        /* Identifier assigned to request by host (zero if not set).
+         *
+         * ..versionadded:: 0.52 */
+        const uint16_t iuid = packet_.iuid_;
         // Process request packet using command processor.
+#if defined(COMMAND_PROFILE)
+        const uint32_t start_us = micros();
+#endif  // #if defined(COMMAND_PROFILE)
         result = process_packet_with_processor(packet_, command_processor);
-        if (result.data == NULL) { result.length = 0; }
-        // Write response packet.
-        receiver_.write_f_(result);
+#if defined(COMMAND_PROFILE)
+        last_command_cycles_ = (micros() - start_us) *
+          clockCyclesPerMicrosecond();
+#endif  // #if defined(COMMAND_PROFILE)
+        if (result.data == NULL && result.length > 0) {
+          /* Command processor reported an error (e.g., unknown command or
+           * request arguments could not be decoded), as indicated by a
+           * non-zero length *without* data (see `CommandPacketHandler` in
+           * `arduino_rpc`).  A `NULL` result with zero length is a valid,
+           * empty response.
+           *
+           * ..versionadded:: 0.52 */
+          result.length = 0;
+          if (iuid != 0) {
+            // Report error for request tagged with an identifier.
+            receiver_.write_f_(result, Packet::packet_type::NACK, iuid);
+          } else {
+            // Untagged request: respond with empty data (as before).
+            receiver_.write_f_(result, Packet::packet_type::DATA, iuid);
+          }
+        } else if (iuid != 0 && result.length == 0) {
+          /* Request tagged with an identifier returned no data (e.g., a
+           * `void` command).  Acknowledge with a compact `ACK` packet.
+           *
+           * ..versionadded:: 0.52 */
+          receiver_.write_f_(result, Packet::packet_type::ACK, iuid);
+        } else {
+          if (result.data == NULL) { result.length = 0; }
+          // Write response packet.
+          receiver_.write_f_(result, Packet::packet_type::DATA, iuid);
+        }
 #if defined(DEVICE_ID_RESPONSE)
       } else if (packet_.type() == Packet::packet_type::ID_REQUEST) {
         /* ID information was requested.
@@ -6,6 +6,7 @@
 #include <CArrayDefs.h>
 #include <Wire.h>
 #include <pb.h>
+#include "BootNonce.h"
 
 
 template <typename ConfigMessage, uint8_t Address=0>
@@ -13,16 +14,30 @@ class BaseNodeConfig {
 public:
   typedef ConfigMessage message_type;
   ConfigMessage config_;
-
-  BaseNodeConfig(const pb_field_t *fields) : config_(fields) {}
-
-  void load_config() { config_.load(Address); }
+  /* Incremented whenever config may have changed.
+   *
+   * Starts from a value identifying the current boot (see `boot_nonce()`),
+   * such that values are not repeated after the device is reset.
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t config_generation_;
+
+  BaseNodeConfig(const pb_field_t *fields)
+    : config_(fields), config_generation_(boot_nonce()) {}
+
+  void load_config() { config_.load(Address); config_generation_++; }
   void save_config() { config_.save(Address); }
-  void reset_config() { config_.reset(); }
+  void reset_config() { config_.reset(); config_generation_++; }
   UInt8Array serialize_config() { return config_.serialize(); }
   uint8_t update_config(UInt8Array serialized) {
+    config_generation_++;
     return config_.update(serialized);
   }
+  /* Return config change counter, e.g., to allow host to determine whether
+   * a cached copy of the config is still valid.
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t config_generation() const { return config_generation_; }
 
   bool on_config_i2c_address_changed(uint32_t new_value) {
     // I2C addresses must be in the range 8-119, according to the
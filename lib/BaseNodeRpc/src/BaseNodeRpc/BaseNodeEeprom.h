@@ -5,6 +5,7 @@
 #include "BaseBuffer.h"
 #include <pb_eeprom.h>
 #include <avr/io.h>  // End of eeprom: `E2END`
+#include <util/crc16.h>
 
 
 class BaseNodeEeprom : virtual public BufferIFace {
@@ -23,6 +24,27 @@ public:
   }
 
   uint32_t eeprom_e2end() const { return E2END; }
+
+  /* Compute CRC-16 (polynomial `0xA001`, initial value `0xFFFF`) of `n`
+   * EEPROM bytes starting at `address`, e.g., to verify contents without
+   * reading them back.
+   *
+   * Range is clamped to end of EEPROM (i.e., `E2END`), such that bytes past
+   * the end are never read.
+   *
+   * ..versionadded:: 0.52 */
+  uint16_t eeprom_crc16(uint32_t address, uint16_t n) {
+    uint16_t crc = 0xFFFF;
+    if (address > E2END) {
+      n = 0;
+    } else if (n > E2END + 1 - address) {
+      n = E2END + 1 - address;
+    }
+    for (uint16_t i = 0; i < n; i++) {
+      crc = _crc16_update(crc, eeprom_read_byte((uint8_t *)(address + i)));
+    }
+    return crc;
+  }
 };
 
 
@@ -3,6 +3,12 @@
 
 #include "SerialHandler.h"
 
+#ifndef SERIAL_RX_BUFFER_SIZE
+/* Size of hardware serial receive buffer (defined by recent Arduino AVR
+ * cores). */
+#define SERIAL_RX_BUFFER_SIZE 64
+#endif
+
 
 class BaseNodeSerialHandler {
 public:
@@ -15,6 +21,22 @@ public:
             - sizeof(uint16_t)  // UUID
             - sizeof(uint16_t));  // Payload length
   }
+
+  /* Number of request bytes the device is able to buffer while processing a
+   * command, i.e., the credit available to the host for pipelined requests.
+   *
+   * ..versionadded:: 0.52 */
+  uint16_t serial_rx_buffer_size() { return SERIAL_RX_BUFFER_SIZE; }
+
+#if defined(COMMAND_PROFILE)
+  /* Number of CPU cycles spent processing the *previous* request received
+   * through the serial handler (see `Handler::last_command_cycles_`).
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t last_command_cycles() {
+    return serial_handler_.last_command_cycles_;
+  }
+#endif  // #if defined(COMMAND_PROFILE)
 };
 
 #endif  // #ifndef ___BASE_NODE_SERIAL_HANDLER__H___
@@ -4,6 +4,19 @@
 
 #include <CArrayDefs.h>
 #include <pb.h>
+#include "BootNonce.h"
+#if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
+#include "SerialHandler.h"
+#endif  // #if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
+
+
+#ifndef STATE_STREAM_IUID
+/* Packet identifier of STREAM packets containing state changes (i.e., to
+ * distinguish from other STREAM packets, e.g., events).
+ *
+ * ..versionadded:: 0.52 */
+#define STATE_STREAM_IUID 0x5354
+#endif  // #ifndef STATE_STREAM_IUID
 
 
 template <typename StateMessage>
@@ -11,14 +24,72 @@ class BaseNodeState {
 public:
   typedef StateMessage message_type;
   StateMessage state_;
+  /* Incremented whenever state may have changed.
+   *
+   * Starts from a value identifying the current boot (see `boot_nonce()`),
+   * such that values are not repeated after the device is reset.
+   *
+   * **N.B.,** application code modifying `state_` directly must also
+   * increment this counter for host-side state caching to be valid.
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t state_generation_;
 
-  BaseNodeState(const pb_field_t *fields) : state_(fields) {}
+  BaseNodeState(const pb_field_t *fields)
+    : state_(fields), state_generation_(boot_nonce()) {}
 
-  void reset_state() { state_.reset(); }
+  void reset_state() { state_.reset(); state_generation_++; }
   UInt8Array serialize_state() { return state_.serialize(); }
+  /* ..versionchanged:: 0.52
+   *     If `STATE_STREAM` is defined and the update succeeded, push stored
+   *     state to host (see `push_state()`). */
   uint8_t update_state(UInt8Array serialized) {
-    return state_.update(serialized);
+    state_generation_++;
+    uint8_t result = state_.update(serialized);
+#if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
+    if (result) {
+      /* Push all fields *as stored*, since validation callbacks may reject or
+       * adjust updated values.
+       *
+       * **N.B.,** if no validation callbacks are defined, define
+       * `STATE_STREAM_DELTA` to only push (tags and values of) updated
+       * fields, i.e., the serialized update. */
+#ifdef STATE_STREAM_DELTA
+      push_state(serialized);
+#else
+      push_state();
+#endif  // #ifdef STATE_STREAM_DELTA
+    }
+#endif  // #if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
+    return result;
+  }
+  /* Return state change counter (see `state_generation_`).
+   *
+   * ..versionadded:: 0.52 */
+  uint32_t state_generation() const { return state_generation_; }
+
+#if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
+  /* Push serialized state message to host as a STREAM packet (with
+   * `STATE_STREAM_IUID` as packet identifier), such that the host does not
+   * need to poll `serialize_state()`.
+   *
+   * To only push changed fields, application code modifying `state_` directly
+   * may pass a serialized message containing only the changed fields, e.g.,
+   * encoded using `pb_encode()` from a message with only the `has_<field>`
+   * flags of the changed fields set.
+   *
+   * **N.B.,** must *not* be called from an interrupt handler.
+   *
+   * ..versionadded:: 0.52 */
+  void push_state(UInt8Array serialized) {
+    base_node_rpc::serial_write_packet<Stream> write_packet(Serial);
+    write_packet(serialized, Packet::packet_type::STREAM, STATE_STREAM_IUID);
   }
+  /* Push all state fields to host (see `push_state(UInt8Array)`).
+   *
+   * ..versionadded:: 0.52 */
+  void push_state() { push_state(state_.serialize()); }
+#endif  // #if defined(STATE_STREAM) && !defined(DISABLE_SERIAL)
 };
 
 
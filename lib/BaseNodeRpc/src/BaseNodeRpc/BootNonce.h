@@ -0,0 +1,39 @@
+#ifndef ___BOOT_NONCE__H___
+#define ___BOOT_NONCE__H___
+
+#include <stdint.h>
+
+
+/* Return value identifying the current boot, i.e., differing from the value
+ * of the previous boot.
+ *
+ * Used to seed change counters (e.g., `config_generation_`) such that
+ * counter values are not repeated after the device is reset, in which case
+ * the host would otherwise consider values cached before the reset to be
+ * valid.
+ *
+ * On AVR, the nonce is kept in a variable that is not initialized at
+ * start-up (i.e., `.noinit` section), so it is incremented across warm
+ * resets (e.g., reset pin, watchdog) and holds an arbitrary value after
+ * power-up.  On other platforms, the nonce is zero (i.e., host only
+ * discards cached values upon reconnecting).
+ *
+ * ..versionadded:: 0.52 */
+static inline uint32_t boot_nonce() {
+#if defined(__AVR__)
+  static uint16_t nonce __attribute__((section(".noinit")));
+  // Zero-initialized at start-up, i.e., increment nonce once per boot.
+  static bool incremented = false;
+
+  if (!incremented) {
+    nonce++;
+    incremented = true;
+  }
+  return static_cast<uint32_t>(nonce) << 16;
+#else
+  return 0;
+#endif  // #if defined(__AVR__)
+}
+
+
+#endif  // #ifndef ___BOOT_NONCE__H___
@@ -26,7 +26,8 @@ struct i2c_write_packet {
 
   i2c_write_packet() : address_(0) {}
 
-  void operator()(UInt8Array data, uint8_t type_=Packet::packet_type::DATA) {
+  void operator()(UInt8Array data, uint8_t type_=Packet::packet_type::DATA,
+                  uint16_t iuid=0) {
     /*
      * Write packet with `data` array contents as payload to specified I2C
      * address.
@@ -38,8 +39,12 @@ struct i2c_write_packet {
      *  - Target I2C address is prepended to each transmission to allow the
      *    target to identify the source of the message.
      *  - The payload is sent in chunks as required (i.e., payloads greater
-     *    than the Wire library buffer size are supported). */
+     *    than the Wire library buffer size are supported).
+     *
+     * ..versionchanged:: 0.52
+     *     Add `iuid` argument to echo identifier of request. */
     FixedPacket to_send;
+    to_send.iuid_ = iuid;
     to_send.type(type_);
     to_send.reset_buffer(data.length, data.data);
     to_send.payload_length_ = data.length;
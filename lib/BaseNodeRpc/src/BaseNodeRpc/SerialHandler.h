@@ -54,10 +54,25 @@ public:
 
   SerialReceiver(Parser &parser) : base_type(parser), write_f_(Serial) {}
 
+  virtual void on_parse_error() {
+    /* Notify host that a corrupted request was discarded (`NACK` with an
+     * identifier of 0), allowing the host to retransmit the request without
+     * waiting for a timeout.
+     *
+     * ..versionadded:: 0.52 */
+    UInt8Array empty = UInt8Array_init_default();
+    write_f_(empty, Packet::packet_type::NACK, 0);
+  }
+
   void operator()(int16_t byte_count) {
+    /* ..versionchanged:: 0.52
+     *     Stop reading once a packet is completed (or a parse error occurs).
+     *     Any remaining bytes (e.g., pipelined requests) are left in the
+     *     serial receive buffer until the completed packet is processed. */
     for (int i = 0; i < byte_count; i++) {
       uint8_t value = Serial.read();
       parser_.parse_byte(&value);
+      if (parser_.message_completed_ || parser_.parse_error_) { break; }
     }
   }
 };
@@ -43,6 +43,11 @@ void loop() {
    * .. versionchanged:: v0.32
    *     Poll for available serial data instead of using `serialEvent`
    *     callback.  Seems that this is necessary to support Arduino micro.
+   *
+   * .. versionchanged:: v0.52
+   *     Receiver stops reading at the end of each completed packet, so
+   *     pipelined requests wait in the serial receive buffer.  The host paces
+   *     writes to fit within `serial_rx_buffer_size()` bytes.
    */
   if (Serial.available()) {
     node_obj.serial_handler_.receiver()(Serial.available());